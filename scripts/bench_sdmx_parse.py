@@ -0,0 +1,171 @@
+"""Benchmark the streaming SDMX parsers against the pandasdmx path.
+
+The `tests/fixtures/*_multi.json` fixtures (series of (date, value) pairs per
+country) are rendered as SDMX-ML generic data and SDMX-JSON messages, scaled
+up by `--scale` copies of each series with distinct dimension values, and
+parsed into fetcher records by:
+
+- pandasdmx: `read_sdmx` + walking `series.observations` (the fetchers' path);
+- stream-xml: `parse_sdmx_ml` + `records_by_indicator`;
+- stream-json: `parse_sdmx_json` + `records_by_indicator`.
+
+Reports wall time and peak traced memory (tracemalloc) per fixture and path.
+
+Usage: python scripts/bench_sdmx_parse.py [--scale 2000] [--repeat 3]
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.fetchers.sdmx_keys import SdmxRequest  # noqa: E402
+from src.fetchers.sdmx_stream import parse_sdmx_json, parse_sdmx_ml, records_by_indicator  # noqa: E402
+
+HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<message:GenericData xmlns:message="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/message" '
+    'xmlns:generic="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/data/generic" '
+    'xmlns:common="http://www.sdmx.org/resources/sdmxml/schemas/v2_1/common">'
+    "<message:Header><message:ID>BENCH</message:ID><message:Test>false</message:Test>"
+    "<message:Prepared>2024-01-01T00:00:00</message:Prepared><message:Sender id=\"BENCH\"/>"
+    '<message:Structure structureID="S" dimensionAtObservation="TIME_PERIOD"><common:Structure>'
+    "<URN>urn:sdmx:org.sdmx.infomodel.datastructure.DataStructure=BENCH:BENCH(1.0)</URN>"
+    "</common:Structure></message:Structure></message:Header>"
+    '<message:DataSet structureRef="S">'
+)
+FOOTER = "</message:DataSet></message:GenericData>"
+
+
+def _series(fixture, scale):
+    """(country, item, observations) for `scale` copies of each fixture series."""
+    for i in range(scale):
+        for s in fixture.get("series", []):
+            yield s["country"], f"I{i:05d}", s["observations"]
+
+
+def to_sdmx_ml(fixture, scale) -> bytes:
+    parts = [HEADER]
+    for country, item, observations in _series(fixture, scale):
+        parts.append(
+            "<generic:Series><generic:SeriesKey>"
+            f'<generic:Value id="REF_AREA" value="{country}"/><generic:Value id="ITEM" value="{item}"/>'
+            "</generic:SeriesKey>"
+        )
+        for date, value in observations:
+            v = "NaN" if value is None else repr(float(value))
+            parts.append(
+                f'<generic:Obs><generic:ObsDimension value="{date[:4]}"/><generic:ObsValue value="{v}"/></generic:Obs>'
+            )
+        parts.append("</generic:Series>")
+    parts.append(FOOTER)
+    return "".join(parts).encode("utf-8")
+
+
+def to_sdmx_json(fixture, scale) -> bytes:
+    countries, items, periods = {}, {}, {}
+    series = {}
+    for country, item, observations in _series(fixture, scale):
+        c = countries.setdefault(country, len(countries))
+        i = items.setdefault(item, len(items))
+        obs = {}
+        for date, value in observations:
+            obs[str(periods.setdefault(date[:4], len(periods)))] = [value]
+        series[f"{c}:{i}"] = {"observations": obs}
+    msg = {
+        "dataSets": [{"series": series}],
+        "structure": {
+            "dimensions": {
+                "series": [
+                    {"id": "REF_AREA", "values": [{"id": k} for k in countries]},
+                    {"id": "ITEM", "values": [{"id": k} for k in items]},
+                ],
+                "observation": [{"id": "TIME_PERIOD", "values": [{"id": k} for k in periods]}],
+            }
+        },
+    }
+    return json.dumps(msg).encode("utf-8")
+
+
+REQ = SdmxRequest("BENCH", None, [{"id": "bench", "code": "BENCH"}])
+
+
+def via_pandasdmx(payload: bytes):
+    import pandasdmx as sdmx
+
+    rows = []
+    msg = sdmx.read_sdmx(io.BytesIO(payload))
+    for key, observations in msg.data[0].series.items():
+        country = key.values["REF_AREA"].value
+        for obs in observations:
+            rows.append(
+                {
+                    "source": "BENCH",
+                    "indicator": "bench",
+                    "country": country,
+                    "date": obs.dimension.values["TIME_PERIOD"].value,
+                    "value": obs.value,
+                }
+            )
+    return rows
+
+
+def via_stream_xml(payload: bytes):
+    return records_by_indicator(REQ, parse_sdmx_ml(io.BytesIO(payload)), "BENCH", ("REF_AREA",))["bench"]
+
+
+def via_stream_json(payload: bytes):
+    return records_by_indicator(REQ, parse_sdmx_json(io.BytesIO(payload)), "BENCH", ("REF_AREA",))["bench"]
+
+
+def measure(fn, payload, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = fn(payload)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    fn(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=2000, help="copies of each fixture series")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    try:
+        import pandasdmx  # noqa: F401
+
+        has_pandasdmx = True
+    except Exception:
+        has_pandasdmx = False
+
+    print(f"{'fixture':<18}{'path':<13}{'rows':>9}{'seconds':>10}{'peak MB':>10}")
+    for path in sorted(glob.glob(os.path.join(ROOT, "tests", "fixtures", "*_multi.json"))):
+        with open(path, encoding="utf-8") as fh:
+            fixture = json.load(fh)
+        name = os.path.basename(path)
+        xml_payload = to_sdmx_ml(fixture, args.scale)
+        json_payload = to_sdmx_json(fixture, args.scale)
+        runs = [("stream-xml", via_stream_xml, xml_payload), ("stream-json", via_stream_json, json_payload)]
+        if has_pandasdmx:
+            runs.insert(0, ("pandasdmx", via_pandasdmx, xml_payload))
+        for label, fn, payload in runs:
+            seconds, peak, n = measure(fn, payload, args.repeat)
+            print(f"{name:<18}{label:<13}{n:>9}{seconds:>10.3f}{peak / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
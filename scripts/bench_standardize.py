@@ -0,0 +1,195 @@
+"""Benchmark the vectorized apply_standardization against the per-group loop.
+
+Builds a long frame of `n` random quarterly series (indicator x country,
+1..`--length` observations, some NaNs and flat series) for each size in
+`--series`, and times:
+
+- groups: `standardize_groups`, the original per-group loop;
+- vectorized: `apply_standardization`.
+
+The reference loop is skipped above `--max-reference` series. For sizes where
+both run, the largest absolute std_value difference is reported.
+
+Usage: python scripts/bench_standardize.py [--series 100 1000 10000] [--method robust_zscore]
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.transforms import standardize  # noqa: E402
+from src.transforms.pipeline import _std_config, apply_standardization  # noqa: E402
+
+
+def standardize_groups(
+    df: pd.DataFrame,
+    config: Optional[Dict] = None,
+    method: str = "robust_zscore",
+    group_keys: Optional[list] = None,
+    invert: bool = False,
+    good_direction: Optional[str] = None,
+    auto_sign_check: bool = True,
+):
+    """`apply_standardization` as the original loop over (indicator, country)
+    groups, kept as the baseline for this benchmark and the parity test."""
+    cfg = _std_config(config)
+    gk = group_keys or ["indicator", "country"]
+
+    out = df.copy()
+    out["std_value"] = np.nan
+
+    # sort by date for rolling operations
+    if "date" in out.columns:
+        out = out.sort_values("date")
+
+    grouped = out.groupby(gk)
+
+    results = []
+    for name, group in grouped:
+        s = group.set_index("date")["value"].astype(float)
+        # compute rolling baseline and deviation
+        baseline, deviation = standardize.rolling_baseline(
+            s, window=cfg.rolling_window, min_periods=cfg.rolling_min_periods
+        )
+        # deviation may have NaNs for early windows; dropna for stats
+        dev = deviation.fillna(0).values
+
+        # optionally use rolling MAD as scale for robust zscore
+        rolling_mad = None
+        if getattr(cfg, 'rolling_mad', False):
+            try:
+                rm = standardize.rolling_mad(s, window=cfg.rolling_window, min_periods=cfg.rolling_min_periods)
+                # align to dev index and fillna (use bfill/ffill to avoid deprecated fillna(method=...))
+                rolling_mad = rm.bfill().ffill().values
+            except Exception:
+                rolling_mad = None
+
+        # winsorize if requested
+        if method in ("winsorized_zscore", "robust_zscore", "zscore"):
+            w = standardize.winsorize(dev, lower_pct=cfg.winsor_lower, upper_pct=cfg.winsor_upper)
+        else:
+            w = dev
+
+        # standardize methods
+        if method == "robust_zscore":
+            z = standardize.robust_zscore(w, scale=rolling_mad if rolling_mad is not None else None)
+        elif method == "zscore":
+            # classic zscore: mean/std
+            a = np.asarray(w, dtype=float)
+            mu = np.nanmean(a)
+            sd = np.nanstd(a)
+            sd = sd if sd > 0 else np.nan
+            z = (a - mu) / (sd if sd and not np.isnan(sd) else 1.0)
+        elif method == "winsorized_zscore":
+            # winsorize then classic zscore
+            a = np.asarray(w, dtype=float)
+            mu = np.nanmean(a)
+            sd = np.nanstd(a)
+            sd = sd if sd > 0 else np.nan
+            z = (a - mu) / (sd if sd and not np.isnan(sd) else 1.0)
+        elif method == "rank_norm":
+            z = standardize.rank_norm(w)
+        else:
+            raise ValueError(f"unknown standardization method: {method}")
+
+        # apply invert if requested (useful for indicators where lower is better)
+        if invert:
+            z = -1.0 * z
+
+        # automatic sign check: ensure that sign of relationship between raw value and
+        # standardized score matches declared good_direction. If mismatch and auto_sign_check
+        # is enabled, flip the sign.
+        if auto_sign_check and good_direction in ("up", "down"):
+            try:
+                # compute Spearman correlation between raw dev and z
+                valid = (~np.isnan(dev)) & (~np.isnan(z))
+                if valid.sum() >= 2:
+                    corr, _ = stats.spearmanr(dev[valid], z[valid])
+                    if not np.isnan(corr):
+                        if good_direction == "up" and corr < 0:
+                            z = -1.0 * z
+                        if good_direction == "down" and corr > 0:
+                            z = -1.0 * z
+            except Exception:
+                # on any failure, keep z as-is
+                pass
+
+        # map back to group order
+        grp_out = group.copy()
+        grp_out = grp_out.assign(std_value=list(z))
+        results.append(grp_out)
+
+    if results:
+        df_out = pd.concat(results, ignore_index=True)
+    else:
+        df_out = out
+
+    # restore original ordering by index if date existed
+    return df_out.sort_index()
+
+
+def make_frame(n_series: int, length: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, length + 1, n_series)
+    series = np.repeat(np.arange(n_series), sizes)
+    offsets = np.arange(len(series)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    values = rng.normal(size=len(series)).cumsum()
+    values[rng.random(len(series)) < 0.02] = np.nan
+    flat = rng.random(n_series) < 0.05
+    values[flat[series]] = 1.0
+    df = pd.DataFrame(
+        {
+            "indicator": [f"ind{i % 30:02d}" for i in series],
+            "country": [f"C{i // 30:04d}" for i in series],
+            "date": pd.Timestamp("1990-03-31") + pd.to_timedelta(offsets * 91, unit="D"),
+            "value": values,
+        }
+    )
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def measure(fn, df, repeat, **kwargs):
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(df, **kwargs)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--length", type=int, default=40, help="max observations per series")
+    parser.add_argument("--method", default="robust_zscore")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--max-reference", type=int, default=10000, help="largest size the per-group loop runs on")
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore")
+
+    kwargs = {"method": args.method, "good_direction": "up"}
+    print(f"{'series':>8}{'rows':>10}{'groups s':>11}{'vector s':>11}{'speedup':>9}{'max diff':>11}")
+    for n in args.series:
+        df = make_frame(n, args.length)
+        vec_s, vec = measure(apply_standardization, df, args.repeat, **kwargs)
+        if n <= args.max_reference:
+            ref_s, ref = measure(standardize_groups, df, args.repeat, **kwargs)
+            diff = float(np.nanmax(np.abs(ref["std_value"].to_numpy() - vec["std_value"].to_numpy())))
+            print(f"{n:>8}{len(df):>10}{ref_s:>11.3f}{vec_s:>11.3f}{ref_s / vec_s:>8.1f}x{diff:>11.1e}")
+        else:
+            print(f"{n:>8}{len(df):>10}{'-':>11}{vec_s:>11.3f}{'-':>9}{'-':>11}")
+
+
+if __name__ == "__main__":
+    main()
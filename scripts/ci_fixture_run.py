@@ -1,14 +1,20 @@
 """Small helper used in CI to run the pipeline against local SDMX fixtures when available.
 
 Behavior:
-- If `tests/fixtures/sdmx/wb/` exists, monkeypatch `WorldBankFetcher.fetch` to load JSON files named `{indicator}_{country}.json` and return (DataFrame, [fetch_log])
+- With `--http-mode record|replay` (or, by default, when recorded HTTP responses exist under
+  `tests/fixtures/http/`), run the real fetchers of all sources with `runtime.http_mode` set, so
+  responses are recorded to / replayed from that store (see `src/fetchers/replay.py`)
+- Else, if `tests/fixtures/sdmx/wb/` exists, monkeypatch `WorldBankFetcher.fetch` to load JSON files named `{indicator}_{country}.json` and return (DataFrame, [fetch_log])
 - Otherwise, it falls back to calling `src.main.main` with the provided config (or default example-config.yaml)
 
 This script is intentionally conservative: it doesn't change library code and only monkeypatches behavior at runtime.
 """
+import argparse
 import os
 import sys
 import json
+import tempfile
+import yaml
 import pandas as pd
 import logging
 from datetime import datetime
@@ -21,6 +27,7 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 FIX_DIR = os.path.join(os.getcwd(), "tests", "fixtures", "sdmx", "wb")
+HTTP_DIR = os.path.join(os.getcwd(), "tests", "fixtures", "http")
 
 
 def load_fixture(indicator, country):
@@ -52,7 +59,30 @@ def load_fixture(indicator, country):
     return df, [log]
 
 
-def main(config_path: str = None):
+def run_http_mode(config_path: str, mode: str, cassette_dir: str):
+    """Run the pipeline with the transport-level record/replay store."""
+    from src.main import main as pipeline_main
+
+    with open(config_path or "example-config.yaml", encoding="utf-8") as fh:
+        cfg = yaml.safe_load(fh) or {}
+    cfg.setdefault("runtime", {}).update({"http_mode": mode, "http_cassette_dir": cassette_dir})
+    fd, tmp = tempfile.mkstemp(suffix=".yaml")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            yaml.safe_dump(cfg, fh)
+        print(f"Running pipeline with http_mode={mode} ({cassette_dir})")
+        pipeline_main(["--config", tmp])
+    finally:
+        os.remove(tmp)
+
+
+def main(config_path: str = None, http_mode: str = None, cassette_dir: str = HTTP_DIR):
+    if http_mode is None and os.path.isdir(os.path.join(cassette_dir, "requests")):
+        http_mode = "replay"
+    if http_mode in ("record", "replay"):
+        run_http_mode(config_path, http_mode, cassette_dir)
+        return
+
     # If fixtures not present, run main normally
     if not os.path.isdir(FIX_DIR):
         print("No SDMX fixtures found; running normal pipeline")
@@ -107,7 +137,9 @@ def main(config_path: str = None):
 
 
 if __name__ == "__main__":
-    import sys
-
-    cfg = sys.argv[1] if len(sys.argv) > 1 else None
-    main(cfg)
+    parser = argparse.ArgumentParser(description="Run the pipeline offline from fixtures")
+    parser.add_argument("config", nargs="?", default=None)
+    parser.add_argument("--http-mode", choices=["record", "replay"], default=None)
+    parser.add_argument("--cassettes", default=HTTP_DIR, help="record/replay store directory")
+    args = parser.parse_args()
+    main(args.config, args.http_mode, args.cassettes)
@@ -1,6 +1,13 @@
 import pycountry
 import csv
 import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.processing.harmonize import write_iso3_table  # noqa: E402
 
 os.makedirs("data", exist_ok=True)
 out_path = os.path.join("data", "countries_iso3.csv")
@@ -19,3 +26,10 @@ with open(out_path, "w", encoding="utf-8", newline="") as f:
         w.writerow([code, name])
 
 print(f"Wrote {len(seen)} codes to {out_path}")
+
+# export of the lookup table harmonize_countries resolves codes with (ISO2 and
+# country names -> ISO3; three-letter codes are taken as ISO3 without it). The
+# file is for inspection only: iso3_table() is built from pycountry and never
+# reads it back
+lookup_path = os.path.join("data", "countries_iso3_lookup.csv")
+print(f"Wrote {write_iso3_table(lookup_path)} lookup keys to {lookup_path}")
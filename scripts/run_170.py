@@ -10,6 +10,7 @@ Usage:
   python scripts/run_170.py           # dry-run report (no work)
   python scripts/run_170.py --run     # actually execute batches
   python scripts/run_170.py --run --batch-size 20 --n 170
+  python scripts/run_170.py --run --config cfg.yaml   # e.g. a config using WB_BULK sources
 """
 
 import os
@@ -37,7 +38,7 @@ def list_countries(n=170):
     return [c.alpha_3 for c in list(pycountry.countries)[:n]]
 
 
-def run_batches(countries, batch_size=20, run=False, cleanup=True, out_dir=None):
+def run_batches(countries, batch_size=20, run=False, cleanup=True, out_dir=None, config=None):
     out_dir = out_dir or os.path.join(ROOT, "output")
     os.makedirs(out_dir, exist_ok=True)
 
@@ -55,7 +56,7 @@ def run_batches(countries, batch_size=20, run=False, cleanup=True, out_dir=None)
             continue
 
         try:
-            main(["--countries", cs])
+            main(["--countries", cs] + (["--config", config] if config else []))
         except Exception as e:
             print(f"  Batch {i} failed: {e}")
             continue
@@ -127,10 +128,11 @@ def parse_args_and_run():
     parser.add_argument('--batch-size', type=int, default=20, help='Number of countries per batch')
     parser.add_argument('--no-cleanup', action='store_true', help='Do not delete per-batch output files')
     parser.add_argument('--n', type=int, default=170, help='Number of countries to include (first N from pycountry)')
+    parser.add_argument('--config', default=None, help='Pipeline config passed to each batch (default: built-in config)')
     args = parser.parse_args()
 
     countries = list_countries(n=args.n)
-    run_batches(countries, batch_size=args.batch_size, run=args.run, cleanup=not args.no_cleanup)
+    run_batches(countries, batch_size=args.batch_size, run=args.run, cleanup=not args.no_cleanup, config=args.config)
 
 
 if __name__ == '__main__':
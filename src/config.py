@@ -26,6 +26,11 @@ from pydantic import BaseModel, Field, ValidationError, validator, root_validato
 class SourceEntry(BaseModel):
     source: str
     code: str
+    # SDMX only: dataflow id, key template ({freq}, {countries}, {code}) and
+    # the series' frequency in the dataflow (empty = all frequencies)
+    resource: Optional[str] = None
+    key: Optional[str] = None
+    freq: Optional[str] = None
 
 
 class IndicatorConfig(BaseModel):
@@ -52,6 +57,29 @@ class ExcelConfig(BaseModel):
 class CachingConfig(BaseModel):
     enabled: bool = True
     ttl_hours: int = 24
+    # storage format for new entries: "columnar" (.npy + .meta.json) or "json"
+    backend: str = "columnar"
+    # size cap for .cache/; least recently used entries are evicted after each run
+    max_size_mb: Optional[float] = Field(None, gt=0)
+    # in-process LRU of parsed entries in front of .cache/ (0 disables it)
+    memory_max_mb: float = Field(256, ge=0)
+    # wait limit for cache/fetch locks held by other processes sharing .cache/
+    lock_timeout_sec: float = Field(300, gt=0)
+    # serve expired entries immediately (flagged `stale` in fetch_logs) and
+    # refresh them in the background for the next run
+    stale_while_revalidate: bool = False
+    # hard age limit for serving stale entries; older ones are refetched (None = no limit)
+    max_stale_hours: Optional[float] = Field(None, gt=0)
+    # refetch only the periods after the last cached observation (plus an
+    # overlap of `incremental_overlap_periods` for revised values)
+    incremental: bool = False
+    incremental_overlap_periods: int = Field(2, ge=0)
+
+    @validator("backend")
+    def check_backend(cls, v):
+        if v not in ("columnar", "json"):
+            raise ValueError("caching.backend must be 'columnar' or 'json'")
+        return v
 
 
 class RuntimeConfig(BaseModel):
@@ -59,6 +87,71 @@ class RuntimeConfig(BaseModel):
     request_timeout_sec: int = 20
     retry_max: int = 3
     backoff_initial_sec: float = 1.0
+    # countries per World Bank request (semicolon-joined); 1 = one request per country
+    wb_batch_size: int = Field(50, ge=1)
+    # keep-alive connections per host in the shared HTTP session pool
+    http_pool_maxsize: int = Field(10, ge=1)
+    # per-host overrides, e.g. {"api.worldbank.org": 20}
+    http_pool_per_host: Dict[str, int] = Field(default_factory=dict)
+    # optional World Bank API base URL (mirror or local stub server)
+    wb_base_url: Optional[str] = None
+    # "threads": one blocking fetch per (indicator, source) on max_workers threads;
+    # "async": event-loop fan-out across indicators x countries x pages
+    fetch_engine: str = "threads"
+    async_max_concurrency: int = Field(16, ge=1)
+    # per-source caps for the async engine, e.g. {"IMF": 2}
+    async_source_limits: Dict[str, int] = Field(default_factory=dict)
+    # per-source request rate and adaptive concurrency, e.g.
+    # {"WB": {"requests_per_sec": 10, "burst": 20, "max_concurrency": 8}}
+    rate_limits: Dict[str, Dict[str, float]] = Field(default_factory=dict)
+    # SDMX response parsing: "pandasdmx" (message objects) or the streaming
+    # parsers "stream-xml" / "stream-json" (requested from the REST endpoints directly)
+    sdmx_parser: str = "pandasdmx"
+    # per-source SDMX REST base URLs for the streaming parsers, e.g. {"ECB": "https://..."}
+    sdmx_base_urls: Dict[str, str] = Field(default_factory=dict)
+    # WB_BULK source: local WDI snapshot (.csv or .zip); if unset, wb_bulk_url is
+    # downloaded into wb_bulk_dir, which also holds the columnar index
+    wb_bulk_path: Optional[str] = None
+    wb_bulk_url: Optional[str] = None
+    wb_bulk_dir: str = ".cache/wb_bulk"
+    wb_bulk_chunk_rows: int = Field(5000, ge=1)
+    # "live", or "record"/"replay" HTTP responses to/from http_cassette_dir
+    # (transport level, for all fetchers; replay never touches the network)
+    http_mode: str = "live"
+    http_cassette_dir: str = ".cache/http"
+    # per-source circuit breaker: open after this many consecutive failures
+    # (0 = off), let one trial request through after breaker_reset_sec
+    breaker_failure_threshold: int = Field(5, ge=0)
+    breaker_reset_sec: float = Field(60.0, ge=0)
+    # "priority": fetch heavy-weight and coverage-critical series first; "config": config order
+    fetch_order: str = "priority"
+    # wall-clock budget of the fetch phase in seconds; fetches still running then
+    # are abandoned (stale cache where available) and the ranking uses what arrived
+    deadline_sec: Optional[float] = Field(None, gt=0)
+
+    @validator("fetch_engine")
+    def check_fetch_engine(cls, v):
+        if v not in ("threads", "async"):
+            raise ValueError("fetch_engine must be 'threads' or 'async'")
+        return v
+
+    @validator("sdmx_parser")
+    def check_sdmx_parser(cls, v):
+        if v not in ("pandasdmx", "stream-xml", "stream-json"):
+            raise ValueError("sdmx_parser must be 'pandasdmx', 'stream-xml' or 'stream-json'")
+        return v
+
+    @validator("fetch_order")
+    def check_fetch_order(cls, v):
+        if v not in ("priority", "config"):
+            raise ValueError("fetch_order must be 'priority' or 'config'")
+        return v
+
+    @validator("http_mode")
+    def check_http_mode(cls, v):
+        if v not in ("live", "record", "replay"):
+            raise ValueError("http_mode must be 'live', 'record' or 'replay'")
+        return v
 
 
 class BacktestConfig(BaseModel):
@@ -170,12 +263,25 @@ DEFAULT_CONFIG = {
         "number_format": "#.##0,00",
         "date_format": "DD.MM.YYYY",
     },
-    "caching": {"enabled": True, "ttl_hours": 24},
+    "caching": {
+        "enabled": True,
+        "ttl_hours": 24,
+        "backend": "columnar",
+        "max_size_mb": None,
+        "memory_max_mb": 256,
+        "lock_timeout_sec": 300,
+        "stale_while_revalidate": False,
+        "max_stale_hours": None,
+        "incremental": False,
+        "incremental_overlap_periods": 2,
+    },
     "runtime": {
         "max_workers": 4,
         "request_timeout_sec": 20,
         "retry_max": 3,
         "backoff_initial_sec": 1.0,
+        "wb_batch_size": 50,
+        "http_pool_maxsize": 10,
     },
     "allocation": {"min_alloc": 0.0, "max_alloc": 1.0, "top_n": None},
     "backtest": {"no_backfill": False},
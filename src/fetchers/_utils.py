@@ -1,30 +1,53 @@
-"""Small utilities for fetchers: timing, retry/backoff, and cache key generation."""
+"""Small utilities for fetchers: timing, retry/backoff, cache key generation and frequency tags."""
+import re
 import time
 import hashlib
 import json
-from typing import Callable, Any
+from typing import Callable, Any, Optional
+
+import pandas as pd
+
+from .breaker import CircuitOpenError
+from .deadline import DeadlineExceeded, RunDeadline, get_run_deadline
 
 
 def time_ms():
     return int(time.time() * 1000)
 
 
-def simple_backoff_retry(fn: Callable[..., Any], attempts: int = 3, base_delay: float = 0.5) -> Any:
+def simple_backoff_retry(
+    fn: Callable[..., Any],
+    attempts: int = 3,
+    base_delay: float = 0.5,
+    deadline: Optional[RunDeadline] = None,
+) -> Any:
     """Call fn with simple exponential backoff. Returns fn() result or raises the last exception.
 
     This is intentionally simple: it retries on any Exception. The previous
     implementation allowed passing an exceptions tuple which made static typing
     unhappy; keeping a single Exception class keeps behavior predictable and
-    mypy-friendly.
+    mypy-friendly. An open circuit breaker or the run deadline is not retried: they fail fast.
+    Backoff sleeps are capped at the time left to `deadline` (the run's by
+    default); once it has passed, `DeadlineExceeded` is raised instead of retrying.
     """
+    deadline = deadline or get_run_deadline()
     last_exc: Exception | None = None
     for i in range(attempts):
         try:
             return fn()
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
         except Exception as e:
             last_exc = e
+            if i + 1 == attempts:
+                break
             delay = base_delay * (2 ** i)
-            time.sleep(delay)
+            try:
+                deadline.check()
+                time.sleep(deadline.cap(delay))
+                deadline.check()
+            except DeadlineExceeded as exc:
+                raise exc from e
     # Re-raise the last caught exception
     if last_exc is None:
         raise RuntimeError("simple_backoff_retry failed without capturing exception")
@@ -34,3 +57,37 @@ def simple_backoff_retry(fn: Callable[..., Any], attempts: int = 3, base_delay:
 def cache_key_for_sdmx(source: str, resource: str, key: str, start: str, end: str):
     payload = json.dumps({"source": source, "resource": resource, "key": key, "start": start, "end": end}, sort_keys=True, separators=(",", ":"))
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# provider period notations (WB '2020', '2020Q1', '2020M03'; SDMX '2020-Q1', '2020-03')
+_PERIOD_FREQ = (
+    ("A", re.compile(r"\d{4}")),
+    ("Q", re.compile(r"\d{4}-?Q[1-4]")),
+    ("M", re.compile(r"\d{4}-?M?(0[1-9]|1[0-2])")),
+)
+
+
+def period_freq(period: Any) -> Optional[str]:
+    """Frequency ('A', 'Q' or 'M') stated by a provider period string, else None.
+
+    Full dates such as '2020-03-31' state no frequency.
+    """
+    if period is None:
+        return None
+    text = str(period).strip().upper()
+    for freq, pattern in _PERIOD_FREQ:
+        if pattern.fullmatch(text):
+            return freq
+    return None
+
+
+def tag_freq(df: pd.DataFrame) -> pd.DataFrame:
+    """Add a `freq` column from the rows' period strings, in place.
+
+    Harmonization trusts the tag instead of inferring each series' frequency.
+    Called on the final frame, so record hashes are unaffected.
+    """
+    if not df.empty and "date" in df.columns:
+        uniq = pd.unique(df["date"].astype(object))
+        df["freq"] = df["date"].astype(object).map({d: period_freq(d) for d in uniq})
+    return df
@@ -0,0 +1,113 @@
+"""Event-loop driven fetch scheduling.
+
+`FetchLimits` bounds how many blocking requests are in flight at once: a
+global limit for the whole run plus optional per-source limits (e.g. keep the
+IMF at 2 concurrent calls while the WB gets 16). Fetchers' `afetch`
+implementations fan out across indicators x countries x pages and route every
+blocking call through `FetchLimits.run_blocking`, so a full-universe fetch is
+bounded by provider latency instead of the number of worker threads.
+
+`run_fetch_jobs` is the entry point used by `src.fetchers.orchestrator` when
+`runtime.fetch_engine == "async"`.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class FetchLimits:
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, per_source: Optional[Dict[str, int]] = None):
+        self.max_concurrency = max(1, int(max_concurrency or DEFAULT_MAX_CONCURRENCY))
+        self.per_source_limits = {str(k).upper(): max(1, int(v)) for k, v in (per_source or {}).items()}
+        self._global: Optional[asyncio.Semaphore] = None
+        self._per_source: Dict[str, asyncio.Semaphore] = {}
+        # blocking calls run here; sized to the global limit so the semaphore,
+        # not the executor, is what bounds concurrency
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="afetch")
+
+    @classmethod
+    def from_runtime(cls, runtime: Optional[Dict[str, Any]] = None) -> "FetchLimits":
+        runtime = runtime or {}
+        return cls(
+            max_concurrency=runtime.get("async_max_concurrency", DEFAULT_MAX_CONCURRENCY),
+            per_source=runtime.get("async_source_limits") or {},
+        )
+
+    def _global_sem(self) -> asyncio.Semaphore:
+        # semaphores are created lazily so they bind to the running loop
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.max_concurrency)
+        return self._global
+
+    def _source_sem(self, source: str) -> Optional[asyncio.Semaphore]:
+        key = str(source or "").upper()
+        limit = self.per_source_limits.get(key)
+        if limit is None:
+            return None
+        if key not in self._per_source:
+            self._per_source[key] = asyncio.Semaphore(limit)
+        return self._per_source[key]
+
+    @asynccontextmanager
+    async def slot(self, source: str):
+        src_sem = self._source_sem(source)
+        if src_sem is not None:
+            await src_sem.acquire()
+        try:
+            async with self._global_sem():
+                yield
+        finally:
+            if src_sem is not None:
+                src_sem.release()
+
+    async def run_blocking(self, source: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking call in the engine's executor once a slot is free."""
+        async with self.slot(source):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, lambda: fn(*args, **kwargs))
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+async def _gather_jobs(
+    jobs: List[Callable[[FetchLimits], Awaitable[Any]]], limits: FetchLimits, timeout: Optional[float] = None
+) -> List[Any]:
+    if timeout is None:
+        return await asyncio.gather(*(job(limits) for job in jobs), return_exceptions=True)
+    tasks = [asyncio.ensure_future(job(limits)) for job in jobs]
+    if not tasks:
+        return []
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for t in pending:
+        t.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    out: List[Any] = []
+    for t in tasks:
+        if t in pending or t.cancelled():
+            out.append(TimeoutError("job did not finish before the deadline"))
+        else:
+            out.append(t.exception() or t.result())
+    return out
+
+
+def run_fetch_jobs(
+    jobs: List[Callable[[FetchLimits], Awaitable[Any]]],
+    runtime: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+) -> List[Any]:
+    """Run coroutine factories concurrently on a fresh event loop.
+
+    Each job is called with the shared FetchLimits. Results are returned in job
+    order; a job that raised yields its exception instead of a result, and with
+    a `timeout` (seconds) jobs still running then are cancelled and yield a
+    `TimeoutError`.
+    """
+    limits = FetchLimits.from_runtime(runtime)
+    try:
+        return asyncio.run(_gather_jobs(jobs, limits, timeout))
+    finally:
+        limits.close()
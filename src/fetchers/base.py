@@ -1,6 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any, Tuple
+from contextlib import contextmanager
+from typing import List, Dict, Iterator, Optional, Any, Tuple
 import pandas as pd
+from .session import SessionPool, get_session_pool
+from .ratelimit import SourceLimiter, get_rate_limiters
+from .breaker import CircuitBreaker, get_circuit_breakers
+from .deadline import RunDeadline, get_run_deadline
+from .async_engine import FetchLimits
 
 
 class AbstractFetcher(ABC):
@@ -13,6 +19,48 @@ class AbstractFetcher(ABC):
     def __init__(self, runtime_config: Optional[Dict[str, Any]] = None):
         self.runtime: Dict[str, Any] = runtime_config or {}
 
+    @property
+    def session_pool(self) -> SessionPool:
+        """Process-wide pooled HTTP sessions shared by all fetchers of a run."""
+        return get_session_pool(self.runtime)
+
+    @property
+    def rate_limiter(self) -> SourceLimiter:
+        """Run-wide rate limiter of this fetcher's source."""
+        return get_rate_limiters(self.runtime).for_source(self.source)
+
+    @property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Run-wide circuit breaker of this fetcher's source."""
+        return get_circuit_breakers(self.runtime).for_source(self.source)
+
+    @property
+    def run_deadline(self) -> RunDeadline:
+        """Deadline of the run's fetch phase (`runtime.deadline_sec`)."""
+        return get_run_deadline(self.runtime)
+
+    @contextmanager
+    def request_slot(self) -> Iterator["_Request"]:
+        """Guard one provider request: fail fast after the run deadline or while
+        the source's breaker is open, and pace it by the rate limiter (waits
+        capped by the deadline). Call
+        `observe(response)` inside when there is an HTTP response."""
+        deadline = self.run_deadline
+        deadline.check()
+        with self.circuit_breaker.call() as call, self.rate_limiter.slot(deadline) as slot:
+            yield _Request(call, slot)
+
+    def http_get(self, url: str, **kwargs):
+        """GET through the shared keep-alive session for the URL's host, guarded
+        by `request_slot`; the timeout is capped at the time left to the deadline."""
+        with self.request_slot() as req:
+            timeout = self.run_deadline.cap(kwargs.get("timeout"))
+            if timeout is not None:
+                kwargs["timeout"] = max(0.01, timeout)
+            r = self.session_pool.get(url, **kwargs)
+            req.observe(r)
+        return r
+
     @abstractmethod
     def fetch(
         self,
@@ -28,3 +76,37 @@ class AbstractFetcher(ABC):
         of dicts with canonical fetch metadata.
         """
         pass
+
+    async def afetch(
+        self,
+        countries: List[str],
+        indicators: List[Dict],
+        start: str,
+        end: str,
+        freq: str,
+        limits: Optional[FetchLimits] = None,
+    ) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """Async variant of `fetch` with the same (df, fetch_logs) contract.
+
+        The default runs the blocking `fetch` in the engine's executor under the
+        global and per-source limits. Fetchers that can split their work into
+        independent requests override this to fan out inside the event loop.
+        """
+        own_limits = limits is None
+        lim = limits or FetchLimits.from_runtime(self.runtime)
+        try:
+            return await lim.run_blocking(
+                self.source, self.fetch, countries, indicators, start, end, freq
+            )
+        finally:
+            if own_limits:
+                lim.executor.shutdown(wait=False)
+
+
+class _Request:
+    def __init__(self, *observers):
+        self._observers = observers
+
+    def observe(self, r) -> None:
+        for o in self._observers:
+            o.observe(r)
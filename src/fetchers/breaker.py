@@ -0,0 +1,230 @@
+"""Per-source circuit breakers.
+
+A provider that is down makes every fetch task of a run retry with growing
+sleeps before it gives up. One `CircuitBreaker` per source, shared by all
+fetcher instances and worker threads, stops that:
+
+- closed: requests pass; `failure_threshold` consecutive failures (transport
+  errors such as refused connections and timeouts, 429/5xx) open the
+  breaker. Other errors (cancellation, the run deadline, a payload that
+  does not parse) say nothing about the provider and are not counted;
+- open: requests fail at once with `CircuitOpenError` (the fetchers log the
+  error and the pipeline falls back to stale cache entries where it has them);
+- half-open: after `reset_timeout_sec` one trial request is let through; its
+  success closes the breaker, its failure opens it again.
+
+Settings come from `runtime.breaker_failure_threshold` (0 disables) and
+`runtime.breaker_reset_sec`. Every state change is kept and reported by
+`stats()` for the run manifest.
+"""
+import http.client
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import requests  # type: ignore
+
+from .ratelimit import is_throttled
+
+# errors raised when a provider cannot be reached or does not answer in time
+TRANSPORT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    http.client.HTTPException,
+    ConnectionError,
+    TimeoutError,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while a source's breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        source: str,
+        failure_threshold: int = 5,
+        reset_timeout_sec: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.source = source
+        self.failure_threshold = max(0, int(failure_threshold or 0))
+        self.reset_timeout_sec = float(reset_timeout_sec)
+        self._clock = clock
+        self.state = CLOSED
+        # consecutive failures while closed
+        self.failures = 0
+        self.rejected = 0
+        self.transitions: List[Dict[str, Any]] = []
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    def _move(self, to: str, reason: str) -> None:
+        self.transitions.append(
+            {
+                "from": self.state,
+                "to": to,
+                "at": datetime.now(timezone.utc).isoformat(),
+                "reason": reason,
+            }
+        )
+        self.state = to
+        if to == OPEN:
+            self._opened_at = self._clock()
+        self._trial = False
+
+    def allow(self) -> bool:
+        """True if a request may be sent now (claims the trial slot when half-open)."""
+        if not self.enabled:
+            return True
+        with self._lock:
+            if self.state == OPEN and self._clock() - self._opened_at >= self.reset_timeout_sec:
+                self._move(HALF_OPEN, f"{self.reset_timeout_sec:g}s elapsed")
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            if self.state != CLOSED:
+                self._move(CLOSED, "trial request succeeded")
+
+    def release(self) -> None:
+        """End a request that neither succeeded nor failed (frees the trial slot)."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial = False
+
+    def record_failure(self, reason: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._move(OPEN, f"trial request failed: {reason}")
+                return
+            self.failures += 1
+            if self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._move(OPEN, f"{self.failures} consecutive failures, last: {reason}")
+
+    @contextmanager
+    def call(self) -> Iterator["_Call"]:
+        """Guard one request; call `c.observe(response)` before leaving.
+
+        Raises `CircuitOpenError` without running the block while open.
+        Transport errors count as failures, as do 429/5xx responses; other
+        exceptions leave the failure count alone.
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"{self.source} circuit breaker is open")
+        c = _Call()
+        try:
+            yield c
+        except BaseException as e:
+            response = getattr(e, "response", None)
+            if response is not None:
+                c.observe(response)
+            if is_throttled(c.status) or (
+                response is None and isinstance(e, TRANSPORT_ERRORS)
+            ):
+                self.record_failure(f"{type(e).__name__}: {e}")
+            elif response is not None:
+                self.record_success()
+            else:
+                self.release()
+            raise
+        if is_throttled(c.status):
+            self.record_failure(f"HTTP {c.status}")
+        else:
+            self.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "rejected": self.rejected,
+                "transitions": list(self.transitions),
+            }
+
+
+class _Call:
+    def __init__(self):
+        self.status: Optional[int] = None
+
+    def observe(self, r) -> None:
+        self.status = getattr(r, "status_code", None)
+
+
+class CircuitBreakers:
+    def __init__(self, failure_threshold: int = 5, reset_timeout_sec: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_sec = reset_timeout_sec
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_runtime(cls, runtime: Optional[Dict[str, Any]] = None) -> "CircuitBreakers":
+        runtime = runtime or {}
+        threshold = runtime.get("breaker_failure_threshold")
+        reset = runtime.get("breaker_reset_sec")
+        return cls(5 if threshold is None else threshold, 60.0 if reset is None else reset)
+
+    def for_source(self, source: str) -> CircuitBreaker:
+        key = str(source or "").upper()
+        with self._lock:
+            b = self._breakers.get(key)
+            if b is None:
+                b = CircuitBreaker(key, self.failure_threshold, self.reset_timeout_sec)
+                self._breakers[key] = b
+            return b
+
+    def is_tripped(self, source: str) -> bool:
+        """True while the source's breaker is open or half-open."""
+        with self._lock:
+            b = self._breakers.get(str(source or "").upper())
+        return b is not None and b.state != CLOSED
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """State, rejected requests and state transitions per source."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {k: b.stats() for k, b in sorted(breakers.items())}
+
+
+_breakers: Optional[CircuitBreakers] = None
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breakers(runtime: Optional[Dict[str, Any]] = None) -> CircuitBreakers:
+    """Return the shared breakers, creating them from `runtime` on first use."""
+    global _breakers
+    with _breakers_lock:
+        if _breakers is None:
+            _breakers = CircuitBreakers.from_runtime(runtime)
+        return _breakers
+
+
+def reset_circuit_breakers(runtime: Optional[Dict[str, Any]] = None) -> CircuitBreakers:
+    """Start closed breakers (and empty transition logs) for a new run."""
+    global _breakers
+    with _breakers_lock:
+        _breakers = CircuitBreakers.from_runtime(runtime)
+        return _breakers
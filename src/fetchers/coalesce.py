@@ -0,0 +1,72 @@
+"""Run-scoped de-duplication of identical fetch requests.
+
+Several indicator ids may map to the same provider series, and every plugin
+wraps its own fetcher instance, so one run can ask for the same
+(source, code, countries, period) more than once. `RequestCoalescer` keys
+each request; the first caller performs it and every identical request of
+the run, concurrent or later, shares its future. Requests that raised are
+forgotten so that a later identical request retries.
+
+`run` serves threads (the "threads" engine); `arun` serves coroutines (the
+"async" engine) and awaits the same futures without blocking the loop.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class RequestCoalescer:
+    def __init__(self):
+        self._futures: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.coalesced = 0
+
+    def _claim(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            fut = self._futures.get(key)
+            if fut is not None:
+                self.coalesced += 1
+                return fut, False
+            fut = Future()
+            self._futures[key] = fut
+            self.requests += 1
+            return fut, True
+
+    def _failed(self, key: Hashable, fut: Future, e: BaseException) -> None:
+        with self._lock:
+            if self._futures.get(key) is fut:
+                del self._futures[key]
+        fut.set_exception(e)
+
+    def run(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Return `fn(*args, **kwargs)`, or the result of the identical request
+        already made (or in flight) under `key`."""
+        fut, owner = self._claim(key)
+        if not owner:
+            return fut.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._failed(key, fut, e)
+            raise
+        fut.set_result(result)
+        return result
+
+    async def arun(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Async `run`: `factory()` is awaited only by the first caller."""
+        fut, owner = self._claim(key)
+        if not owner:
+            return await asyncio.wrap_future(fut)
+        try:
+            result = await factory()
+        except BaseException as e:
+            self._failed(key, fut, e)
+            raise
+        fut.set_result(result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"requests": self.requests, "coalesced": self.coalesced}
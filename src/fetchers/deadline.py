@@ -0,0 +1,80 @@
+"""Run-wide fetch deadline.
+
+`runtime.deadline_sec` bounds the wall-clock time of the fetch phase. The
+main loop stops waiting for fetch jobs when it passes; this module makes the
+jobs still running stop as well: once expired, every provider request raises
+`DeadlineExceeded` before it is sent, request timeouts and retry sleeps are
+capped at the time left, and retry helpers do not retry it.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+DEADLINE_ERROR = "run deadline exceeded"
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of sending a request after the run deadline."""
+
+
+class RunDeadline:
+    def __init__(self, seconds: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.seconds = float(seconds) if seconds else None
+        self._clock = clock
+        self.started = clock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.seconds is not None
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None without a deadline."""
+        if self.seconds is None:
+            return None
+        return max(0.0, self.seconds - self.elapsed())
+
+    @property
+    def expired(self) -> bool:
+        return self.seconds is not None and self.elapsed() >= self.seconds
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"{DEADLINE_ERROR} ({self.seconds:g}s)")
+
+    def cap(self, seconds: Optional[float]) -> Optional[float]:
+        """`seconds` (a timeout or sleep) shortened to the time left."""
+        left = self.remaining()
+        if left is None:
+            return seconds
+        return left if seconds is None else min(seconds, left)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "deadline_sec": self.seconds,
+            "elapsed_sec": round(self.elapsed(), 3),
+            "expired": self.expired,
+        }
+
+
+_deadline: Optional[RunDeadline] = None
+_deadline_lock = threading.Lock()
+
+
+def get_run_deadline(runtime: Optional[Dict[str, Any]] = None) -> RunDeadline:
+    """Return the run's deadline, starting one from `runtime` on first use."""
+    global _deadline
+    with _deadline_lock:
+        if _deadline is None:
+            _deadline = RunDeadline((runtime or {}).get("deadline_sec"))
+        return _deadline
+
+
+def reset_run_deadline(runtime: Optional[Dict[str, Any]] = None) -> RunDeadline:
+    """Start the deadline clock of a new run."""
+    global _deadline
+    with _deadline_lock:
+        _deadline = RunDeadline((runtime or {}).get("deadline_sec"))
+        return _deadline
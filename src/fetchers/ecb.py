@@ -7,6 +7,9 @@ import logging
 from typing import List, Dict
 import pandas as pd
 from .base import AbstractFetcher
+from ._utils import tag_freq
+from .sdmx_keys import plan_requests, records_by_country
+from .sdmx_stream import fetch_records
 
 
 class ECBFetcher(AbstractFetcher):
@@ -22,114 +25,142 @@ class ECBFetcher(AbstractFetcher):
     ):
         logger = logging.getLogger(__name__)
         fetch_logs: list[dict] = []
-        # Try pandasdmx first
+        parser = self.runtime.get("sdmx_parser") or "pandasdmx"
+        # the streaming parsers do not need pandasdmx
         try:
             import pandasdmx as sdmx
         except Exception:
-            logger.warning(
-                "pandasdmx not available, ECB fetcher returns empty DataFrame"
-            )
-            return (
-                pd.DataFrame(
-                    columns=["source", "indicator", "country", "date", "value"]
-                ),
-                fetch_logs,
-            )
+            if parser == "pandasdmx":
+                logger.warning(
+                    "pandasdmx not available, ECB fetcher returns empty DataFrame"
+                )
+                return (
+                    pd.DataFrame(
+                        columns=["source", "indicator", "country", "date", "value"]
+                    ),
+                    fetch_logs,
+                )
 
         rows: list[dict] = []
-        client = sdmx.Request("ECB")
+        client = sdmx.Request("ECB") if parser == "pandasdmx" else None
+        if client is not None:
+            self.session_pool.mount(getattr(client, "session", None))
         from src.io.artifacts import sha256_of_records
         from datetime import datetime, timezone
 
-        for ind in indicators:
+        for req in plan_requests("ECB", countries, indicators):
+            # status, timing and payload hash of the streamed response
+            http_meta = None
+            url = f"sdmx://ECB/{req.resource}" + (f"/{req.key}" if req.key else "")
             try:
-                res = client.data(
-                    resource_id=ind.get("code"),
-                    startPeriod=start[:4],
-                    endPeriod=end[:4],
-                )
-                pulled = []
-                if res and getattr(res, "data", None):
-                    for series in res.data.series:
-                        country = None
-                        try:
-                            country = series.dimensions.get(
-                                "REF_AREA"
-                            ) or series.dimensions.get("COUNTRY")
-                        except Exception:
+                if parser != "pandasdmx":
+                    pulled, http_meta = fetch_records(self, req, start, end, parser, ("REF_AREA", "COUNTRY"))
+                    url = http_meta["url"]
+                    for recs in pulled.values():
+                        rows.extend(recs)
+                else:
+                    with self.request_slot():
+                        res = client.data(
+                            resource_id=req.resource,
+                            key=req.key,
+                            startPeriod=start[:4],
+                            endPeriod=end[:4],
+                        )
+                    # pulled records per indicator id of the request
+                    pulled = {ind.get("id"): [] for ind in req.indicators}
+                    if res and getattr(res, "data", None):
+                        for series in res.data.series:
+                            ind = req.indicator_for(series)
+                            if ind is None:
+                                continue
                             country = None
-                        for obs in series.observations:
                             try:
-                                rec = {
-                                    "source": "ECB",
-                                    "indicator": ind["id"],
-                                    "country": country,
-                                    "date": obs.index,
-                                    "value": obs.value,
-                                }
-                                rows.append(rec)
-                                pulled.append(rec)
+                                country = series.dimensions.get(
+                                    "REF_AREA"
+                                ) or series.dimensions.get("COUNTRY")
                             except Exception:
-                                continue
-                try:
-                    sha_raw = None
-                    try:
-                        import json
-                        import hashlib
+                                country = None
+                            for obs in series.observations:
+                                try:
+                                    rec = {
+                                        "source": "ECB",
+                                        "indicator": ind["id"],
+                                        "country": country,
+                                        "date": obs.index,
+                                        "value": obs.value,
+                                    }
+                                    rows.append(rec)
+                                    pulled[ind.get("id")].append(rec)
+                                except Exception:
+                                    continue
+                for ind in req.indicators:
+                    # one log per returned series: a multi-value key answers
+                    # for several countries
+                    by_country = records_by_country(pulled[ind.get("id")])
+                    for country, recs in by_country.items():
+                        try:
+                            sha_raw = None
+                            try:
+                                import json
+                                import hashlib
 
-                        canonical = json.dumps(
-                            pulled,
-                            sort_keys=True,
-                            separators=(",", ":"),
-                            ensure_ascii=False,
-                        ).encode("utf-8")
-                        sha_raw = hashlib.sha256(canonical).hexdigest()
-                    except Exception:
-                        sha_raw = None
-                    sha_norm = sha256_of_records(pulled)
+                                canonical = json.dumps(
+                                    recs,
+                                    sort_keys=True,
+                                    separators=(",", ":"),
+                                    ensure_ascii=False,
+                                ).encode("utf-8")
+                                sha_raw = hashlib.sha256(canonical).hexdigest()
+                            except Exception:
+                                sha_raw = None
+                            if http_meta is not None:
+                                sha_raw = http_meta["sha256_raw"]
+                            sha_norm = sha256_of_records(recs)
+                            fetch_logs.append(
+                                {
+                                    "request_url": url,
+                                    "params": {
+                                        "code": ind.get("code"),
+                                        "key": req.key,
+                                        "start": start,
+                                        "end": end,
+                                    },
+                                    "http_status": http_meta["status_code"] if http_meta else 200,
+                                    "response_time_ms": http_meta["response_time_ms"] if http_meta else 0,
+                                    "rows": len(recs),
+                                    "sha256_raw": sha_raw,
+                                    "sha256_normalized": sha_norm,
+                                    "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
+                                    "indicator": ind.get("id"),
+                                    "country": country,
+                                    "api_meta": {"resource": req.resource},
+                                    "no_backfill": False,
+                                }
+                            )
+                        except Exception:
+                            # continue gracefully on metadata/hash failures
+                            pass
+            except Exception as e:
+                logger.debug(f"ECB fetch error for {url}: {e}")
+                from datetime import datetime, timezone
+                for ind in req.indicators:
                     fetch_logs.append(
                         {
-                            "request_url": f"sdmx://ECB/{ind.get('code')}",
-                            "params": {
-                                "code": ind.get("code"),
-                                "start": start,
-                                "end": end,
-                            },
-                            "http_status": 200,
+                            "request_url": url,
+                            "params": {"code": ind.get("code"), "key": req.key, "start": start, "end": end},
+                            "http_status": None,
                             "response_time_ms": 0,
-                            "rows": len(pulled),
-                            "sha256_raw": sha_raw,
-                            "sha256_normalized": sha_norm,
+                            "rows": 0,
+                            "sha256_raw": None,
+                            "sha256_normalized": None,
                             "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
                             "indicator": ind.get("id"),
-                            "country": pulled[0].get("country") if pulled else None,
-                            "api_meta": {"resource": ind.get("code")},
+                            "country": None,
+                            "api_meta": {"resource": req.resource},
                             "no_backfill": False,
+                            "error": str(e),
                         }
                     )
-                except Exception:
-                    # continue gracefully on metadata/hash failures
-                    pass
-            except Exception as e:
-                logger.debug(f"ECB fetch error for {ind}: {e}")
-                from datetime import datetime, timezone
-                fetch_logs.append(
-                    {
-                        "request_url": f"sdmx://ECB/{ind.get('code')}",
-                        "params": {"code": ind.get("code"), "start": start, "end": end},
-                        "http_status": None,
-                        "response_time_ms": 0,
-                        "rows": 0,
-                        "sha256_raw": None,
-                        "sha256_normalized": None,
-                        "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
-                        "indicator": ind.get("id"),
-                        "country": None,
-                        "api_meta": {"resource": ind.get('code')},
-                        "no_backfill": False,
-                        "error": str(e),
-                    }
-                )
 
         if not rows:
             return (
@@ -138,4 +169,4 @@ class ECBFetcher(AbstractFetcher):
                 ),
                 fetch_logs,
             )
-        return pd.DataFrame(rows), fetch_logs
+        return tag_freq(pd.DataFrame(rows)), fetch_logs
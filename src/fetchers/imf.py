@@ -1,11 +1,13 @@
 """IMF fetcher using pandasdmx (SDMX REST). If pandasdmx is not available, returns empty df."""
 
 import logging
-from typing import List, Dict
+from typing import Any, Dict, List, Optional
 import pandas as pd
 from .base import AbstractFetcher
 from src.io import cache as io_cache
-from ._utils import simple_backoff_retry, cache_key_for_sdmx, time_ms
+from ._utils import simple_backoff_retry, cache_key_for_sdmx, tag_freq, time_ms
+from .sdmx_keys import plan_requests, records_by_country
+from .sdmx_stream import fetch_records
 
 
 class IMFFetcher(AbstractFetcher):
@@ -31,60 +33,67 @@ class IMFFetcher(AbstractFetcher):
         fetch_logs: list[dict] = []
         rows: list[dict] = []
 
-        # Try to import pandasdmx; if not present, return empty but well-formed logs
-        try:
-            import pandasdmx as sdmx
-        except Exception:
-            logger.debug("pandasdmx not available; IMF fetcher skipped")
-            # create canonical empty fetch entries for each indicator
-            from datetime import datetime, timezone
-
-            for ind in indicators:
-                fetch_logs.append(
-                    {
-                        "request_url": f"sdmx://IMF/IFS?series={ind.get('code')}",
-                        "params": {"key": ind.get("code"), "start": start, "end": end},
-                        "http_status": None,
-                        "response_time_ms": 0,
-                        "rows": 0,
-                        "sha256_raw": None,
-                        "sha256_normalized": None,
-                        "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
-                        "indicator": ind.get("id"),
-                        "country": None,
-                        "api_meta": {"resource": "IFS"},
-                        "no_backfill": False,
-                        "error": "pandasdmx_missing",
-                    }
-                )
-            return pd.DataFrame(columns=["source", "indicator", "country", "date", "value"]), fetch_logs
-
-        # create client lazily with retry
-        try:
-            client = simple_backoff_retry(lambda: sdmx.Request("IMF"), attempts=2, base_delay=0.2)
-        except Exception as e:
-            logger.debug(f"pandasdmx client creation failed: {e}")
-            from datetime import datetime, timezone
-
-            for ind in indicators:
-                fetch_logs.append(
-                    {
-                        "request_url": f"sdmx://IMF/IFS?series={ind.get('code')}",
-                        "params": {"key": ind.get("code"), "start": start, "end": end},
-                        "http_status": None,
-                        "response_time_ms": 0,
-                        "rows": 0,
-                        "sha256_raw": None,
-                        "sha256_normalized": None,
-                        "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
-                        "indicator": ind.get("id"),
-                        "country": None,
-                        "api_meta": {"resource": "IFS"},
-                        "no_backfill": False,
-                        "error": "client_creation_failed",
-                    }
+        parser = self.runtime.get("sdmx_parser") or "pandasdmx"
+        client = None
+        # the streaming parsers do not need pandasdmx
+        if parser == "pandasdmx":
+            # Try to import pandasdmx; if not present, return empty but well-formed logs
+            try:
+                import pandasdmx as sdmx
+            except Exception:
+                logger.debug("pandasdmx not available; IMF fetcher skipped")
+                # create canonical empty fetch entries for each indicator
+                from datetime import datetime, timezone
+
+                for ind in indicators:
+                    fetch_logs.append(
+                        {
+                            "request_url": f"sdmx://IMF/IFS?series={ind.get('code')}",
+                            "params": {"key": ind.get("code"), "start": start, "end": end},
+                            "http_status": None,
+                            "response_time_ms": 0,
+                            "rows": 0,
+                            "sha256_raw": None,
+                            "sha256_normalized": None,
+                            "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
+                            "indicator": ind.get("id"),
+                            "country": None,
+                            "api_meta": {"resource": "IFS"},
+                            "no_backfill": False,
+                            "error": "pandasdmx_missing",
+                        }
+                    )
+                return pd.DataFrame(columns=["source", "indicator", "country", "date", "value"]), fetch_logs
+
+            # create client lazily with retry
+            try:
+                client = simple_backoff_retry(
+                    lambda: sdmx.Request("IMF"), attempts=2, base_delay=0.2, deadline=self.run_deadline
                 )
-            return pd.DataFrame(columns=["source", "indicator", "country", "date", "value"]), fetch_logs
+                self.session_pool.mount(getattr(client, "session", None))
+            except Exception as e:
+                logger.debug(f"pandasdmx client creation failed: {e}")
+                from datetime import datetime, timezone
+
+                for ind in indicators:
+                    fetch_logs.append(
+                        {
+                            "request_url": f"sdmx://IMF/IFS?series={ind.get('code')}",
+                            "params": {"key": ind.get("code"), "start": start, "end": end},
+                            "http_status": None,
+                            "response_time_ms": 0,
+                            "rows": 0,
+                            "sha256_raw": None,
+                            "sha256_normalized": None,
+                            "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
+                            "indicator": ind.get("id"),
+                            "country": None,
+                            "api_meta": {"resource": "IFS"},
+                            "no_backfill": False,
+                            "error": "client_creation_failed",
+                        }
+                    )
+                return pd.DataFrame(columns=["source", "indicator", "country", "date", "value"]), fetch_logs
 
         # Process each indicator: check cache -> fetch -> emit logs
         from src.io.artifacts import sha256_of_records
@@ -96,9 +105,8 @@ class IMFFetcher(AbstractFetcher):
         except Exception:
             mapping = {}
 
-        for ind in indicators:
-            code = ind.get("code")
-            key = cache_key_for_sdmx("IMF", "IFS", code or "", start[:4], end[:4])
+        for req in plan_requests("IMF", countries, indicators):
+            key = cache_key_for_sdmx("IMF", req.resource, req.key or "", start[:4], end[:4])
             cached = io_cache.cache_get(key, ttl_hours=24)
             if cached:
                 # cached is dict with 'records' and 'fetch_logs'
@@ -110,97 +118,129 @@ class IMFFetcher(AbstractFetcher):
 
             # not cached -> perform network fetch
             start_ms = time_ms()
-            pulled = []
+            # pulled records per indicator id of the request
+            pulled: Dict[str, list] = {ind.get("id"): [] for ind in req.indicators}
+            # status, timing and payload hash of the streamed response
+            http_meta: Optional[Dict[str, Any]] = None
             try:
-                def _do_fetch():
-                    return client.data(resource_id="IFS", key=code, startPeriod=start[:4], endPeriod=end[:4])
-
-                res = simple_backoff_retry(_do_fetch, attempts=3, base_delay=0.3)
-
-                if res and getattr(res, "data", None):
-                    for series in res.data.series:
-                        country = None
-                        try:
-                            # series.dimensions may be a dict-like mapping
-                            country = series.dimensions.get("REF_AREA") or series.dimensions.get("COUNTRY")
-                        except Exception:
+                if parser != "pandasdmx":
+                    pulled, http_meta = simple_backoff_retry(
+                        lambda: fetch_records(self, req, start, end, parser, ("REF_AREA", "COUNTRY")),
+                        attempts=3,
+                        base_delay=0.3,
+                        deadline=self.run_deadline,
+                    )
+                    for recs in pulled.values():
+                        rows.extend(recs)
+                else:
+                    def _do_fetch():
+                        with self.request_slot():
+                            return client.data(
+                                resource_id=req.resource, key=req.key, startPeriod=start[:4], endPeriod=end[:4]
+                            )
+
+                    res = simple_backoff_retry(_do_fetch, attempts=3, base_delay=0.3, deadline=self.run_deadline)
+
+                    if res and getattr(res, "data", None):
+                        for series in res.data.series:
+                            ind = req.indicator_for(series)
+                            if ind is None:
+                                continue
                             country = None
-                        for obs in series.observations:
                             try:
-                                val = obs.value
-                                dt = obs.index
+                                # series.dimensions may be a dict-like mapping
+                                country = series.dimensions.get("REF_AREA") or series.dimensions.get("COUNTRY")
                             except Exception:
-                                continue
-                            rec = {"source": "IMF", "indicator": ind.get("id"), "country": country, "date": dt, "value": val}
-                            rows.append(rec)
-                            pulled.append(rec)
+                                country = None
+                            for obs in series.observations:
+                                try:
+                                    val = obs.value
+                                    dt = obs.index
+                                except Exception:
+                                    continue
+                                rec = {"source": "IMF", "indicator": ind.get("id"), "country": country, "date": dt, "value": val}
+                                rows.append(rec)
+                                pulled[ind.get("id")].append(rec)
 
                 response_time = time_ms() - start_ms
-                sha_raw = None
-                try:
-                    import json as _json
-                    import hashlib as _hashlib
-
-                    canonical = _json.dumps(pulled, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
-                    sha_raw = _hashlib.sha256(canonical).hexdigest()
-                except Exception:
-                    sha_raw = None
-
-                try:
-                    sha_norm = sha256_of_records(pulled)
-                except Exception:
-                    sha_norm = None
-
-                # resolved indicator id via mapping if available
-                mapped_ind = None
-                try:
-                    mapped_ind = lookup_indicator(mapping, 'IMF', 'IFS', str(code or "")) if mapping else None
-                except Exception:
+                entries = []
+                for ind in req.indicators:
+                    code = ind.get("code")
+                    # resolved indicator id via mapping if available
                     mapped_ind = None
+                    try:
+                        mapped_ind = lookup_indicator(mapping, 'IMF', req.resource, str(code or "")) if mapping else None
+                    except Exception:
+                        mapped_ind = None
+
+                    # one log per returned series: a multi-value key answers
+                    # for several countries
+                    for country, recs in records_by_country(pulled[ind.get("id")]).items():
+                        sha_raw = None
+                        try:
+                            import json as _json
+                            import hashlib as _hashlib
 
-                entry = {
-                    "request_url": f"sdmx://IMF/IFS?series={code}",
-                    "params": {"key": code, "start": start, "end": end},
-                    "http_status": 200,
-                    "response_time_ms": int(response_time),
-                    "rows": len(pulled),
-                    "sha256_raw": sha_raw,
-                    "sha256_normalized": sha_norm,
-                    "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
-                    "indicator": mapped_ind or ind.get("id"),
-                    "country": pulled[0].get("country") if pulled else None,
-                    "api_meta": {"resource": "IFS"},
-                    "no_backfill": False,
-                }
-                fetch_logs.append(entry)
+                            canonical = _json.dumps(recs, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+                            sha_raw = _hashlib.sha256(canonical).hexdigest()
+                        except Exception:
+                            sha_raw = None
+                        if http_meta is not None:
+                            sha_raw = http_meta["sha256_raw"]
+
+                        try:
+                            sha_norm = sha256_of_records(recs)
+                        except Exception:
+                            sha_norm = None
+
+                        entries.append(
+                            {
+                                "request_url": http_meta["url"] if http_meta else f"sdmx://IMF/{req.resource}?series={req.key}",
+                                "params": {"key": req.key, "start": start, "end": end},
+                                "http_status": http_meta["status_code"] if http_meta else 200,
+                                "response_time_ms": int(http_meta["response_time_ms"] if http_meta else response_time),
+                                "rows": len(recs),
+                                "sha256_raw": sha_raw,
+                                "sha256_normalized": sha_norm,
+                                "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
+                                "indicator": mapped_ind or ind.get("id"),
+                                "country": country,
+                                "api_meta": {"resource": req.resource, "series": code},
+                                "no_backfill": False,
+                            }
+                        )
+                fetch_logs.extend(entries)
 
                 # cache the pulled records and fetch_logs
                 try:
-                    io_cache.cache_set(key, {"records": pulled, "fetch_logs": [entry]}, ttl_hours=24)
+                    io_cache.cache_set(
+                        key, {"records": [r for recs in pulled.values() for r in recs], "fetch_logs": entries}, ttl_hours=24
+                    )
                 except Exception:
                     logger.debug("cache_set failed, continuing")
 
             except Exception as e:
-                logger.debug(f"IMF fetch error for {ind}: {e}")
+                logger.debug(f"IMF fetch error for {req.key}: {e}")
                 response_time = time_ms() - start_ms
-                fetch_logs.append(
-                    {
-                        "request_url": f"sdmx://IMF/IFS?series={code}",
-                        "params": {"key": code, "start": start, "end": end},
-                        "http_status": None,
-                        "response_time_ms": int(response_time),
-                        "rows": 0,
-                        "sha256_raw": None,
-                        "sha256_normalized": None,
-                        "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
-                        "indicator": ind.get("id"),
-                        "country": None,
-                        "api_meta": {"resource": "IFS"},
-                        "no_backfill": False,
-                        "error": str(e),
-                    }
-                )
+                for ind in req.indicators:
+                    fetch_logs.append(
+                        {
+                            "request_url": f"sdmx://IMF/{req.resource}?series={req.key}",
+                            "params": {"key": req.key, "start": start, "end": end},
+                            "http_status": None,
+                            "response_time_ms": int(response_time),
+                            "rows": 0,
+                            "sha256_raw": None,
+                            "sha256_normalized": None,
+                            "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
+                            "indicator": ind.get("id"),
+                            "country": None,
+                            "api_meta": {"resource": req.resource, "series": ind.get("code")},
+                            "no_backfill": False,
+                            "error": str(e),
+                        }
+                    )
 
         if not rows:
             return pd.DataFrame(columns=["source", "indicator", "country", "date", "value"]), fetch_logs
-        return pd.DataFrame(rows), fetch_logs
+        return tag_freq(pd.DataFrame(rows)), fetch_logs
@@ -0,0 +1,190 @@
+"""Incremental (tail) refresh of cached series.
+
+Instead of re-downloading `period.start`–`period.end` for a series that is
+already cached, only the window after its last cached observation is
+requested, widened by a revision overlap of a few periods of the series' own
+frequency so that revised recent values are picked up. The fresh tail replaces the cached rows from the
+window start onwards; differences on overlapping dates are reported as
+revisions in the fetch log, and its `sha256_normalized` is recomputed over
+the merged series so that it describes what the cache entry holds.
+"""
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+from src.io.artifacts import sha256_of_records
+from src.fetchers._utils import period_freq
+from src.processing.harmonize import iso_to_iso3, parse_dates
+
+# months per period for the configured frequency
+_FREQ_MONTHS = {"A": 12, "Q": 3, "M": 1}
+
+
+def period_starts(dates: pd.Series) -> pd.Series:
+    """Start timestamp of each period string ('2020', '2020Q1', '2020-Q1',
+    '2020M03', '2020-03', ...), decoded like `parse_dates`."""
+    return parse_dates(dates.to_frame("date"))["date"]
+
+
+def window_start(last_obs: pd.Timestamp, overlap_periods: int, freq: str, period_start: str) -> str:
+    """First date to request: `overlap_periods` periods before the last cached
+    observation, but never before the configured period start."""
+    months = _FREQ_MONTHS.get(str(freq or "A").upper()[:1], 12) * max(0, int(overlap_periods))
+    start = last_obs - pd.DateOffset(months=months)
+    return max(start, pd.Timestamp(period_start)).strftime("%Y-%m-%d")
+
+
+def series_freq(df: pd.DataFrame, starts: pd.Series, default: str) -> str:
+    """Frequency of a cached series at its last observation: the row's `freq`
+    tag, else the frequency its period string states, else `default`."""
+    last = starts.idxmax()
+    tag = df.at[last, "freq"] if "freq" in df.columns else None
+    if isinstance(tag, str) and tag:
+        return tag
+    return period_freq(df.at[last, "date"]) or default
+
+
+def plan_windows(
+    cached: Dict[str, pd.DataFrame],
+    overlap_periods: int,
+    freq: str,
+    period_start: str,
+) -> Dict[str, List[str]]:
+    """Group cached countries by tail window start (one request per group).
+
+    The overlap counts periods of each series' own frequency (`series_freq`);
+    `freq`, the pipeline's target frequency, is used only for series whose
+    rows state none. Countries whose cached series has no usable observation
+    are left out and need a full fetch.
+    """
+    plan: Dict[str, List[str]] = {}
+    for country, df in cached.items():
+        if df is None or df.empty or "date" not in df.columns:
+            continue
+        starts = period_starts(df["date"])
+        if starts.isna().all():
+            continue
+        own = series_freq(df, starts, freq)
+        start = window_start(starts.max(), overlap_periods, own, period_start)
+        plan.setdefault(start, []).append(country)
+    return plan
+
+
+def _norm(code: Any) -> str:
+    try:
+        return iso_to_iso3(str(code))
+    except Exception:
+        return str(code).upper()
+
+
+def _same(a: Any, b: Any) -> bool:
+    if pd.isna(a) and pd.isna(b):
+        return True
+    try:
+        return abs(float(a) - float(b)) <= 1e-9 * max(1.0, abs(float(a)))
+    except (TypeError, ValueError):
+        return a == b
+
+
+def _plain(v: Any) -> Any:
+    if v is None or (not isinstance(v, str) and pd.isna(v)):
+        return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return str(v)
+
+
+def _sha_normalized(df: pd.DataFrame) -> Any:
+    """`sha256_normalized` of rows, hashed as the fetchers hash their records."""
+    if df.empty:
+        return sha256_of_records([])
+    return sha256_of_records(
+        {"indicator": i, "country": c, "date": None if pd.isna(d) else str(d), "value": _plain(v)}
+        for i, c, d, v in zip(df["indicator"], df["country"], df["date"], df["value"])
+    )
+
+
+def merge_tail(cached: pd.DataFrame, fresh: pd.DataFrame, start: str) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Replace the cached rows from `start` onwards with the fresh tail.
+
+    Returns (merged rows, revisions) where each revision is
+    {"date", "old", "new"} for an overlapping date whose value changed
+    (`new` is None when the observation disappeared upstream).
+    """
+    cut = pd.Timestamp(start)
+    kept = cached[period_starts(cached["date"]) < cut] if not cached.empty else cached
+    overlap = cached[period_starts(cached["date"]) >= cut] if not cached.empty else cached
+    # providers may answer with whole years around the window; keep its part only
+    if not fresh.empty:
+        fresh = fresh[period_starts(fresh["date"]) >= cut]
+    fresh_values = dict(zip(fresh["date"].astype(str), fresh["value"])) if not fresh.empty else {}
+    revisions = []
+    for date, old in zip(overlap["date"].astype(str), overlap["value"]):
+        new = fresh_values.get(date)
+        if new is None or not _same(old, new):
+            revisions.append({"date": date, "old": _plain(old), "new": _plain(new)})
+    frames = [f for f in (kept, fresh) if not f.empty]
+    merged = pd.concat(frames, ignore_index=True) if frames else fresh
+    return merged, revisions
+
+
+def apply_tail(
+    fresh_df: pd.DataFrame,
+    fresh_logs: List[Dict[str, Any]],
+    cached: Dict[str, pd.DataFrame],
+    start: str,
+) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Merge a tail fetch for several countries into their cached series.
+
+    Countries whose tail fetch failed keep their cached rows; their error log
+    stops the cache entry from being rewritten.
+    """
+    failed = {_norm(f.get("country")) for f in fresh_logs if f.get("error") and f.get("country")}
+    if any(f.get("error") and not f.get("country") for f in fresh_logs):
+        failed = {_norm(c) for c in cached}
+    if fresh_df is not None and not fresh_df.empty and "country" in fresh_df.columns:
+        row_country = fresh_df["country"].map({c: _norm(c) for c in fresh_df["country"].dropna().unique()})
+    else:
+        row_country = None
+
+    frames = []
+    merged_by: Dict[str, pd.DataFrame] = {}
+    info: Dict[str, Dict[str, Any]] = {}
+    for country, cached_df in cached.items():
+        norm = _norm(country)
+        if norm in failed:
+            frames.append(cached_df)
+            continue
+        fresh = fresh_df[row_country == norm] if row_country is not None else pd.DataFrame(columns=cached_df.columns)
+        merged, revisions = merge_tail(cached_df, fresh, start)
+        frames.append(merged)
+        merged_by[norm] = merged
+        cached_rows = int((period_starts(cached_df["date"]) < pd.Timestamp(start)).sum()) if not cached_df.empty else 0
+        info[norm] = {
+            "window_start": start,
+            "cached_rows": cached_rows,
+            "fetched_rows": int(len(merged) - cached_rows),
+            "revisions": revisions,
+        }
+
+    frames = [f for f in frames if not f.empty]
+    df = pd.concat(frames, ignore_index=True) if frames else fresh_df.iloc[0:0]
+
+    logs = []
+    for f in fresh_logs:
+        f = dict(f)
+        norm = _norm(f.get("country")) if f.get("country") else None
+        if norm in info:
+            f["incremental"] = info[norm]
+            # the tail's hash would not match the series the entry holds
+            f["sha256_normalized"] = _sha_normalized(merged_by[norm])
+        elif not f.get("country") and not f.get("error"):
+            # indicator-level log (SDMX): summarise all merged countries
+            f["incremental"] = {
+                "window_start": start,
+                "revisions": {c: i["revisions"] for c, i in info.items() if i["revisions"]},
+            }
+            f["sha256_normalized"] = _sha_normalized(df)
+        logs.append(f)
+    return df, logs
@@ -0,0 +1,771 @@
+"""Fetch phase of a pipeline run.
+
+For every configured (indicator, source) pair the run:
+
+1. serves what the per-series cache holds and, under stale-while-revalidate,
+   queues expired series for a background refresh (`FetchOrchestrator.lookup`);
+2. orders the remaining fetch jobs by their value to the ranking
+   (`src.fetchers.scheduler`);
+3. runs them on worker threads or on the event loop until all are done or the
+   run deadline passes (`FetchOrchestrator.run`). A job shares its request
+   with identical jobs of the run, holds the cross-process single-flight lock
+   of its series, fetches only the tail of series it can refresh
+   incrementally, revalidates with the cached validators and writes what it
+   got back to the cache;
+4. serves series whose provider is down, or that the deadline cut off, from
+   their stale cache entries (`FetchOrchestrator.collect`).
+
+`run_fetch_phase` drives one run from the validated config and returns the
+rows, fetch logs and manifest sections that `src.main` harmonizes and scores.
+"""
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+from src.indicators.base import IndicatorPlugin
+from src.io.artifacts import _enrich_fetch_entry
+from src.io.cache import (
+    background_refresher,
+    cache_get_series,
+    cache_lookup_series,
+    cache_series_frames,
+    cache_series_validators,
+    cache_set_series,
+    cache_touch_series,
+    configure_cache,
+    evict_cache,
+    fetch_lock,
+    options_tag,
+)
+
+from .async_engine import run_fetch_jobs
+from .breaker import CircuitBreakers, reset_circuit_breakers
+from .coalesce import RequestCoalescer
+from .deadline import DEADLINE_ERROR, DeadlineExceeded, RunDeadline, reset_run_deadline
+from .incremental import apply_tail, plan_windows
+from .ratelimit import reset_rate_limiters
+from .scheduler import available_indicators, prioritize
+from .session import reset_session_pool
+
+RAW_COLUMNS = ["source", "indicator", "country", "date", "value"]
+
+# (source, indicator id, rows, fetch logs) of a finished job
+FetchResult = Tuple[str, str, Optional[pd.DataFrame], List[Dict[str, Any]]]
+
+
+class FetchJob(NamedTuple):
+    """One (indicator, source) series fetch for `countries`.
+
+    `options` are the source entry's SDMX overrides (`resource`, `key`,
+    `freq`); they are part of the series' identity in the cache, the fetch
+    lock and the coalescer.
+    """
+
+    plugin: Any
+    countries: List[str]
+    indicator: str
+    source: str
+    code: str
+    options: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class FetchSettings:
+    """The parts of the run config that drive fetching and caching."""
+
+    period_start: str
+    period_end: str
+    frequency: str = "A"
+    caching: bool = False
+    ttl_hours: float = 24
+    # stale-while-revalidate: expired series are served now and refreshed
+    # in the background
+    serve_stale: bool = False
+    max_stale_hours: Optional[float] = None
+    # incremental: expired series only refetch their tail (plus an overlap)
+    incremental: bool = False
+    overlap_periods: int = 2
+
+    @classmethod
+    def from_config(cls, cfg) -> "FetchSettings":
+        caching = getattr(cfg, "caching", None)
+        enabled = bool(caching and caching.enabled)
+        return cls(
+            period_start=cfg.period["start"][:10],
+            period_end=cfg.period["end"][:10],
+            frequency=cfg.period["frequency"],
+            caching=enabled,
+            ttl_hours=caching.ttl_hours if caching else 24,
+            serve_stale=enabled
+            and bool(getattr(caching, "stale_while_revalidate", False)),
+            max_stale_hours=getattr(caching, "max_stale_hours", None),
+            incremental=enabled and bool(getattr(caching, "incremental", False)),
+            overlap_periods=getattr(caching, "incremental_overlap_periods", 2),
+        )
+
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame(columns=RAW_COLUMNS)
+
+
+def as_result(res) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Normalize a plugin fetch result ((df, logs), a frame or None) to (df, logs)."""
+    if res is None:
+        return _empty(), []
+    if isinstance(res, tuple) and len(res) >= 2:
+        df_src, logs = res[0], res[1] or []
+    else:
+        df_src, logs = res, []
+    if not isinstance(df_src, pd.DataFrame):
+        try:
+            df_src = pd.DataFrame(df_src)
+        except Exception:
+            df_src = _empty()
+    return df_src, logs
+
+
+def enrich_logs(logs) -> List[Dict[str, Any]]:
+    """Fetch logs in the manifest's canonical shape; entries that fail stay as-is."""
+    enriched = []
+    for f in logs or []:
+        try:
+            enriched.append(_enrich_fetch_entry(f))
+        except Exception:
+            enriched.append(f)
+    return enriched
+
+
+def combined(parts) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Concatenate (df, logs) parts of one job."""
+    frames = [df for df, _ in parts if df is not None and not df.empty]
+    df = pd.concat(frames, ignore_index=True) if frames else _empty()
+    return df, [f for _, logs in parts for f in logs]
+
+
+def deadline_failures(countries: List[str], logs) -> List[str]:
+    """Countries of a job whose fetch was cut off by the run deadline."""
+    cut = [f for f in logs or [] if DEADLINE_ERROR in str(f.get("error") or "")]
+    if any(not f.get("country") for f in cut):
+        return list(countries)
+    failed = {f.get("country") for f in cut}
+    return [c for c in countries if c in failed]
+
+
+def with_cached(out: FetchResult, cached_df, cached_logs) -> FetchResult:
+    """Add rows another process cached while this job waited for the lock."""
+    if cached_df is None or (cached_df.empty and not cached_logs):
+        return out
+    src, ind_id, df_src, logs = out
+    if not cached_df.empty:
+        if df_src is None or df_src.empty:
+            df_src = cached_df
+        else:
+            df_src = pd.concat([cached_df, df_src], ignore_index=True)
+    return (src, ind_id, df_src, enrich_logs(cached_logs) + list(logs or []))
+
+
+def fanned_out(out: FetchResult, ind_id: str) -> FetchResult:
+    """A coalesced result as seen by `ind_id`: own copy of the rows and logs
+    relabelled to this indicator."""
+    src, owner_id, df_src, logs = out
+    if owner_id == ind_id:
+        return out
+    if df_src is not None:
+        df_src = df_src.copy()
+        if not df_src.empty:
+            df_src["indicator"] = ind_id
+    logs = [dict(f, indicator=ind_id, coalesced_from=owner_id) for f in logs or []]
+    return (src, ind_id, df_src, logs)
+
+
+class FetcherPlugin(IndicatorPlugin):
+    """Plugin wrapping a bare fetcher, for sources without an indicator plugin."""
+
+    def __init__(self, fetcher, indicator_id: str, code: str, options=None):
+        super().__init__({})
+        self.fetcher = fetcher
+        self.id = indicator_id
+        self.code = code
+        self.options = options or {}
+
+    def fetch(self, countries, start, end, freq, validators=None):
+        return self.fetcher.fetch(
+            countries, [self.indicator_spec(validators)], start, end, freq
+        )
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df
+
+    def standardize(self, df: pd.DataFrame) -> pd.DataFrame:
+        df2 = df.copy()
+        mu = df2["value"].mean()
+        sigma = df2["value"].std(ddof=0)
+        df2["value_std"] = (df2["value"] - mu) / (sigma if sigma != 0 else 1.0)
+        return df2
+
+
+def _runtime(cfg) -> Dict[str, Any]:
+    return cfg.runtime.dict() if hasattr(cfg.runtime, "dict") else dict(cfg.runtime)
+
+
+def configured_sources(cfg) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+    """(indicator id, source, code, SDMX options) per configured source entry."""
+    for ind in cfg.indicators:
+        for src_entry in ind.sources or []:
+            entry = src_entry if isinstance(src_entry, dict) else vars(src_entry)
+            # SDMX dataflow / key template / frequency overrides
+            options = {k: entry.get(k) for k in ("resource", "key", "freq") if entry.get(k)}
+            yield ind.id, entry.get("source"), entry.get("code"), options
+
+
+def make_plugin(cfg, ind_id: str, src: str, code: str, options=None):
+    """Indicator plugin fetching `code` from `src`, or None for an unknown source."""
+    # imported here to keep network dependencies out of module import
+    from src.indicators.imf_indicator import IMFIndicator
+    from src.indicators.wb_indicator import WBIndicator
+
+    from .ecb import ECBFetcher
+    from .imf import IMFFetcher
+    from .oecd import OECDFetcher
+    from .wb_bulk import WBBulkFetcher
+    from .worldbank import WorldBankFetcher
+
+    if src == "WB":
+        return WBIndicator(cfg.dict() if hasattr(cfg, "dict") else dict(cfg), ind_id, code)
+    if src == "IMF":
+        return IMFIndicator(
+            cfg.dict() if hasattr(cfg, "dict") else dict(cfg), ind_id, code, options
+        )
+    logging.warning(
+        f"No plugin for source {src} (indicator {ind_id}), falling back to fetcher map"
+    )
+    fetcher_map = {
+        "WB": WorldBankFetcher,
+        "IMF": IMFFetcher,
+        "OECD": OECDFetcher,
+        "ECB": ECBFetcher,
+        "WB_BULK": WBBulkFetcher,
+    }
+    fetcher_cls = fetcher_map.get(src)
+    if not fetcher_cls:
+        logging.warning(f"No fetcher for source {src} (indicator {ind_id}), skipping")
+        return None
+    return FetcherPlugin(fetcher_cls(_runtime(cfg)), ind_id, code, options)
+
+
+class FetchOrchestrator:
+    """Runs the fetch jobs of one run against the per-series cache."""
+
+    def __init__(
+        self,
+        settings: FetchSettings,
+        breakers: CircuitBreakers,
+        run_deadline: RunDeadline,
+        coalescer: Optional[RequestCoalescer] = None,
+    ):
+        self.settings = settings
+        self.breakers = breakers
+        self.run_deadline = run_deadline
+        # identical (source, code, countries) requests of different indicators
+        # share one fetch
+        self.coalescer = coalescer or RequestCoalescer()
+        self.log = logging.getLogger(__name__)
+
+    # --- cache -----------------------------------------------------------------
+
+    def lookup(self, job: FetchJob):
+        """(cached rows or None, cached logs, countries to fetch, stale countries)."""
+        s = self.settings
+        if not s.caching:
+            return None, [], list(job.countries), []
+        return cache_lookup_series(
+            job.source, job.code, job.countries, s.period_start, s.period_end,
+            s.ttl_hours, serve_stale=s.serve_stale, max_stale_hours=s.max_stale_hours,
+            options=job.options,
+        )
+
+    def request_key(self, job: FetchJob) -> Tuple:
+        s = self.settings
+        return (
+            job.source,
+            job.code,
+            options_tag(job.options),
+            s.period_start,
+            s.period_end,
+            tuple(job.countries),
+        )
+
+    def _lock(self, job: FetchJob):
+        if not self.settings.caching:
+            return None
+        s = self.settings
+        return fetch_lock(job.source, job.code, s.period_start, s.period_end, job.options)
+
+    def claimed(self, lock, job: FetchJob):
+        """Once the single-flight lock is held: if another process held it first,
+        take what it cached meanwhile. Returns (cached_df, cached_logs,
+        countries still to fetch)."""
+        if lock is None or not lock.waited:
+            return None, [], job.countries
+        s = self.settings
+        return cache_get_series(
+            job.source, job.code, job.countries, s.period_start, s.period_end,
+            s.ttl_hours, options=job.options,
+        )
+
+    def stale_fallback(self, df_src, logs, job: FetchJob):
+        """While the source's circuit breaker is open or half-open, or once the
+        run deadline has passed, serve the countries whose fetch failed from
+        their cache entries, however old."""
+        s = self.settings
+        if not s.caching or not (
+            self.breakers.is_tripped(job.source) or self.run_deadline.expired
+        ):
+            return df_src, logs
+        if any(f.get("error") and not f.get("country") for f in logs):
+            failed = list(job.countries)
+        else:
+            failed = [
+                c for c in job.countries
+                if any(f.get("error") and f.get("country") == c for f in logs)
+            ]
+        if not failed:
+            return df_src, logs
+        try:
+            cached_df, cached_logs, _, _ = cache_lookup_series(
+                job.source, job.code, failed, s.period_start, s.period_end, 0,
+                serve_stale=True, max_stale_hours=s.max_stale_hours,
+                options=job.options,
+            )
+        except Exception:
+            return df_src, logs
+        if not cached_df.empty:
+            if df_src is None or df_src.empty:
+                df_src = cached_df
+            else:
+                df_src = pd.concat([df_src, cached_df], ignore_index=True)
+        return df_src, logs + [dict(f, stale_fallback=True) for f in cached_logs]
+
+    def finish(self, res, job: FetchJob) -> FetchResult:
+        """Normalize a plugin fetch result and write it to the per-series cache."""
+        df_src, logs = as_result(res)
+        # failed countries keep their error logs, so the cache write skips them
+        df_src, logs = self.stale_fallback(df_src, enrich_logs(logs), job)
+        s = self.settings
+        if s.caching:
+            # series the provider confirmed unchanged (304 / same payload hash)
+            # keep their cached entry: restart its TTL and reuse its rows
+            revalidated = {f.get("country") for f in logs if f.get("not_modified")}
+            try:
+                cache_set_series(
+                    job.source, job.code, df_src, logs,
+                    [c for c in job.countries if c not in revalidated],
+                    s.period_start, s.period_end, s.ttl_hours, options=job.options,
+                )
+                if revalidated:
+                    kept = [c for c in job.countries if c in revalidated]
+                    cache_touch_series(
+                        job.source, job.code, kept, s.period_start, s.period_end,
+                        job.options,
+                    )
+                    cached_df, _, _ = cache_get_series(
+                        job.source, job.code, kept, s.period_start, s.period_end,
+                        s.ttl_hours, options=job.options,
+                    )
+                    if not cached_df.empty:
+                        if df_src.empty:
+                            df_src = cached_df
+                        else:
+                            df_src = pd.concat([df_src, cached_df], ignore_index=True)
+            except Exception:
+                pass
+        return (job.source, job.indicator, df_src, logs)
+
+    def validators(self, job: FetchJob) -> Dict[str, Any]:
+        """Cached fetch logs of the series about to be fetched, for conditional
+        requests, as keyword arguments of `plugin.fetch`."""
+        s = self.settings
+        if not s.caching:
+            return {}
+        try:
+            validators = cache_series_validators(
+                job.source, job.code, job.countries, s.period_start, s.period_end,
+                job.options,
+            )
+        except Exception:
+            return {}
+        return {"validators": validators} if validators else {}
+
+    def tail_plan(self, job: FetchJob):
+        """({window_start: countries}, cached frames) for the series that can be
+        refreshed incrementally; the other countries need a full fetch."""
+        s = self.settings
+        if not s.incremental:
+            return {}, {}
+        try:
+            cached = cache_series_frames(
+                job.source, job.code, job.countries, s.period_start, s.period_end,
+                job.options,
+            )
+        except Exception:
+            return {}, {}
+        return plan_windows(cached, s.overlap_periods, s.frequency, s.period_start), cached
+
+    # --- fetching --------------------------------------------------------------
+
+    def fetch_series(self, job: FetchJob) -> FetchResult:
+        """Fetch the job's countries (tail windows for incrementally refreshable
+        ones) and cache the merged full-period series."""
+        s = self.settings
+        plan, cached = self.tail_plan(job)
+        parts = []
+        for start, cs in plan.items():
+            res = job.plugin.fetch(cs, start, s.period_end, s.frequency)
+            parts.append(apply_tail(*as_result(res), {c: cached[c] for c in cs}, start))
+        planned = {c for cs in plan.values() for c in cs}
+        rest = job._replace(countries=[c for c in job.countries if c not in planned])
+        if rest.countries:
+            res = job.plugin.fetch(
+                rest.countries, s.period_start, s.period_end, s.frequency,
+                **self.validators(rest),
+            )
+            if not plan:
+                return self.finish(res, job)
+            parts.append(as_result(res))
+        return self.finish(combined(parts), job)
+
+    async def afetch_series(self, job: FetchJob, limits) -> FetchResult:
+        s = self.settings
+        plan, cached = self.tail_plan(job)
+        planned = {c for cs in plan.values() for c in cs}
+        rest = job._replace(countries=[c for c in job.countries if c not in planned])
+        calls = [
+            job.plugin.afetch(cs, start, s.period_end, s.frequency, limits=limits)
+            for start, cs in plan.items()
+        ]
+        if rest.countries:
+            calls.append(
+                job.plugin.afetch(
+                    rest.countries, s.period_start, s.period_end, s.frequency,
+                    limits=limits, **self.validators(rest),
+                )
+            )
+        results = await asyncio.gather(*calls)
+        if not plan:
+            return self.finish(results[0], job)
+        parts = [
+            apply_tail(*as_result(res), {c: cached[c] for c in cs}, start)
+            for (start, cs), res in zip(plan.items(), results)
+        ]
+        parts.extend(as_result(res) for res in results[len(plan):])
+        return self.finish(combined(parts), job)
+
+    def failed(self, job: FetchJob, e: BaseException) -> FetchResult:
+        """Result of a job that raised: one error fetch entry per country (so
+        the series show up as failed, or as cut by the deadline)."""
+        self.log.warning(
+            f"Fetch task failed for {job.source}:{job.code} ({job.indicator}): {e!r}"
+        )
+        error = str(e) if isinstance(e, DeadlineExceeded) else f"{type(e).__name__}: {e}"
+        logs = [
+            {"indicator": job.indicator, "country": c, "rows": 0, "error": error}
+            for c in job.countries
+        ]
+        return (job.source, job.indicator, *self.stale_fallback(_empty(), logs, job))
+
+    def unfinished(self, job: FetchJob) -> FetchResult:
+        """Result for a job the deadline left unfinished: its stale cache
+        entries, if any."""
+        logs = [
+            {
+                "indicator": job.indicator,
+                "country": c,
+                "rows": 0,
+                "error": f"{DEADLINE_ERROR}: not fetched",
+            }
+            for c in job.countries
+        ]
+        return (job.source, job.indicator, *self.stale_fallback(_empty(), logs, job))
+
+    def fetch_once(self, job: FetchJob) -> FetchResult:
+        # single flight: one process fetches a (source, code, period), others wait
+        lock = self._lock(job)
+        try:
+            if lock is not None:
+                lock.acquire()
+            cached_df, cached_logs, todo = self.claimed(lock, job)
+            if not todo:
+                return with_cached(
+                    (job.source, job.indicator, None, []), cached_df, cached_logs
+                )
+            out = self.fetch_series(job._replace(countries=todo))
+            return with_cached(out, cached_df, cached_logs)
+        except Exception as e:
+            return self.failed(job, e)
+        finally:
+            if lock is not None:
+                lock.release()
+
+    def fetch(self, job: FetchJob) -> FetchResult:
+        """Fetch a job on the calling thread, sharing identical requests of the run."""
+        out = self.coalescer.run(self.request_key(job), self.fetch_once, job)
+        return fanned_out(out, job.indicator)
+
+    def afetch_job(self, job: FetchJob):
+        """Coroutine factory fetching `job` on the async engine."""
+
+        async def _once(limits):
+            lock = self._lock(job)
+            try:
+                if lock is not None:
+                    # waiting must not block the event loop (the holder may be
+                    # another job on this loop)
+                    await asyncio.get_running_loop().run_in_executor(None, lock.acquire)
+                cached_df, cached_logs, todo = self.claimed(lock, job)
+                if not todo:
+                    return with_cached(
+                        (job.source, job.indicator, None, []), cached_df, cached_logs
+                    )
+                out = await self.afetch_series(job._replace(countries=todo), limits)
+                return with_cached(out, cached_df, cached_logs)
+            except Exception as e:
+                return self.failed(job, e)
+            finally:
+                if lock is not None:
+                    lock.release()
+
+        async def _job(limits):
+            out = await self.coalescer.arun(self.request_key(job), lambda: _once(limits))
+            return fanned_out(out, job.indicator)
+
+        return _job
+
+    def run(
+        self,
+        jobs: List[FetchJob],
+        engine: str = "threads",
+        runtime: Optional[Dict[str, Any]] = None,
+        max_workers: int = 4,
+    ) -> Tuple[List[Tuple[FetchJob, FetchResult]], List[FetchJob]]:
+        """Run `jobs` on the event loop ("async") or on worker threads until all
+        are done or the run deadline passes.
+
+        Returns ([(job, result)] of the finished jobs, jobs left unfinished).
+        """
+        completed: List[Tuple[FetchJob, FetchResult]] = []
+        unfinished: List[FetchJob] = []
+        if not jobs:
+            return completed, unfinished
+        if engine == "async":
+            results = run_fetch_jobs(
+                [self.afetch_job(job) for job in jobs],
+                runtime,
+                timeout=self.run_deadline.remaining(),
+            )
+            for job, res in zip(jobs, results):
+                if isinstance(res, TimeoutError):
+                    unfinished.append(job)
+                elif isinstance(res, BaseException):
+                    # raised outside the job's own error handling (e.g. cancelled)
+                    completed.append((job, self.failed(job, res)))
+                else:
+                    completed.append((job, res))
+            return completed, unfinished
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        tasks = {executor.submit(self.fetch, job): job for job in jobs}
+        try:
+            for _ in as_completed(tasks, timeout=self.run_deadline.remaining()):
+                pass
+        except TimeoutError:
+            self.log.warning(
+                "Run deadline of %ss reached; continuing with the series fetched so far",
+                self.run_deadline.seconds,
+            )
+        for fut, job in tasks.items():
+            if not fut.done():
+                # not started yet: dropped; running: stops at its next request
+                fut.cancel()
+                unfinished.append(job)
+                continue
+            try:
+                completed.append((job, fut.result()))
+            except Exception as e:
+                completed.append((job, self.failed(job, e)))
+        executor.shutdown(wait=False, cancel_futures=True)
+        return completed, unfinished
+
+    def collect(
+        self,
+        completed: List[Tuple[FetchJob, FetchResult]],
+        unfinished: List[FetchJob],
+    ) -> Tuple[List[FetchResult], List[Dict[str, Any]]]:
+        """Results of all jobs, serving unfinished ones stale from the cache where
+        possible, and the series the deadline cut off."""
+        results: List[FetchResult] = []
+        missing_due_to_deadline = []
+        for job, res in completed + [(job, self.unfinished(job)) for job in unfinished]:
+            results.append(res)
+            cut = deadline_failures(job.countries, res[3])
+            if not cut:
+                continue
+            df_res = res[2]
+            served = set(df_res["country"]) if df_res is not None and not df_res.empty else set()
+            missing_due_to_deadline.append(
+                {
+                    "indicator": job.indicator,
+                    "source": job.source,
+                    "code": job.code,
+                    "countries": [c for c in cut if c not in served],
+                    "stale_fallback": [c for c in cut if c in served],
+                }
+            )
+        return results, missing_due_to_deadline
+
+    # --- after the fetch -------------------------------------------------------
+
+    def sweep(self, max_size_mb: Optional[float] = None) -> None:
+        """Drop expired entries and enforce the cache size cap."""
+        s = self.settings
+        try:
+            evict_cache(
+                max_bytes=int(max_size_mb * 1024 * 1024) if max_size_mb else None,
+                # stale entries must survive until their refresh has run
+                ttl_hours=s.max_stale_hours if s.serve_stale else s.ttl_hours,
+            )
+        except Exception as e:
+            logging.warning("Cache sweep failed: %s", e)
+
+    def refresh(self, job: FetchJob) -> None:
+        """Refetch stale series and rewrite their cache entries (background)."""
+        s = self.settings
+        lock = fetch_lock(job.source, job.code, s.period_start, s.period_end, job.options)
+        lock.acquire()
+        try:
+            # another run may have refreshed some of them already
+            _, _, missing, stale = cache_lookup_series(
+                job.source, job.code, job.countries, s.period_start, s.period_end,
+                s.ttl_hours, serve_stale=True, max_stale_hours=s.max_stale_hours,
+                options=job.options,
+            )
+            todo = [c for c in job.countries if c in set(missing) | set(stale)]
+            if todo:
+                self.fetch_series(job._replace(countries=todo))
+        finally:
+            lock.release()
+
+    def refresh_in_background(self, jobs: List[FetchJob]) -> List[Dict[str, Any]]:
+        """Revalidate stale series off the critical path; the process waits for
+        these on exit, so the next run finds fresh entries."""
+        submitted = []
+        for job in jobs:
+            if background_refresher.submit(self.request_key(job), self.refresh, job):
+                submitted.append(
+                    {"source": job.source, "code": job.code, "countries": list(job.countries)}
+                )
+        return submitted
+
+
+@dataclass
+class FetchOutcome:
+    """What the fetch phase hands to the rest of the run."""
+
+    frames: List[pd.DataFrame] = field(default_factory=list)
+    fetch_summary: Dict[str, int] = field(default_factory=dict)
+    fetch_entries: List[Dict[str, Any]] = field(default_factory=list)
+    # manifest sections describing the fetch phase
+    manifest: Dict[str, Any] = field(default_factory=dict)
+
+    def add(self, src: str, ind_id: str, df: Optional[pd.DataFrame]) -> None:
+        if df is None or df.empty:
+            return
+        # tag with canonical indicator id
+        df["indicator"] = ind_id
+        self.fetch_summary[src] = self.fetch_summary.get(src, 0) + len(df)
+        self.frames.append(df)
+
+    def data(self) -> pd.DataFrame:
+        return pd.concat(self.frames, ignore_index=True) if self.frames else _empty()
+
+
+def run_fetch_phase(cfg) -> FetchOutcome:
+    """Fetch every configured series of a run (see the module docstring)."""
+    runtime = _runtime(cfg)
+    # one keep-alive session pool per run, shared by all fetchers and plugins
+    http_pool = reset_session_pool(runtime)
+    # per-source rate limiters (runtime.rate_limits)
+    rate_limiters = reset_rate_limiters(runtime)
+    # per-source circuit breakers: fail fast while a provider is down
+    breakers = reset_circuit_breakers(runtime)
+    # runtime.deadline_sec: the fetch phase ends then, with whatever has arrived
+    run_deadline = reset_run_deadline(runtime)
+    settings = FetchSettings.from_config(cfg)
+    if settings.caching:
+        configure_cache(
+            backend=getattr(cfg.caching, "backend", None),
+            memory_max_mb=getattr(cfg.caching, "memory_max_mb", None),
+            lock_timeout_sec=getattr(cfg.caching, "lock_timeout_sec", None),
+        )
+    orchestrator = FetchOrchestrator(settings, breakers, run_deadline)
+    out = FetchOutcome()
+
+    fetch_jobs: List[FetchJob] = []
+    refresh_jobs: List[FetchJob] = []
+    # (indicator id, countries) served from the cache, for the fetch scheduler
+    cached_have = []
+    for ind_id, src, code, options in configured_sources(cfg):
+        plugin = make_plugin(cfg, ind_id, src, code, options)
+        if plugin is None:
+            continue
+        job = FetchJob(plugin, list(cfg.countries), ind_id, src, code, options)
+        cached_df, cached_logs, todo, stale = orchestrator.lookup(job)
+        if stale:
+            refresh_jobs.append(job._replace(countries=stale))
+        out.fetch_entries.extend(enrich_logs(cached_logs))
+        if todo:
+            fetch_jobs.append(job._replace(countries=todo))
+        if cached_df is not None and not cached_df.empty:
+            cached_have.append((ind_id, cached_df["country"].dropna().unique()))
+            out.add(src, ind_id, cached_df)
+
+    # most valuable series first: heavy weights, then what coverage still needs
+    fetch_schedule: List[Dict[str, Any]] = []
+    if fetch_jobs and runtime.get("fetch_order", "priority") == "priority":
+        fetch_jobs, fetch_schedule = prioritize(
+            fetch_jobs,
+            cfg.scoring.weights,
+            [ind.id for ind in cfg.indicators],
+            cfg.scoring.min_coverage_ratio,
+            available_indicators(cached_have),
+        )
+
+    completed, unfinished = orchestrator.run(
+        fetch_jobs,
+        runtime.get("fetch_engine", "threads"),
+        runtime,
+        max_workers=runtime.get("max_workers") or 4,
+    )
+    results, missing_due_to_deadline = orchestrator.collect(completed, unfinished)
+    for src, ind_id, df_src, logs in results:
+        out.fetch_entries.extend(enrich_logs(logs))
+        out.add(src, ind_id, df_src)
+
+    if settings.caching:
+        orchestrator.sweep(getattr(cfg.caching, "max_size_mb", None))
+    stale_refreshes = orchestrator.refresh_in_background(refresh_jobs)
+
+    out.manifest = {
+        "http_pool": http_pool.stats(),
+        "rate_limits": rate_limiters.stats(),
+        "circuit_breakers": breakers.stats(),
+        "fetch_schedule": fetch_schedule,
+        "deadline": run_deadline.stats(),
+        "missing_due_to_deadline": missing_due_to_deadline,
+        "coalesced_requests": orchestrator.coalescer.stats(),
+        "stale_refreshes": stale_refreshes,
+    }
+    return out
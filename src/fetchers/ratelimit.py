@@ -0,0 +1,252 @@
+"""Per-source request rate limiting with adaptive concurrency.
+
+Every data provider gets one `SourceLimiter`, shared by all fetcher instances,
+plugins and worker threads of a run:
+
+- a token bucket (`requests_per_sec`, `burst`) spaces requests out so that
+  raising `max_workers` does not turn into a burst of 429s;
+- an AIMD concurrency window bounds requests in flight: it grows by one slot
+  per window of successful responses (additive increase, up to
+  `max_concurrency`) and is halved on 429/5xx or a connection failure
+  (multiplicative decrease). A `Retry-After` on a 429 also pauses the bucket.
+
+Limits come from `RuntimeConfig.rate_limits`, e.g.
+``{"WB": {"requests_per_sec": 10, "burst": 20, "max_concurrency": 8}}``.
+Sources without an entry are not throttled, only counted. `stats()` reports
+the achieved throughput per source for the run manifest. Waits for a slot or
+a token are capped by the run deadline when one is passed to `slot()`: past
+it, `DeadlineExceeded` is raised instead of waiting on.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .deadline import RunDeadline
+
+
+def is_throttled(status: Optional[int]) -> bool:
+    """True for responses that mean the provider is overloaded."""
+    return status is not None and (status == 429 or status >= 500)
+
+
+def _retry_after(value: Any) -> Optional[float]:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst if burst is not None else rate))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._last = clock()
+        # no tokens are handed out before this time (Retry-After)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, deadline: Optional[RunDeadline] = None) -> float:
+        """Take one token, sleeping until one is available; returns the wait in seconds."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                delay = max(self._paused_until - now, (1.0 - self._tokens) / self.rate)
+            if deadline is not None:
+                deadline.check()
+                delay = deadline.cap(delay)
+            self._sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._last = now
+
+
+class SourceLimiter:
+    def __init__(
+        self,
+        source: str,
+        requests_per_sec: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        min_concurrency: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.source = source
+        self.requests_per_sec = requests_per_sec
+        self.bucket = TokenBucket(requests_per_sec, burst, clock, sleep) if requests_per_sec else None
+        self.max_concurrency = max(1, int(max_concurrency)) if max_concurrency else None
+        self.min_concurrency = max(1, int(min_concurrency))
+        # current AIMD window; starts at the cap and adapts from there
+        self.limit = float(self.max_concurrency) if self.max_concurrency else None
+        self._clock = clock
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self.requests = 0
+        self.throttled = 0
+        self.wait_sec = 0.0
+        self._first: Optional[float] = None
+        self._last: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.bucket is not None or self.limit is not None
+
+    def _enter(self, deadline: Optional[RunDeadline] = None) -> None:
+        start = self._clock()
+        with self._cond:
+            while self.limit is not None and self._in_flight >= int(self.limit):
+                if deadline is not None:
+                    deadline.check()
+                self._cond.wait(0.1 if deadline is None else deadline.cap(0.1))
+            self._in_flight += 1
+        if self.bucket is not None:
+            try:
+                self.bucket.acquire(deadline)
+            except BaseException:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+                raise
+        now = self._clock()
+        with self._cond:
+            self.wait_sec += now - start
+            if self._first is None:
+                self._first = now
+
+    def _exit(self, status: Optional[int], failed: bool, retry_after: Optional[float]) -> None:
+        throttled = failed or is_throttled(status)
+        if throttled and status == 429 and retry_after and self.bucket is not None:
+            self.bucket.pause(retry_after)
+        with self._cond:
+            self._in_flight -= 1
+            self.requests += 1
+            self._last = self._clock()
+            if throttled:
+                self.throttled += 1
+            if self.limit is not None:
+                if throttled:
+                    self.limit = max(float(self.min_concurrency), self.limit / 2.0)
+                else:
+                    self.limit = min(float(self.max_concurrency or 1), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, deadline: Optional[RunDeadline] = None) -> Iterator["_Slot"]:
+        """Hold one request slot; call `slot.observe(response)` before leaving.
+
+        An exception without an HTTP response (timeout, refused connection)
+        counts as throttling; one carrying a response uses its status.
+        """
+        self._enter(deadline)
+        s = _Slot()
+        try:
+            yield s
+        except BaseException as e:
+            response = getattr(e, "response", None)
+            if response is not None:
+                s.observe(response)
+            self._exit(s.status, response is None, s.retry_after)
+            raise
+        self._exit(s.status, False, s.retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            elapsed = (self._last - self._first) if self._first is not None and self._last is not None else 0.0
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "elapsed_sec": round(elapsed, 3),
+                "achieved_rps": round(self.requests / elapsed, 3) if elapsed > 0 else None,
+                "wait_sec": round(self.wait_sec, 3),
+                "requests_per_sec": self.requests_per_sec,
+                "concurrency_limit": int(self.limit) if self.limit is not None else None,
+            }
+
+
+class _Slot:
+    def __init__(self):
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+
+    def observe(self, r) -> None:
+        self.status = getattr(r, "status_code", None)
+        headers = getattr(r, "headers", None) or {}
+        self.retry_after = _retry_after(headers.get("Retry-After"))
+
+
+class RateLimiters:
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.limits = {str(k).upper(): dict(v or {}) for k, v in (limits or {}).items()}
+        self._limiters: Dict[str, SourceLimiter] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_runtime(cls, runtime: Optional[Dict[str, Any]] = None) -> "RateLimiters":
+        return cls((runtime or {}).get("rate_limits") or {})
+
+    def for_source(self, source: str) -> SourceLimiter:
+        key = str(source or "").upper()
+        with self._lock:
+            lim = self._limiters.get(key)
+            if lim is None:
+                conf = self.limits.get(key, {})
+                lim = SourceLimiter(
+                    key,
+                    requests_per_sec=conf.get("requests_per_sec"),
+                    burst=conf.get("burst"),
+                    max_concurrency=conf.get("max_concurrency"),
+                    min_concurrency=conf.get("min_concurrency", 1),
+                )
+                self._limiters[key] = lim
+            return lim
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-source request counts and achieved throughput."""
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {k: lim.stats() for k, lim in sorted(limiters.items())}
+
+
+_limiters: Optional[RateLimiters] = None
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiters(runtime: Optional[Dict[str, Any]] = None) -> RateLimiters:
+    """Return the shared limiters, creating them from `runtime` on first use."""
+    global _limiters
+    with _limiters_lock:
+        if _limiters is None:
+            _limiters = RateLimiters.from_runtime(runtime)
+        return _limiters
+
+
+def reset_rate_limiters(runtime: Optional[Dict[str, Any]] = None) -> RateLimiters:
+    """Start fresh limiters (configuration and counters) for a new run."""
+    global _limiters
+    with _limiters_lock:
+        _limiters = RateLimiters.from_runtime(runtime)
+        return _limiters
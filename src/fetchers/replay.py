@@ -0,0 +1,196 @@
+"""Transport-level record/replay of HTTP responses.
+
+`runtime.http_mode` selects how the shared sessions talk to the providers:
+
+- ``live`` (default): plain network access;
+- ``record``: requests go to the network and every response is stored;
+- ``replay``: responses are served from the store only; a request that was
+  never recorded fails like a refused connection.
+
+The switch sits in the `requests` transport (an `HTTPAdapter` mounted on the
+session pool and on the pandasdmx clients), so the fetchers' own parsing,
+pagination, revalidation and hashing run unchanged in all three modes; the
+store replaces the per-fetcher fixture patching for offline runs and
+benchmarks.
+
+Store layout under `runtime.http_cassette_dir`:
+
+- ``requests/<key>.json``: method, URL, status, a few response headers and
+  the sha256 of the body, one small file per request key;
+- ``bodies/<sha256>.gz``: gzip-compressed bodies, content-addressed, so
+  identical payloads are kept once.
+
+The request key hashes the method, the URL with its query parameters sorted
+and the ``Accept`` header (the SDMX endpoints negotiate the format on it).
+Conditional headers are not part of the key. A ``304 Not Modified`` is never
+recorded, because it has no body and would overwrite the ``200`` a cold run
+needs. Instead, a replayed conditional request whose ``If-None-Match`` /
+``If-Modified-Since`` matches the recorded response's ``ETag`` /
+``Last-Modified`` is answered with a ``304``, as the provider would.
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+from urllib3.response import HTTPResponse  # type: ignore
+
+from src.io.cache_backends import atomic_write
+
+# response headers kept in the store; the rest (dates, cookies, transfer
+# framing) would only make recordings differ between runs
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Location", "Retry-After")
+
+
+class ReplayMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode for a request that has no recorded response."""
+
+
+def request_key(method: str, url: str, accept: Optional[str] = None) -> str:
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    canonical = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ""))
+    return hashlib.sha256(f"{method.upper()} {canonical}\n{accept or ''}".encode("utf-8")).hexdigest()[:32]
+
+
+def not_modified(entry: Dict[str, Any], request_headers) -> bool:
+    """Whether a conditional request is satisfied by the recorded response."""
+    headers = entry.get("headers") or {}
+    etag = headers.get("ETag")
+    if_none_match = request_headers.get("If-None-Match")
+    if if_none_match:
+        # a weak comparison, as servers use for GET
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return "*" in tags or (etag is not None and etag.removeprefix("W/") in tags)
+    last_modified = headers.get("Last-Modified")
+    if_modified_since = request_headers.get("If-Modified-Since")
+    if not (last_modified and if_modified_since):
+        return False
+    try:
+        return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+
+class HttpRecorder:
+    def __init__(self, root: str, mode: str = "record"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown recorder mode: {mode}")
+        self.root = root
+        self.mode = mode
+        self.recorded = 0
+        self.replayed = 0
+        self.missed = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_runtime(cls, runtime: Optional[Dict[str, Any]] = None) -> Optional["HttpRecorder"]:
+        runtime = runtime or {}
+        mode = runtime.get("http_mode") or "live"
+        if mode == "live":
+            return None
+        return cls(runtime.get("http_cassette_dir") or os.path.join(".cache", "http"), mode)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.root, "requests", key + ".json")
+
+    def _body_path(self, sha: str) -> str:
+        return os.path.join(self.root, "bodies", sha + ".gz")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def save(self, method: str, url: str, accept: Optional[str], status: int, reason: str, headers, body: bytes) -> Dict[str, Any]:
+        sha = hashlib.sha256(body).hexdigest()
+        body_path = self._body_path(sha)
+        if not os.path.exists(body_path):
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            # mtime=0 keeps the compressed bytes identical across recordings
+            atomic_write(body_path, lambda fh: fh.write(gzip.compress(body, mtime=0)), binary=True)
+        entry = {
+            "method": method.upper(),
+            "url": url,
+            "accept": accept,
+            "status": int(status),
+            "reason": reason,
+            "headers": {h: headers[h] for h in KEPT_HEADERS if h in headers},
+            "sha256": sha,
+            "bytes": len(body),
+        }
+        path = self._entry_path(request_key(method, url, accept))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, lambda fh: json.dump(entry, fh, indent=1, sort_keys=True))
+        self._count("recorded")
+        return entry
+
+    def load(self, method: str, url: str, accept: Optional[str]) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        try:
+            with open(self._entry_path(request_key(method, url, accept)), "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+            with open(self._body_path(entry["sha256"]), "rb") as fh:
+                body = gzip.decompress(fh.read())
+        except (OSError, ValueError, KeyError):
+            self._count("missed")
+            return None
+        self._count("replayed")
+        return entry, body
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "dir": self.root,
+                "recorded": self.recorded,
+                "replayed": self.replayed,
+                "missed": self.missed,
+            }
+
+
+class RecordReplayAdapter(HTTPAdapter):
+    """`HTTPAdapter` that records responses into, or replays them from, an `HttpRecorder`."""
+
+    def __init__(self, recorder: HttpRecorder, **kwargs):
+        self.recorder = recorder
+        super().__init__(**kwargs)
+
+    def _response(self, request, entry: Dict[str, Any], body: bytes) -> requests.Response:
+        headers = dict(entry.get("headers") or {})
+        headers["Content-Length"] = str(len(body))
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=int(entry["status"]),
+            reason=entry.get("reason"),
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
+
+    def send(self, request, **kwargs):
+        accept = request.headers.get("Accept")
+        if self.recorder.mode == "replay":
+            hit = self.recorder.load(request.method, request.url, accept)
+            if hit is None:
+                raise ReplayMiss(f"no recorded response for {request.method} {request.url}", request=request)
+            entry, body = hit
+            if int(entry["status"]) == 200 and not_modified(entry, request.headers):
+                entry = dict(entry, status=304, reason="Not Modified")
+                body = b""
+            return self._response(request, entry, body)
+        r = super().send(request, **kwargs)
+        body = r.content
+        if r.status_code == 304:
+            # keep the recorded 200: replay answers the conditional request
+            headers = {h: r.headers[h] for h in KEPT_HEADERS if h in r.headers}
+            return self._response(request, {"status": 304, "reason": r.reason, "headers": headers}, body)
+        entry = self.recorder.save(request.method, request.url, accept, r.status_code, r.reason, r.headers, body)
+        # hand out the stored form so recording and replay see the same response
+        return self._response(request, entry, body)
@@ -0,0 +1,106 @@
+"""Order fetch jobs by their value to the ranking.
+
+Jobs used to be submitted in config order. `prioritize` ranks them instead:
+
+1. "weight": the indicators carrying a large share of `scoring.weights`
+   (at least an equal share among the weighted indicators), largest first;
+2. "coverage": jobs that bring countries up to `scoring.min_coverage_ratio`,
+   picked greedily by how many still-short countries each one covers,
+   counting what the cache and the jobs already scheduled will supply;
+3. "tail": everything else, i.e. low-weight indicators that no country needs
+   for coverage, then the further sources of an indicator whose first source
+   is already scheduled.
+
+The executors start work in submission order, so under a limited number of
+workers (or a run deadline) the series that move the ranking most arrive
+first. Jobs are `(plugin, countries, ind_id, src, code)` tuples such as
+`src.fetchers.orchestrator.FetchJob`.
+"""
+import math
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+WEIGHT = "weight"
+COVERAGE = "coverage"
+TAIL = "tail"
+
+
+def prioritize(
+    jobs: List[Tuple],
+    weights: Dict[str, float],
+    indicators: List[str],
+    min_coverage_ratio: float,
+    have: Dict[str, Set[str]],
+) -> Tuple[List[Tuple], List[Dict[str, Any]]]:
+    """Return (jobs in priority order, one schedule record per job).
+
+    `indicators` lists the configured indicator ids in config order; `have`
+    maps country -> indicator ids already available (e.g. from the cache).
+    """
+    order = {ind: i for i, ind in enumerate(indicators)}
+    w = {ind: abs(float(weights.get(ind, 0.0) or 0.0)) for ind in indicators}
+    total = sum(w.values()) or 1.0
+    share = {ind: v / total for ind, v in w.items()}
+    n_weighted = sum(1 for v in w.values() if v > 0)
+    high = 1.0 / n_weighted if n_weighted else math.inf
+    target = math.ceil(min_coverage_ratio * len(indicators) - 1e-9)
+
+    # countries -> indicators available or scheduled so far
+    supplied: Dict[str, Set[str]] = {c: set(s) for c, s in have.items()}
+
+    def _key(item):
+        i, job = item
+        return (-share.get(job[2], 0.0), order.get(job[2], len(order)), i)
+
+    def _supply(job) -> None:
+        for c in job[1]:
+            supplied.setdefault(c, set()).add(job[2])
+
+    def _gain(job) -> int:
+        return sum(
+            1 for c in job[1] if job[2] not in supplied.get(c, ()) and len(supplied.get(c, ())) < target
+        )
+
+    primary, alternates, seen = [], [], set()
+    for item in enumerate(jobs):
+        (alternates if item[1][2] in seen else primary).append(item)
+        seen.add(item[1][2])
+
+    out: List[Tuple[int, Tuple, str, int]] = []
+    for item in sorted((it for it in primary if share.get(it[1][2], 0.0) >= high), key=_key):
+        out.append((*item, WEIGHT, _gain(item[1])))
+        _supply(item[1])
+    rest = [it for it in primary if share.get(it[1][2], 0.0) < high]
+    while rest:
+        best = max(rest, key=lambda it: (_gain(it[1]), share.get(it[1][2], 0.0), -order.get(it[1][2], 0), -it[0]))
+        gain = _gain(best[1])
+        if gain <= 0:
+            break
+        out.append((*best, COVERAGE, gain))
+        _supply(best[1])
+        rest.remove(best)
+    for item in sorted(rest, key=_key) + sorted(alternates, key=_key):
+        out.append((*item, TAIL, _gain(item[1])))
+        _supply(item[1])
+
+    schedule = [
+        {
+            "indicator": job[2],
+            "source": job[3],
+            "code": job[4],
+            "countries": len(job[1]),
+            "tier": tier,
+            "weight_share": round(share.get(job[2], 0.0), 4),
+            "coverage_gain": gain,
+        }
+        for _, job, tier, gain in out
+    ]
+    return [job for _, job, _, _ in out], schedule
+
+
+def available_indicators(rows: Iterable[Tuple[str, Iterable[str]]]) -> Dict[str, Set[str]]:
+    """country -> indicator ids from (indicator id, countries with data) pairs."""
+    have: Dict[str, Set[str]] = {}
+    for ind_id, countries in rows:
+        for c in countries:
+            have.setdefault(str(c), set()).add(ind_id)
+    return have
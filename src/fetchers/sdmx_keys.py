@@ -0,0 +1,109 @@
+"""Multi-series SDMX key queries.
+
+SDMX REST keys are dot-separated dimension values where each position may
+carry several values joined by ``+`` (``M.DE+FR+IT.PCPI_IX``). Instead of one
+request per indicator that returns a whole dataset, `plan_requests` groups
+the requested indicators by dataflow and builds one key per group that names
+exactly the requested countries and indicator codes.
+
+Keys are built from a template with the placeholders ``{freq}``,
+``{countries}`` and ``{code}``. A source entry may give its own ``key``
+template (and ``resource``, the dataflow); otherwise the provider default
+below is used. ``{freq}`` is the entry's own ``freq`` (the series'
+frequency in the dataflow, e.g. ``M``); without one the position is left
+empty, which SDMX treats as a wildcard. The pipeline's target frequency is
+not used: a monthly series requested as ``A`` would not exist. Codes that already are full keys (they contain a ``.``) are
+requested verbatim, and an OECD/ECB entry without a ``resource`` keeps the
+old behaviour of treating the code as the dataflow id (whole dataflow, no
+key).
+
+A pipeline run fetches one indicator per request (its cache entries are per
+series), so there each key names a single code; grouping several indicators
+applies to direct fetcher calls.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import pycountry
+
+# resource: default dataflow; key: default template; iso: country code style
+PROVIDER_KEYS: Dict[str, Dict[str, Optional[str]]] = {
+    "IMF": {"resource": "IFS", "key": "{freq}.{countries}.{code}", "iso": "alpha_2"},
+    "ECB": {"resource": None, "key": "{freq}.{countries}.{code}", "iso": "alpha_2"},
+    "OECD": {"resource": None, "key": "{countries}.{code}", "iso": "alpha_3"},
+}
+
+
+def country_code(code: str, style: str) -> str:
+    """ISO3/ISO2 country code in the provider's style (unknown codes pass through)."""
+    code = str(code).strip().upper()
+    try:
+        c = pycountry.countries.get(alpha_3=code) if len(code) == 3 else pycountry.countries.get(alpha_2=code)
+    except Exception:
+        c = None
+    return getattr(c, style, code) if c is not None else code
+
+
+@dataclass
+class SdmxRequest:
+    resource: str
+    key: Optional[str]
+    indicators: List[Dict[str, Any]] = field(default_factory=list)
+
+    def indicator_for(self, series) -> Optional[Dict[str, Any]]:
+        """Indicator a returned series belongs to (matched on its dimension values)."""
+        if len(self.indicators) == 1:
+            return self.indicators[0]
+        try:
+            values = {str(v) for v in dict(series.dimensions).values()}
+        except Exception:
+            values = set()
+        for ind in self.indicators:
+            if str(ind.get("code")) in values:
+                return ind
+        return None
+
+
+def records_by_country(
+    recs: List[Dict[str, Any]],
+) -> Dict[Optional[str], List[Dict[str, Any]]]:
+    """An indicator's records split by country, in the order returned (one
+    entry with no country when nothing came back), for per-series fetch logs."""
+    out: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for rec in recs:
+        out.setdefault(rec.get("country"), []).append(rec)
+    return out or {None: []}
+
+
+def plan_requests(
+    provider: str,
+    countries: List[str],
+    indicators: List[Dict[str, Any]],
+) -> List[SdmxRequest]:
+    """One request per (dataflow, key template) covering all its indicators."""
+    defaults = PROVIDER_KEYS.get(provider, {})
+    area = "+".join(country_code(c, defaults.get("iso") or "alpha_3") for c in countries)
+    groups: Dict[Tuple[str, str, str], SdmxRequest] = {}
+    out: List[SdmxRequest] = []
+    for ind in indicators:
+        code = str(ind.get("code") or "")
+        resource = ind.get("resource") or defaults.get("resource")
+        template = ind.get("key") or defaults.get("key")
+        if not resource:
+            # legacy: the code names the dataflow
+            out.append(SdmxRequest(code, None, [ind]))
+            continue
+        if "." in code or not template or not countries:
+            out.append(SdmxRequest(resource, code or None, [ind]))
+            continue
+        freq = str(ind.get("freq") or "").strip().upper()
+        req = groups.get((resource, template, freq))
+        if req is None:
+            req = SdmxRequest(resource, template, [])
+            groups[(resource, template, freq)] = req
+            out.append(req)
+        req.indicators.append(ind)
+    for (resource, template, freq), req in groups.items():
+        codes = "+".join(dict.fromkeys(str(i.get("code")) for i in req.indicators))
+        req.key = template.format(freq=freq, countries=area, code=codes)
+    return out
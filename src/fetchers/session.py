@@ -0,0 +1,153 @@
+"""Process-wide pooled HTTP sessions shared by the REST fetchers.
+
+Each host gets one `requests.Session` with an `HTTPAdapter` sized from
+RuntimeConfig (`http_pool_maxsize`, optionally overridden per host through
+`http_pool_per_host`). Sessions are created lazily and reused by every fetcher
+instance, indicator plugin and worker thread in a run, so keep-alive
+connections survive across requests instead of paying a TCP+TLS handshake per
+page. urllib3 connection pools are thread-safe; the session map itself is
+guarded by a lock.
+
+Pool hits/misses are read from urllib3's per-pool counters: every request is a
+hit unless it had to open a new connection (a miss).
+
+With `runtime.http_mode` set to ``record`` or ``replay`` the sessions get a
+`RecordReplayAdapter` instead (see `src.fetchers.replay`); `mount` installs
+the same adapter on sessions the pool does not own, e.g. pandasdmx clients.
+"""
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+
+from .replay import HttpRecorder, RecordReplayAdapter
+
+DEFAULT_POOL_MAXSIZE = 10
+
+
+class SessionPool:
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_POOL_MAXSIZE,
+        per_host: Optional[Dict[str, int]] = None,
+        recorder: Optional[HttpRecorder] = None,
+    ):
+        self.maxsize = max(1, int(maxsize or DEFAULT_POOL_MAXSIZE))
+        self.per_host = {str(k).lower(): int(v) for k, v in (per_host or {}).items()}
+        # None in live mode
+        self.recorder = recorder
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_runtime(cls, runtime: Optional[Dict[str, Any]] = None) -> "SessionPool":
+        runtime = runtime or {}
+        return cls(
+            maxsize=runtime.get("http_pool_maxsize", DEFAULT_POOL_MAXSIZE),
+            per_host=runtime.get("http_pool_per_host") or {},
+            recorder=HttpRecorder.from_runtime(runtime),
+        )
+
+    def pool_size_for(self, host: str) -> int:
+        return max(1, self.per_host.get(host, self.maxsize))
+
+    def _new_session(self, host: str) -> requests.Session:
+        s = requests.Session()
+        # one pool per scheme for this host; pool_block=False lets bursts above
+        # maxsize through with short-lived extra connections instead of stalling
+        kwargs = {"pool_connections": 2, "pool_maxsize": self.pool_size_for(host), "pool_block": False}
+        adapter = RecordReplayAdapter(self.recorder, **kwargs) if self.recorder else HTTPAdapter(**kwargs)
+        s.mount("http://", adapter)
+        s.mount("https://", adapter)
+        return s
+
+    def mount(self, session: requests.Session) -> requests.Session:
+        """Route an outside session (e.g. a pandasdmx client's) through the
+        record/replay store; a no-op in live mode."""
+        if self.recorder is not None and session is not None:
+            adapter = RecordReplayAdapter(self.recorder)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        return session
+
+    def session_for(self, url: str) -> requests.Session:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            s = self._sessions.get(host)
+            if s is None:
+                s = self._new_session(host)
+                self._sessions[host] = s
+            return s
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.session_for(url).get(url, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-host and total connection-pool hit/miss counters."""
+        hosts: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            sessions = dict(self._sessions)
+        for host, s in sessions.items():
+            n_requests = 0
+            n_connections = 0
+            for adapter in {id(a): a for a in s.adapters.values()}.values():
+                pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+                if pools is None:
+                    continue
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    n_requests += int(getattr(pool, "num_requests", 0) or 0)
+                    n_connections += int(getattr(pool, "num_connections", 0) or 0)
+            hosts[host] = {
+                "pool_maxsize": self.pool_size_for(host),
+                "requests": n_requests,
+                "hits": max(0, n_requests - n_connections),
+                "misses": n_connections,
+            }
+        out = {
+            "hosts": hosts,
+            "hits": sum(h["hits"] for h in hosts.values()),
+            "misses": sum(h["misses"] for h in hosts.values()),
+        }
+        if self.recorder is not None:
+            out["replay"] = self.recorder.stats()
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions = {}
+        for s in sessions:
+            try:
+                s.close()
+            except Exception:
+                pass
+
+
+_pool: Optional[SessionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool(runtime: Optional[Dict[str, Any]] = None) -> SessionPool:
+    """Return the shared pool, creating it from `runtime` on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SessionPool.from_runtime(runtime)
+        return _pool
+
+
+def reset_session_pool(runtime: Optional[Dict[str, Any]] = None) -> SessionPool:
+    """Close the shared pool and start a fresh one (sizing and counters) for a new run."""
+    global _pool
+    pool = SessionPool.from_runtime(runtime)
+    with _pool_lock:
+        old = _pool
+        _pool = pool
+    if old is not None:
+        old.close()
+    return pool
@@ -0,0 +1,318 @@
+"""World Bank WDI bulk snapshot ingestion (source ``WB_BULK``).
+
+For runs over the whole country universe the per-country JSON API costs one
+request per (indicator, country batch, page). The World Bank also publishes
+the complete WDI dataset as one wide CSV (``Country Code``, ``Indicator
+Code`` and one column per year), usually zipped. `WBBulkFetcher` reads such
+a snapshot instead:
+
+- the snapshot is `runtime.wb_bulk_path` (``.csv`` or ``.zip``) or, if unset,
+  `runtime.wb_bulk_url` downloaded once into `runtime.wb_bulk_dir`;
+- the first fetch streams the CSV in chunks of `wb_bulk_chunk_rows` rows,
+  spilling each chunk to per-indicator files, and writes a columnar index: one ``(country, year, value)`` partition per
+  indicator code plus a catalogue, under a directory named after the
+  snapshot's sha256;
+- every fetch (and every later run on the same snapshot) reads only the
+  partitions of the requested indicators and filters them to the requested
+  countries and years.
+
+`fetch` returns the usual ``(df, fetch_logs)`` with one log per country;
+`request_url` is the snapshot's ``file://`` URL and `sha256_raw` its hash.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time as _time
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.io.artifacts import sha256_of_records
+from src.io.cache_backends import atomic_write, make_backend
+from src.io.filelock import FileLock
+from ._utils import tag_freq
+from .base import AbstractFetcher
+
+WDI_BULK_URL = "https://databank.worldbank.org/data/download/WDI_CSV.zip"
+# data member of the WDI zip (the name changed between releases)
+WDI_MEMBERS = ("WDICSV.csv", "WDIData.csv")
+CATALOG_KEY = "_catalog"
+INDEX_FORMAT = "wdi-index-v1"
+
+
+def _partition_key(code: str) -> str:
+    return "ind_" + re.sub(r"[^A-Za-z0-9._-]", "_", str(code))
+
+
+def _year(period: str) -> int:
+    return int(str(period)[:4])
+
+
+def _data_member(zf: zipfile.ZipFile) -> str:
+    names = [n for n in zf.namelist() if n.lower().endswith(".csv")]
+    for wanted in WDI_MEMBERS:
+        for n in names:
+            if os.path.basename(n).lower() == wanted.lower():
+                return n
+    # otherwise the largest CSV; the others are country/series metadata
+    if not names:
+        raise ValueError("WDI snapshot zip contains no CSV file")
+    return max(names, key=lambda n: zf.getinfo(n).file_size)
+
+
+@contextmanager
+def open_snapshot(path: str) -> Iterator[Tuple[Any, str]]:
+    """Yield (text stream, member name) of the snapshot's data CSV."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            member = _data_member(zf)
+            with zf.open(member) as raw:
+                yield io.TextIOWrapper(raw, encoding="utf-8-sig"), member
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as fh:
+            yield fh, os.path.basename(path)
+
+
+def iter_observations(fh, chunk_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """Stream a wide WDI CSV as long (country, indicator, year, value) arrays.
+
+    Only non-missing observations are yielded, one tuple of arrays per chunk.
+    """
+    header = pd.read_csv(fh, nrows=0).columns
+    fh.seek(0)
+    year_cols = [c for c in header if re.fullmatch(r"\d{4}", str(c).strip())]
+    years = np.array([int(str(c).strip()) for c in year_cols], dtype="int64")
+    dtypes: Dict[str, Any] = {c: "float64" for c in year_cols}
+    dtypes.update({"Country Code": str, "Indicator Code": str})
+    reader = pd.read_csv(
+        fh,
+        usecols=["Country Code", "Indicator Code", *year_cols],
+        dtype=dtypes,
+        chunksize=max(1, int(chunk_rows)),
+    )
+    for chunk in reader:
+        values = chunk[year_cols].to_numpy(dtype="float64")
+        rows, cols = np.nonzero(~np.isnan(values))
+        if not len(rows):
+            continue
+        yield (
+            chunk["Country Code"].to_numpy(dtype=object)[rows],
+            chunk["Indicator Code"].to_numpy(dtype=object)[rows],
+            years[cols],
+            values[rows, cols],
+        )
+
+
+def _spill(spill_dir: str, code: str, arrays: Tuple[np.ndarray, ...]) -> None:
+    """Append one chunk's (country, year, value) slice to the indicator's spill file."""
+    with open(os.path.join(spill_dir, _partition_key(code) + ".npy"), "ab") as fh:
+        for arr in arrays:
+            np.save(fh, arr, allow_pickle=False)
+
+
+def _read_spill(spill_dir: str, code: str) -> pd.DataFrame:
+    """The indicator's spilled chunks as one (country, year, value) frame."""
+    path = os.path.join(spill_dir, _partition_key(code) + ".npy")
+    size = os.path.getsize(path)
+    cols: Tuple[List[np.ndarray], ...] = ([], [], [])
+    with open(path, "rb") as fh:
+        while fh.tell() < size:
+            for col in cols:
+                col.append(np.load(fh, allow_pickle=False))
+    return pd.DataFrame(
+        {
+            "country": np.concatenate(cols[0]).astype(str),
+            "year": np.concatenate(cols[1]),
+            "value": np.concatenate(cols[2]),
+        }
+    )
+
+
+def build_index(path: str, index_dir: str, chunk_rows: int, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Write one columnar partition per indicator and the catalogue; returns the catalogue meta.
+
+    Each chunk is appended to per-indicator spill files as it is read, so
+    memory stays bounded by the chunk size (plus one indicator's partition
+    while it is written) rather than by the whole snapshot.
+    """
+    backend = make_backend("columnar", index_dir)
+    os.makedirs(index_dir, exist_ok=True)
+    spill_dir = tempfile.mkdtemp(prefix="_spill", dir=index_dir)
+    try:
+        codes = set()
+        with open_snapshot(path) as (fh, member):
+            for countries, indicators, years, values in iter_observations(fh, chunk_rows):
+                # split the chunk by indicator: WDI files are sorted by country,
+                # so one chunk holds a slice of every indicator
+                order = np.argsort(indicators, kind="stable")
+                uniq, starts = np.unique(indicators[order], return_index=True)
+                bounds = list(starts[1:]) + [len(order)]
+                for code, lo, hi in zip(uniq, starts, bounds):
+                    sel = order[lo:hi]
+                    codes.add(str(code))
+                    _spill(spill_dir, str(code), (countries[sel].astype(str), years[sel], values[sel]))
+        catalog = []
+        for code in sorted(codes):
+            frame = _read_spill(spill_dir, code)
+            backend.write(_partition_key(code), frame, {"indicator": code})
+            catalog.append({"indicator": code, "rows": len(frame)})
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+    meta = {"format": INDEX_FORMAT, "snapshot": snapshot, "member": member}
+    backend.write(CATALOG_KEY, pd.DataFrame(catalog, columns=["indicator", "rows"]), meta)
+    return meta
+
+
+class WBBulkFetcher(AbstractFetcher):
+    source = "WB_BULK"
+
+    def __init__(self, runtime_config: Optional[Dict] = None):
+        super().__init__(runtime_config)
+        self.path = self.runtime.get("wb_bulk_path")
+        self.url = self.runtime.get("wb_bulk_url") or WDI_BULK_URL
+        self.data_dir = self.runtime.get("wb_bulk_dir") or os.path.join(".cache", "wb_bulk")
+        self.chunk_rows = int(self.runtime.get("wb_bulk_chunk_rows") or 5000)
+        self.timeout = self.runtime.get("request_timeout_sec", 20)
+
+    def _download(self) -> str:
+        name = os.path.basename(self.url.split("?", 1)[0]) or "wdi_snapshot.zip"
+        target = os.path.join(self.data_dir, name)
+        with FileLock(target + ".lock"):
+            if os.path.exists(target):
+                return target
+            logging.getLogger(__name__).info(f"Downloading WDI snapshot {self.url}")
+            r = self.http_get(self.url, stream=True, timeout=self.timeout)
+            r.raise_for_status()
+
+            def _write(fh):
+                for block in r.iter_content(1 << 20):
+                    fh.write(block)
+
+            atomic_write(target, _write, binary=True)
+        return target
+
+    def snapshot_path(self) -> str:
+        if self.path:
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(f"WDI snapshot not found: {self.path}")
+            return self.path
+        return self._download()
+
+    def _fingerprint(self, path: str) -> Dict[str, Any]:
+        """Size, mtime and sha256 of the snapshot; the hash is reused while
+        size and mtime are unchanged so repeat runs do not re-read the file."""
+        st = os.stat(path)
+        state_path = os.path.join(self.data_dir, "snapshots.json")
+        key = os.path.abspath(path)
+        try:
+            with open(state_path, "r", encoding="utf-8") as fh:
+                state = json.load(fh)
+        except (OSError, ValueError):
+            state = {}
+        known = state.get(key) or {}
+        if known.get("size") == st.st_size and known.get("mtime_ns") == st.st_mtime_ns and known.get("sha256"):
+            return dict(known, path=key)
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                h.update(block)
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": h.hexdigest()}
+        state[key] = entry
+        atomic_write(state_path, lambda fh: json.dump(state, fh, indent=2))
+        return dict(entry, path=key)
+
+    def index(self, path: str) -> Tuple[Any, Dict[str, Any], bool]:
+        """(backend, catalogue meta, built) of the snapshot's index, building it if needed."""
+        os.makedirs(self.data_dir, exist_ok=True)
+        snapshot = self._fingerprint(path)
+        index_dir = os.path.join(self.data_dir, "index", snapshot["sha256"][:16])
+        backend = make_backend("columnar", index_dir)
+        built = False
+        # one writer per snapshot; other threads and processes wait and reuse it
+        with FileLock(index_dir + ".lock"):
+            if not backend.exists(CATALOG_KEY):
+                t0 = _time.time()
+                build_index(path, index_dir, self.chunk_rows, snapshot)
+                built = True
+                logging.getLogger(__name__).info(
+                    f"Indexed WDI snapshot {path} in {_time.time() - t0:.1f}s"
+                )
+        _, meta = backend.read(CATALOG_KEY)
+        return backend, meta, built
+
+    def _logs(self, ind, countries, rows_by_country, meta, params, elapsed_ms, built, error=None):
+        snapshot = meta.get("snapshot") or {}
+        logs = []
+        for country in countries:
+            recs = rows_by_country.get(country, [])
+            logs.append(
+                {
+                    "request_url": "file://" + str(snapshot.get("path") or ""),
+                    "params": params,
+                    "http_status": None,
+                    "response_time_ms": elapsed_ms,
+                    "rows": len(recs),
+                    "sha256_raw": snapshot.get("sha256"),
+                    "sha256_normalized": sha256_of_records(recs) if error is None else None,
+                    "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
+                    "api_meta": {"member": meta.get("member"), "index": "built" if built else "reused"} if meta else None,
+                    "indicator": ind.get("id"),
+                    "country": country,
+                    "no_backfill": False,
+                    **({"error": error} if error is not None else {}),
+                }
+            )
+        return logs
+
+    def fetch(
+        self,
+        countries: List[str],
+        indicators: List[Dict],
+        start: str,
+        end: str,
+        freq: str = "A",
+    ) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        y0, y1 = _year(start), _year(end)
+        params_base = {"date": f"{y0}:{y1}"}
+        wanted = {str(c).upper(): c for c in countries}
+        all_rows: List[Dict[str, Any]] = []
+        fetch_logs: List[Dict[str, Any]] = []
+        t0 = _time.time()
+        try:
+            path = self.snapshot_path()
+            backend, meta, built = self.index(path)
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"WB bulk snapshot unavailable: {e}")
+            for ind in indicators:
+                params = dict(params_base, indicator=ind.get("code"))
+                fetch_logs.extend(self._logs(ind, countries, {}, {}, params, 0, False, error=str(e)))
+            return pd.DataFrame(columns=["source", "indicator", "country", "date", "value"]), fetch_logs
+        for ind in indicators:
+            code = str(ind.get("code"))
+            params = dict(params_base, indicator=code)
+            started = _time.time()
+            key = _partition_key(code)
+            part = backend.read(key)[0] if backend.exists(key) else pd.DataFrame(columns=["country", "year", "value"])
+            part = part[part["country"].str.upper().isin(wanted.keys()) & part["year"].between(y0, y1)]
+            rows_by_country: Dict[str, List[Dict[str, Any]]] = {}
+            for country, year, value in zip(part["country"], part["year"], part["value"]):
+                c = wanted[str(country).upper()]
+                rows_by_country.setdefault(c, []).append(
+                    {"indicator": ind["id"], "country": c, "date": str(int(year)), "value": float(value)}
+                )
+            for recs in rows_by_country.values():
+                all_rows.extend({"source": self.source, **r} for r in recs)
+            elapsed_ms = int((_time.time() - (t0 if built else started)) * 1000.0)
+            fetch_logs.extend(self._logs(ind, countries, rows_by_country, meta, params, elapsed_ms, built))
+        if not all_rows:
+            return pd.DataFrame(columns=["source", "indicator", "country", "date", "value"]), fetch_logs
+        return tag_freq(pd.DataFrame(all_rows)), fetch_logs
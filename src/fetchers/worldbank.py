@@ -1,18 +1,43 @@
-import requests  # type: ignore
 import pandas as pd
 from .base import AbstractFetcher
+from ._utils import tag_freq
+from .async_engine import FetchLimits
+from .breaker import CLOSED, CircuitOpenError
+from .deadline import DeadlineExceeded
+import asyncio
 import logging
 import hashlib
 import time as _time
+from datetime import datetime, timezone
+from urllib.parse import unquote, urlsplit
 
 try:
     from tenacity import retry  # type: ignore
 except Exception:
     retry = None  # type: ignore
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Any
 from src.io.artifacts import sha256_of_records
 
 WB_BASE = "https://api.worldbank.org/v2"
+# page size used when several countries are requested in one call; a batch of
+# 50 countries over a decade of annual data fits into a single page
+WB_BATCH_PER_PAGE = 1000
+
+
+class WBAPIError(Exception):
+    """Raised when the WB API answers with an error message instead of data."""
+
+
+def _date_param(start: str, end: str) -> str:
+    # World Bank API expects year ranges for many series (e.g. 2020:2021)
+    if start and "-" in start:
+        return f"{start[:4]}:{end[:4]}"
+    return f"{start}:{end}"
+
+
+def _chunks(items: List[str], size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
 
 
 class WorldBankFetcher(AbstractFetcher):
@@ -22,14 +47,17 @@ class WorldBankFetcher(AbstractFetcher):
         super().__init__(runtime_config)
         self.timeout = self.runtime.get("request_timeout_sec", 20)
         self.retry_max = self.runtime.get("retry_max", 3)
+        # number of countries joined into one request (``DEU;FRA;ITA``); 1 disables batching
+        self.batch_size = max(1, int(self.runtime.get("wb_batch_size", 50) or 1))
+        self.base_url = (self.runtime.get("wb_base_url") or WB_BASE).rstrip("/")
 
-    def _get(self, url, params):
+    def _get(self, url, params, headers=None):
         # If tenacity is available it would decorate this; otherwise simple retry
         attempts = 0
         while True:
             try:
                 start = _time.time()
-                r = requests.get(url, params=params, timeout=self.timeout)
+                r = self.http_get(url, params=params, headers=headers, timeout=self.timeout)
                 elapsed = (_time.time() - start) * 1000.0
                 r.raise_for_status()
                 # compute sha256 of raw content
@@ -47,13 +75,370 @@ class WorldBankFetcher(AbstractFetcher):
                     "sha256_raw": sha,
                 }
                 return r, http_meta
+            except (CircuitOpenError, DeadlineExceeded):
+                raise
             except Exception:
                 attempts += 1
-                if attempts >= (self.retry_max or 3):
+                # no point in backing off once the provider's breaker has opened
+                if attempts >= (self.retry_max or 3) or self.circuit_breaker.state != CLOSED:
                     raise
-                sleep = min(10, 2**attempts)
+                # the next attempt fails with DeadlineExceeded if this used up the time left
+                sleep = self.run_deadline.cap(min(10, 2**attempts))
                 _time.sleep(sleep)
 
+    @staticmethod
+    def _parse_page(r) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split a WB JSON page into (api_meta, records).
+
+        Returns (None, []) for empty bodies and raises WBAPIError when the API
+        returned an error message (e.g. an unknown country in a batch).
+        """
+        try:
+            data = r.json()
+        except Exception:
+            data = None
+        if isinstance(data, list) and data and isinstance(data[0], dict) and data[0].get("message"):
+            raise WBAPIError(str(data[0].get("message")))
+        # defensive: data may be a list-like but with None in place of records
+        if not data or len(data) < 2:
+            return None, []
+        api_meta, records = data[0], data[1]
+        if records is None or not isinstance(records, list):
+            return api_meta, []
+        return api_meta, records
+
+    @staticmethod
+    def _match_country(rec: Dict[str, Any], batch: List[str], lookup: Dict[str, str]) -> Optional[str]:
+        """Map a returned record back to the requested country code."""
+        if len(batch) == 1:
+            return batch[0]
+        country_obj = rec.get("country") or {}
+        candidates = [rec.get("countryiso3code")]
+        if isinstance(country_obj, dict):
+            candidates.append(country_obj.get("id"))
+        for cand in candidates:
+            if cand and str(cand).upper() in lookup:
+                return lookup[str(cand).upper()]
+        return None
+
+    def _error_entry(self, url: str, params: Dict[str, Any], ind: Dict, country: str, e: Exception) -> Dict[str, Any]:
+        return {
+            "request_url": url,
+            "params": params,
+            "http_status": None,
+            "response_time_ms": 0,
+            "rows": 0,
+            "sha256_raw": None,
+            "sha256_normalized": None,
+            "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
+            "indicator": ind.get("id"),
+            "country": country,
+            "api_meta": None,
+            "no_backfill": False,
+            "error": str(e),
+        }
+
+    def _batch_url(self, ind: Dict, batch: List[str]) -> str:
+        return f"{self.base_url}/country/{';'.join(batch)}/indicator/{ind['code']}"
+
+    @staticmethod
+    def _page_params(start: str, end: str, per_page: int, page: int) -> Dict[str, Any]:
+        return {
+            "format": "json",
+            "date": _date_param(start, end),
+            "per_page": per_page,
+            "page": page,
+        }
+
+    @staticmethod
+    def _n_pages(api_meta: Optional[Dict[str, Any]], per_page: int) -> int:
+        if not api_meta:
+            return 1
+        total = int(api_meta.get("total", 0) or 0)
+        page_size = int(api_meta.get("per_page", per_page) or per_page)
+        return max(1, -(-total // max(1, page_size)))
+
+    @staticmethod
+    def _combined_sha(pages: list) -> Optional[str]:
+        page_shas = [p[1].get("sha256_raw") for p in pages if isinstance(p[1], dict)]
+        if len(page_shas) == 1:
+            return page_shas[0]
+        if page_shas and all(page_shas):
+            return hashlib.sha256("".join(page_shas).encode("utf-8")).hexdigest()
+        return None
+
+    def _batch_validators(
+        self, ind: Dict, batch: List[str], start: str, end: str
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Cached fetch logs of the batch's countries, usable to revalidate it.
+
+        `ind["validators"]` maps country -> last fetch log. They apply only when
+        every country has one and all come from this very request (same batch
+        and date window), since ETags and payload hashes describe a whole response.
+        """
+        validators = ind.get("validators") or {}
+        entries = [validators.get(c) for c in batch]
+        if not entries or any(not e for e in entries):
+            return None
+        path = unquote(urlsplit(self._batch_url(ind, batch)).path)
+        date = _date_param(start, end)
+        for e in entries:
+            if unquote(urlsplit(str(e.get("request_url") or "")).path) != path:
+                return None
+            if (e.get("params") or {}).get("date") != date:
+                return None
+        return dict(zip(batch, entries))
+
+    @staticmethod
+    def _conditional_headers(validators: Optional[Dict[str, Dict[str, Any]]]) -> Optional[Dict[str, str]]:
+        if not validators:
+            return None
+        first = next(iter(validators.values()))
+        headers = {}
+        if first.get("etag"):
+            headers["If-None-Match"] = first["etag"]
+        if first.get("last_modified"):
+            headers["If-Modified-Since"] = first["last_modified"]
+        return headers or None
+
+    def _not_modified(self, ind: Dict, validators: Dict[str, Dict[str, Any]], r, meta: Dict[str, Any], params, how: str):
+        """Per-country logs for a batch the provider confirmed unchanged.
+
+        No rows are returned: the caller keeps using its cached series.
+        """
+        headers = getattr(r, "headers", None) or {}
+        logs = []
+        for country, cached in validators.items():
+            entry = dict(cached)
+            entry.update(
+                {
+                    "request_url": getattr(r, "url", None) or cached.get("request_url"),
+                    "params": params,
+                    "http_status": getattr(r, "status_code", None),
+                    "response_time_ms": int((meta or {}).get("response_time_ms") or 0),
+                    "etag": headers.get("ETag") or cached.get("etag"),
+                    "last_modified": headers.get("Last-Modified") or cached.get("last_modified"),
+                    "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
+                    "indicator": ind["id"],
+                    "country": country,
+                    "not_modified": True,
+                    "revalidated_by": how,
+                }
+            )
+            entry.pop("error", None)
+            logs.append(entry)
+        return [], logs
+
+    def _revalidate_first_page(self, ind: Dict, validators, r, meta, params, per_page: int):
+        """Short-circuit on the first page: HTTP 304, or an unchanged single-page
+        payload (same sha256_raw), which is then not parsed at all."""
+        if not validators:
+            return None
+        if getattr(r, "status_code", None) == 304:
+            first = next(iter(validators.values()))
+            return self._not_modified(ind, validators, r, meta, params, "etag" if first.get("etag") else "last_modified")
+        first = next(iter(validators.values()))
+        if (
+            first.get("sha256_raw")
+            and meta.get("sha256_raw") == first.get("sha256_raw")
+            and self._n_pages(first.get("api_meta"), per_page) == 1
+        ):
+            return self._not_modified(ind, validators, r, meta, params, "sha256_raw")
+        return None
+
+    def _revalidate_pages(self, ind: Dict, validators, pages: list):
+        """Multi-page responses: compare the combined hash of all pages."""
+        if not validators:
+            return None
+        first = next(iter(validators.values()))
+        sha = self._combined_sha(pages)
+        if sha and sha == first.get("sha256_raw"):
+            r, meta, params = pages[0][0], pages[0][1], pages[0][2]
+            meta = dict(meta, response_time_ms=sum(int((p[1] or {}).get("response_time_ms") or 0) for p in pages))
+            return self._not_modified(ind, validators, r, meta, params, "sha256_raw")
+        return None
+
+    def _fetch_batch(self, ind: Dict, batch: List[str], start: str, end: str):
+        """Fetch one indicator for a batch of countries, following pagination.
+
+        Returns (rows, fetch_logs) with one fetch log per country of the batch.
+        Raises on transport or API errors so the caller can decide how to recover.
+        """
+        url = self._batch_url(ind, batch)
+        per_page = WB_BATCH_PER_PAGE if len(batch) > 1 else 100
+        validators = self._batch_validators(ind, batch, start, end)
+        pages = []
+        page = 1
+        while True:
+            params = self._page_params(start, end, per_page, page)
+            r, meta = self._get(url, params, headers=self._conditional_headers(validators) if page == 1 else None)
+            if page == 1:
+                unchanged = self._revalidate_first_page(ind, validators, r, meta, params, per_page)
+                if unchanged is not None:
+                    return unchanged
+            api_meta, records = self._parse_page(r)
+            pages.append((r, meta, params, api_meta, records))
+            # pagination
+            if page >= self._n_pages(api_meta, per_page):
+                break
+            page += 1
+            if not self.rate_limiter.enabled:
+                # fixed pacing unless runtime.rate_limits throttles this source
+                _time.sleep(self.run_deadline.cap(0.1))
+        unchanged = self._revalidate_pages(ind, validators, pages)
+        if unchanged is not None:
+            return unchanged
+        return self._split_pages(ind, batch, pages)
+
+    async def _afetch_batch(self, ind: Dict, batch: List[str], start: str, end: str, limits: FetchLimits):
+        """Async `_fetch_batch`: the first page tells how many pages follow, which
+        are then requested concurrently."""
+        url = self._batch_url(ind, batch)
+        per_page = WB_BATCH_PER_PAGE if len(batch) > 1 else 100
+        validators = self._batch_validators(ind, batch, start, end)
+
+        async def _get_page(page: int, headers=None):
+            params = self._page_params(start, end, per_page, page)
+            r, meta = await limits.run_blocking(self.source, self._get, url, params, headers=headers)
+            return r, meta, params
+
+        async def _parsed(page: int):
+            r, meta, params = await _get_page(page)
+            api_meta, records = self._parse_page(r)
+            return (r, meta, params, api_meta, records)
+
+        r, meta, params = await _get_page(1, self._conditional_headers(validators))
+        unchanged = self._revalidate_first_page(ind, validators, r, meta, params, per_page)
+        if unchanged is not None:
+            return unchanged
+        api_meta, records = self._parse_page(r)
+        pages = [(r, meta, params, api_meta, records)]
+        n_pages = self._n_pages(api_meta, per_page)
+        if n_pages > 1:
+            pages.extend(await asyncio.gather(*(_parsed(p) for p in range(2, n_pages + 1))))
+        unchanged = self._revalidate_pages(ind, validators, pages)
+        if unchanged is not None:
+            return unchanged
+        return self._split_pages(ind, batch, pages)
+
+    def _split_pages(self, ind: Dict, batch: List[str], pages: list):
+        """Split the pages of a (batched) response into per-country rows and logs."""
+        lookup = {c.upper(): c for c in batch}
+        per_country: Dict[str, list] = {c: [] for c in batch}
+        for _r, _meta, _params, _api_meta, records in pages:
+            for rec in records:
+                country = self._match_country(rec, batch, lookup)
+                if country is not None:
+                    per_country[country].append(rec)
+
+        first_r, first_meta, first_params, first_api_meta, _ = pages[0]
+        sha_raw = self._combined_sha(pages)
+        response_time = sum(int((p[1] or {}).get("response_time_ms") or 0) for p in pages)
+        api_meta = dict(first_api_meta) if isinstance(first_api_meta, dict) else None
+        if api_meta is not None and len(batch) > 1:
+            api_meta["batch_countries"] = list(batch)
+        headers = getattr(first_r, "headers", None) or {}
+
+        rows: list[dict] = []
+        fetch_logs: list[dict] = []
+        for country in batch:
+            recs_for_hash = []
+            for rec in per_country[country]:
+                if rec.get("value") is None:
+                    continue
+                rows.append(
+                    {
+                        "source": "WB",
+                        "indicator": ind["id"],
+                        "country": country,
+                        "date": rec.get("date"),
+                        "value": rec.get("value"),
+                    }
+                )
+                recs_for_hash.append(
+                    {
+                        "indicator": ind["id"],
+                        "country": country,
+                        "date": rec.get("date"),
+                        "value": rec.get("value"),
+                    }
+                )
+            fetch_logs.append(
+                {
+                    "request_url": getattr(first_r, "url", None),
+                    "params": first_params,
+                    "http_status": getattr(first_r, "status_code", None),
+                    "response_time_ms": response_time,
+                    "rows": len(per_country[country]),
+                    "etag": headers.get("ETag"),
+                    "last_modified": headers.get("Last-Modified"),
+                    "sha256_raw": sha_raw,
+                    "sha256_normalized": sha256_of_records(recs_for_hash),
+                    "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
+                    "api_meta": api_meta,
+                    "indicator": ind["id"],
+                    "country": country,
+                    "no_backfill": False,
+                }
+            )
+        return rows, fetch_logs
+
+    def _batch_error(self, ind: Dict, batch: List[str], start: str, end: str, err: Exception):
+        # transport errors are not retried per country: the host is failing, not the batch
+        logging.getLogger(__name__).warning(f"WB fetch error for {';'.join(batch)}/{ind['code']}: {err}")
+        params = {"format": "json", "date": _date_param(start, end), "page": 1}
+        return [], [
+            self._error_entry(
+                self._batch_url(ind, [country]), params, ind, country, err
+            )
+            for country in batch
+        ]
+
+    @staticmethod
+    def _log_rejected_batch(ind: Dict, batch: List[str], e: Exception) -> None:
+        # typically one unknown code poisons the whole batch; it is retried singly
+        logging.getLogger(__name__).info(
+            f"WB batch request for {ind['code']} rejected ({e}); retrying {len(batch)} countries individually"
+        )
+
+    def _fetch_batch_or_split(self, ind: Dict, batch: List[str], start: str, end: str):
+        try:
+            return self._fetch_batch(ind, batch, start, end)
+        except WBAPIError as e:
+            if len(batch) > 1:
+                self._log_rejected_batch(ind, batch, e)
+                rows: list[dict] = []
+                logs: list[dict] = []
+                for country in batch:
+                    r_rows, r_logs = self._fetch_batch_or_split(ind, [country], start, end)
+                    rows.extend(r_rows)
+                    logs.extend(r_logs)
+                return rows, logs
+            err: Exception = e
+        except Exception as e:
+            err = e
+        return self._batch_error(ind, batch, start, end, err)
+
+    async def _afetch_batch_or_split(self, ind: Dict, batch: List[str], start: str, end: str, limits: FetchLimits):
+        try:
+            return await self._afetch_batch(ind, batch, start, end, limits)
+        except WBAPIError as e:
+            if len(batch) > 1:
+                self._log_rejected_batch(ind, batch, e)
+                parts = await asyncio.gather(
+                    *(self._afetch_batch_or_split(ind, [c], start, end, limits) for c in batch)
+                )
+                rows: list[dict] = []
+                logs: list[dict] = []
+                for r_rows, r_logs in parts:
+                    rows.extend(r_rows)
+                    logs.extend(r_logs)
+                return rows, logs
+            err: Exception = e
+        except Exception as e:
+            err = e
+        return self._batch_error(ind, batch, start, end, err)
+
     def fetch(
         self,
         countries: List[str],
@@ -63,138 +448,15 @@ class WorldBankFetcher(AbstractFetcher):
         freq: str,
     ) -> pd.DataFrame:
         rows: list[dict] = []
-        logger = logging.getLogger(__name__)
         fetch_logs: list[dict] = []
         # defensive: if indicators is None or empty, return empty structures
         if not indicators:
             return pd.DataFrame(columns=["source", "indicator", "country", "date", "value"]), fetch_logs
         for ind in indicators:
-            code = ind["code"]
-            for country in countries:
-                page = 1
-                while True:
-                    url = f"{WB_BASE}/country/{country}/indicator/{code}"
-                    # World Bank API expects year ranges for many series (e.g. 2020:2021)
-                    if start and "-" in start:
-                        date_param = f"{start[:4]}:{end[:4]}"
-                    else:
-                        date_param = f"{start}:{end}"
-                    params = {
-                        "format": "json",
-                        "date": date_param,
-                        "per_page": 100,
-                        "page": page,
-                    }
-                    try:
-                        r, meta = self._get(url, params)
-                    except Exception as e:
-                        # log and append a canonical error entry then break
-                        logger.warning(f"WB fetch error for {country}/{code}: {e}")
-                        from datetime import datetime, timezone
-                        fetch_logs.append(
-                            {
-                                "request_url": url,
-                                "params": params,
-                                "http_status": None,
-                                "response_time_ms": 0,
-                                "rows": 0,
-                                "sha256_raw": None,
-                                "sha256_normalized": None,
-                                "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
-                                "indicator": ind.get("id"),
-                                "country": country,
-                                "api_meta": None,
-                                "no_backfill": False,
-                                "error": str(e),
-                            }
-                        )
-                        break
-                    try:
-                        data = r.json()
-                    except Exception:
-                        data = None
-                    # attach rows count if possible
-                    rows_count = 0
-                    # defensive: data may be a list-like but with None in place of records
-                    if not data or len(data) < 2:
-                        # still record the fetch attempt
-                        meta.update({"rows": 0})
-                        fetch_logs.append(meta)
-                        break
-                    api_meta, records = data[0], data[1]
-                    if records is None or not isinstance(records, list):
-                        # no records returned for this page
-                        meta.update({"rows": 0})
-                        fetch_logs.append(meta)
-                        break
-                    for rec in records:
-                        if rec.get("value") is None:
-                            continue
-                        rows.append(
-                            {
-                                "source": "WB",
-                                "indicator": ind["id"],
-                                "country": country,
-                                "date": rec.get("date"),
-                                "value": rec.get("value"),
-                            }
-                        )
-                    rows_count = len(records)
-                    # record fetch metadata including rows returned and any header fields
-                    try:
-                        # build records for this response to compute normalized hash
-                        recs_for_hash = []
-                        for rec in records:
-                            if rec.get("value") is None:
-                                continue
-                            recs_for_hash.append(
-                                {
-                                    "indicator": ind["id"],
-                                    "country": country,
-                                    "date": rec.get("date"),
-                                    "value": rec.get("value"),
-                                }
-                            )
-                        sha_norm = sha256_of_records(recs_for_hash)
-                        meta_entry = {
-                            "request_url": r.url,
-                            "params": params,
-                            "http_status": r.status_code,
-                            "response_time_ms": (
-                                meta.get("response_time_ms")
-                                if isinstance(meta, dict)
-                                else None
-                            ),
-                            "rows": rows_count,
-                            "etag": r.headers.get("ETag"),
-                            "last_modified": r.headers.get("Last-Modified"),
-                            "sha256_raw": (
-                                meta.get("sha256_raw")
-                                if isinstance(meta, dict)
-                                else None
-                            ),
-                            "sha256_normalized": sha_norm,
-                            "fetch_timestamp": datetime.now(timezone.utc).isoformat(),
-                            "api_meta": api_meta,
-                            "indicator": ind["id"],
-                            "country": country,
-                            "no_backfill": False,
-                        }
-                    except Exception:
-                        meta_entry = {
-                            "url": url,
-                            "params": params,
-                            "rows": rows_count,
-                            "api_meta": api_meta,
-                        }
-                    fetch_logs.append(meta_entry)
-                    # pagination
-                    total = int(api_meta.get("total", 0))
-                    per_page = int(api_meta.get("per_page", 100))
-                    if page * per_page >= total:
-                        break
-                    page += 1
-                    _time.sleep(0.1)
+            for batch in _chunks(list(countries), self.batch_size):
+                b_rows, b_logs = self._fetch_batch_or_split(ind, batch, start, end)
+                rows.extend(b_rows)
+                fetch_logs.extend(b_logs)
         if not rows:
             return (
                 pd.DataFrame(
@@ -202,5 +464,46 @@ class WorldBankFetcher(AbstractFetcher):
                 ),
                 fetch_logs,
             )
-        df = pd.DataFrame(rows)
+        df = tag_freq(pd.DataFrame(rows))
         return df, fetch_logs
+
+    async def afetch(
+        self,
+        countries: List[str],
+        indicators: List[Dict],
+        start: str,
+        end: str,
+        freq: str,
+        limits: Optional[FetchLimits] = None,
+    ):
+        """Fan out indicators x country batches x pages on the event loop.
+
+        Returns the same (df, fetch_logs) as `fetch`, in the same order.
+        """
+        # subclasses that replace fetch (e.g. fixture runners) keep their behaviour;
+        # __class__ is this class even when the module attribute has been patched
+        if type(self).fetch is not __class__.fetch:  # type: ignore[name-defined]
+            return await super().afetch(countries, indicators, start, end, freq, limits=limits)
+        if not indicators:
+            return pd.DataFrame(columns=["source", "indicator", "country", "date", "value"]), []
+        own_limits = limits is None
+        lim = limits or FetchLimits.from_runtime(self.runtime)
+        try:
+            parts = await asyncio.gather(
+                *(
+                    self._afetch_batch_or_split(ind, batch, start, end, lim)
+                    for ind in indicators
+                    for batch in _chunks(list(countries), self.batch_size)
+                )
+            )
+        finally:
+            if own_limits:
+                lim.executor.shutdown(wait=False)
+        rows: list[dict] = []
+        fetch_logs: list[dict] = []
+        for b_rows, b_logs in parts:
+            rows.extend(b_rows)
+            fetch_logs.extend(b_logs)
+        if not rows:
+            return pd.DataFrame(columns=["source", "indicator", "country", "date", "value"]), fetch_logs
+        return tag_freq(pd.DataFrame(rows)), fetch_logs
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List, Dict
+from typing import List, Dict, Optional
 import pandas as pd
 
 
@@ -12,10 +12,29 @@ class IndicatorPlugin:
         self.config = config
 
     def fetch(
-        self, countries: List[str], start: str, end: str, freq: str
+        self, countries: List[str], start: str, end: str, freq: str, validators: Optional[Dict] = None
     ) -> pd.DataFrame:
         raise NotImplementedError()
 
+    def indicator_spec(self, validators: Optional[Dict] = None) -> Dict:
+        """The indicator dict handed to fetchers; `validators` maps country ->
+        cached fetch log for conditional revalidation."""
+        spec = {"id": self.id, "code": getattr(self, "code", None)}
+        # per-source options from the config entry (e.g. SDMX `resource`/`key`)
+        spec.update(getattr(self, "options", None) or {})
+        if validators:
+            spec["validators"] = validators
+        return spec
+
+    async def afetch(self, countries: List[str], start: str, end: str, freq: str, limits=None, validators=None):
+        """Async fetch used by the async engine; delegates to the wrapped fetcher."""
+        fetcher = getattr(self, "fetcher", None)
+        if fetcher is None:
+            raise NotImplementedError()
+        return await fetcher.afetch(
+            countries, [self.indicator_spec(validators)], start, end, freq, limits=limits
+        )
+
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         raise NotImplementedError()
 
@@ -1,21 +1,22 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import pandas as pd
 from .base import IndicatorPlugin
 from ..fetchers.imf import IMFFetcher
 
 
 class IMFIndicator(IndicatorPlugin):
-    def __init__(self, config: Dict, indicator_id: str, source_code: str):
+    def __init__(self, config: Dict, indicator_id: str, source_code: str, options: Optional[Dict] = None):
         super().__init__(config)
         self.id = indicator_id
         self.code = source_code
+        self.options = options or {}
         self.fetcher = IMFFetcher(config.get("runtime"))
 
     def fetch(
-        self, countries: List[str], start: str, end: str, freq: str
+        self, countries: List[str], start: str, end: str, freq: str, validators: Optional[Dict] = None
     ) -> pd.DataFrame:
         df, logs = self.fetcher.fetch(
-            countries, [{"id": self.id, "code": self.code}], start, end, freq
+            countries, [self.indicator_spec(validators)], start, end, freq
         )
         return df, logs
 
@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import pandas as pd
 from .base import IndicatorPlugin
 from ..fetchers.worldbank import WorldBankFetcher
@@ -12,10 +12,10 @@ class WBIndicator(IndicatorPlugin):
         self.fetcher = WorldBankFetcher(config.get("runtime"))
 
     def fetch(
-        self, countries: List[str], start: str, end: str, freq: str
+        self, countries: List[str], start: str, end: str, freq: str, validators: Optional[Dict] = None
     ) -> pd.DataFrame:
         df, logs = self.fetcher.fetch(
-            countries, [{"id": self.id, "code": self.code}], start, end, freq
+            countries, [self.indicator_spec(validators)], start, end, freq
         )
         return df, logs
 
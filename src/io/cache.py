@@ -1,9 +1,29 @@
+import argparse
+import hashlib
+import logging
 import os
+import re
 import json
+import sqlite3
 from datetime import datetime, timedelta
 import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import numpy as np
+import pandas as pd
+from src.io.cache_backends import BACKENDS, CacheBackend, make_backend
+from src.io.cache_index import CacheIndex
+from src.io.filelock import FileLock
 
 CACHE_DIR = ".cache"
+# storage format for new entries; entries in the other formats stay readable
+DEFAULT_BACKEND = "columnar"
+_backend_name = DEFAULT_BACKEND
+# budget of the in-process memory tier
+DEFAULT_MEMORY_MAX_MB = 256
+# how long to wait for another process holding a key or fetch lock
+DEFAULT_LOCK_TIMEOUT_SEC = 300.0
+_lock_timeout = DEFAULT_LOCK_TIMEOUT_SEC
 
 
 def ensure_cache_dir():
@@ -11,90 +31,824 @@ def ensure_cache_dir():
         os.makedirs(CACHE_DIR, exist_ok=True)
 
 
-# simple lock to serialize cache writes (file system)
-_cache_lock = threading.Lock()
+from typing import Optional, Dict, Any, List, Tuple
 
 
-from typing import Optional, Dict, Any
+def _lock_path(name: str) -> str:
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, "locks", digest + ".lock")
 
 
-def cache_get(key: str, ttl_hours: int = 24) -> Optional[Dict[str, Any]]:
+def key_lock(key: str) -> FileLock:
+    """Cross-process lock serialising writes (and repairs) of one cache key."""
+    return FileLock(_lock_path("key:" + key), timeout=_lock_timeout)
+
+
+def options_tag(options: Optional[Dict[str, Any]] = None) -> str:
+    """Short stable hash of a series' source options, "" when there are none.
+
+    Entries with the same (source, code) but another SDMX dataflow or key
+    template (`resource`, `key`) are different series: the tag keeps their
+    cache entries, fetch locks and coalesced requests apart.
+    """
+    norm = {str(k): str(v) for k, v in (options or {}).items() if v not in (None, "")}
+    if not norm:
+        return ""
+    return hashlib.sha1(json.dumps(norm, sort_keys=True).encode("utf-8")).hexdigest()[:10]
+
+
+def fetch_lock(
+    source: str, code: str, start: str, end: str, options: Optional[Dict[str, Any]] = None
+) -> FileLock:
+    """Single-flight lock for fetching (source, code, options, period).
+
+    The holder fetches and writes the series; other processes wait for it and
+    then read the result from the cache instead of fetching it again.
+    """
+    tag = options_tag(options)
+    name = f"fetch:{str(source).upper()}:{code}{'~' + tag if tag else ''}:{start}:{end}"
+    return FileLock(_lock_path(name), timeout=_lock_timeout)
+
+
+# rough in-memory size of a short str / boxed value, and of one fetch log dict
+_OBJECT_CELL_BYTES = 64
+_LOG_BYTES = 1024
+
+
+class MemoryTier:
+    """Bounded LRU of parsed cache entries kept in front of the file tier.
+
+    Entries are (DataFrame, metadata, created_at) keyed by (cache dir, key) and
+    accounted by an estimate of their in-memory size, taken once when they are
+    put from the frame's shape and dtypes (fixed-width cells at their item
+    size, a flat allowance per Python object cell and per fetch log), so
+    nothing is serialised or walked. The least recently used
+    entries are dropped once `max_bytes` is exceeded. Writes and removals in
+    this process invalidate the key; entries rewritten by other processes are
+    picked up once the in-memory copy expires.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[pd.DataFrame, Dict[str, Any], float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _slot(key: str) -> Tuple[str, str]:
+        return os.path.abspath(CACHE_DIR), key
+
+    @staticmethod
+    def _size(df: pd.DataFrame, meta: Dict[str, Any]) -> int:
+        row_bytes = 8  # index
+        for dtype in df.dtypes:
+            if isinstance(dtype, np.dtype) and dtype.kind != "O":
+                row_bytes += dtype.itemsize
+            else:
+                row_bytes += _OBJECT_CELL_BYTES
+        return len(df) * row_bytes + (len(meta.get("fetch_logs") or []) + 1) * _LOG_BYTES
+
+    def get(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any], float]]:
+        slot = self._slot(key)
+        with self._lock:
+            entry = self._entries.get(slot)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(slot)
+            self.hits += 1
+        df, meta, created, _ = entry
+        return df, meta, created
+
+    def put(self, key: str, df: pd.DataFrame, meta: Dict[str, Any], created: float) -> None:
+        size = self._size(df, meta)
+        if size > self.max_bytes:
+            return
+        slot = self._slot(key)
+        with self._lock:
+            old = self._entries.pop(slot, None)
+            if old is not None:
+                self.nbytes -= old[3]
+            self._entries[slot] = (df, meta, created, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted[3]
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Forget `key`, or every entry when no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.nbytes = 0
+                return
+            old = self._entries.pop(self._slot(key), None)
+            if old is not None:
+                self.nbytes -= old[3]
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max(0, int(max_bytes))
+            while self.nbytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted[3]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+memory_tier = MemoryTier(DEFAULT_MEMORY_MAX_MB * 1024 * 1024)
+
+
+def _copy_on_write() -> bool:
+    """Whether pandas copies shared column data before writing to it: always
+    from pandas 3, opt-in (`mode.copy_on_write`) before."""
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.get_option("mode.copy_on_write") is True
+
+
+def _detached(df: pd.DataFrame, meta: Dict[str, Any]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    # callers own what they get back. With copy-on-write a shallow copy is
+    # enough (the first write copies the column); otherwise an in-place edit
+    # would reach the memory tier's frame, so the data is copied here
+    out_meta = dict(meta)
+    out_meta["fetch_logs"] = [dict(f) for f in meta.get("fetch_logs") or []]
+    return df.copy(deep=not _copy_on_write()), out_meta
+
+
+def configure_cache(
+    backend: Optional[str] = None,
+    memory_max_mb: Optional[float] = None,
+    lock_timeout_sec: Optional[float] = None,
+) -> None:
+    """Select the backend used to write new entries ("columnar" or "json"),
+    the size of the in-process memory tier (0 disables it) and how long to wait
+    for cache locks held by other processes."""
+    global _backend_name, _lock_timeout
+    if lock_timeout_sec is not None:
+        _lock_timeout = float(lock_timeout_sec)
+    if backend is not None:
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown cache backend: {backend}")
+        _backend_name = backend
+    if memory_max_mb is not None:
+        memory_tier.resize(int(float(memory_max_mb) * 1024 * 1024))
+
+
+def _backends() -> List[CacheBackend]:
+    # read order: the active format first, then the others (e.g. legacy JSON)
+    names = [_backend_name] + [n for n in BACKENDS if n != _backend_name]
+    return [make_backend(n, CACHE_DIR) for n in names]
+
+
+def _series_as_of(fetch_logs: List[Dict[str, Any]]) -> Dict[str, str]:
+    series_map: Dict[tuple[str, str], str] = {}
+    for entry in fetch_logs or []:
+        ind = entry.get("indicator")
+        c = entry.get("country")
+        ts = entry.get("fetch_timestamp")
+        if not ind or not c or not ts:
+            continue
+        keyt = (ind, c)
+        if keyt not in series_map or ts > series_map[keyt]:
+            series_map[keyt] = ts
+    return {f"{k[0]}::{k[1]}": v for k, v in series_map.items()}
+
+
+def _index() -> CacheIndex:
     ensure_cache_dir()
-    path = os.path.join(CACHE_DIR, f"{key}.json")
-    if not os.path.exists(path):
+    return CacheIndex(CACHE_DIR)
+
+
+def _index_call(method: str, *args, **kwargs) -> Any:
+    # the catalogue is bookkeeping: a locked or unwritable index.db must not
+    # break cache reads and writes
+    try:
+        return getattr(_index(), method)(*args, **kwargs)
+    except sqlite3.Error:
         return None
-    stat = os.path.getmtime(path)
-    mtime = datetime.fromtimestamp(stat)
-    if datetime.now() - mtime > timedelta(hours=ttl_hours):
+
+
+def _locate(key: str) -> Optional[Tuple[CacheBackend, float]]:
+    """Backend holding `key` and the entry's creation time (epoch seconds)."""
+    row = _index_call("lookup", key)
+    if row is not None:
+        return make_backend(row["backend"], CACHE_DIR), row["created_at"]
+    return _locate_unindexed(key)
+
+
+def _locate_many(keys: List[str]) -> Dict[str, Optional[Tuple[CacheBackend, float]]]:
+    """`_locate` for several keys with one catalogue query."""
+    rows = _index_call("lookup_many", keys) or {}
+    out: Dict[str, Optional[Tuple[CacheBackend, float]]] = {}
+    for key in keys:
+        row = rows.get(key)
+        if row is not None:
+            out[key] = make_backend(row["backend"], CACHE_DIR), row["created_at"]
+        else:
+            out[key] = _locate_unindexed(key)
+    return out
+
+
+def _locate_unindexed(key: str) -> Optional[Tuple[CacheBackend, float]]:
+    # entries written before the catalogue existed: stat once and register
+    backend = next((b for b in _backends() if b.exists(key)), None)
+    if backend is None:
+        return None
+    created = os.path.getmtime(backend.stamp_path(key))
+    _index_call("record_write", key, backend.name, backend.nbytes(key), created_at=created)
+    return backend, created
+
+
+def _drop(key: str, backend: Optional[CacheBackend] = None) -> None:
+    memory_tier.invalidate(key)
+    for b in [backend] if backend is not None else _backends():
         try:
-            os.remove(path)
+            b.remove(key)
         except Exception:
             pass
+    _index_call("remove", key)
+
+
+def _age_hours(created: float) -> float:
+    return (datetime.now() - datetime.fromtimestamp(created)) / timedelta(hours=1)
+
+
+def _freshness(created: float, ttl_hours: float, serve_stale: bool, max_stale_hours: Optional[float]) -> str:
+    """'fresh', 'stale' (expired but servable) or 'expired'."""
+    age = _age_hours(created)
+    if age <= ttl_hours:
+        return "fresh"
+    if serve_stale and (max_stale_hours is None or age <= max_stale_hours):
+        return "stale"
+    return "expired"
+
+
+def _served(df: pd.DataFrame, meta: Dict[str, Any], created: float, state: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    df, meta = _detached(df, meta)
+    if state == "stale":
+        meta["stale"] = True
+        meta["age_hours"] = round(_age_hours(created), 2)
+    return df, meta
+
+
+def cache_get_frame(
+    key: str,
+    ttl_hours: int = 24,
+    serve_stale: bool = False,
+    max_stale_hours: Optional[float] = None,
+) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+    """Return (records DataFrame, metadata) for a valid entry, or None.
+
+    The metadata always contains `fetch_logs` and `series_as_of`. Expired
+    entries are misses, unless `serve_stale` is set: then they are returned
+    with `stale: True` and `age_hours` in the metadata for as long as they are
+    younger than `max_stale_hours` (no limit when None). Expired entries stay
+    on disk for revalidation (`cache_touch`) until `evict_cache` sweeps them.
+    """
+    ensure_cache_dir()
+    entry = _from_memory(key, ttl_hours, serve_stale, max_stale_hours)
+    if entry is not None:
+        return entry
+    return _read(key, _locate(key), ttl_hours, serve_stale, max_stale_hours)
+
+
+def cache_get_frames(
+    keys: List[str],
+    ttl_hours: int = 24,
+    serve_stale: bool = False,
+    max_stale_hours: Optional[float] = None,
+) -> Dict[str, Optional[Tuple[pd.DataFrame, Dict[str, Any]]]]:
+    """`cache_get_frame` for several keys, locating them with one catalogue query."""
+    ensure_cache_dir()
+    out = {key: _from_memory(key, ttl_hours, serve_stale, max_stale_hours) for key in keys}
+    todo = [key for key, entry in out.items() if entry is None]
+    if todo:
+        for key, located in _locate_many(todo).items():
+            out[key] = _read(key, located, ttl_hours, serve_stale, max_stale_hours)
+    return out
+
+
+def _from_memory(
+    key: str, ttl_hours: float, serve_stale: bool, max_stale_hours: Optional[float]
+) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+    cached = memory_tier.get(key)
+    if cached is None:
+        return None
+    df, meta, created = cached
+    state = _freshness(created, ttl_hours, serve_stale, max_stale_hours)
+    if state != "expired":
+        return _served(df, meta, created, state)
+    memory_tier.invalidate(key)
+    return None
+
+
+def _read(
+    key: str,
+    located: Optional[Tuple[CacheBackend, float]],
+    ttl_hours: float,
+    serve_stale: bool,
+    max_stale_hours: Optional[float],
+) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+    """Read a located entry from the file tier into the memory tier."""
+    if located is None:
+        return None
+    backend, created = located
+    state = _freshness(created, ttl_hours, serve_stale, max_stale_hours)
+    if state == "expired":
         return None
     try:
-        with open(path, "r", encoding="utf-8") as fh:
-            data = json.load(fh)
-            # expected cache payload can be either a list of records (legacy) or
-            # a dict with {'records': [...], 'fetch_logs': [...]}.
-            if isinstance(data, dict) and "records" in data:
-                # ensure fetch_logs key exists
-                if "fetch_logs" not in data:
-                    data["fetch_logs"] = []
-                # ensure series_as_of exists (may be computed from fetch_logs)
-                if "series_as_of" not in data:
-                    try:
-                        series_map: Dict[tuple[str, str], str] = {}
-                        for entry in data.get("fetch_logs", []):
-                            ind = entry.get("indicator")
-                            c = entry.get("country")
-                            ts = entry.get("fetch_timestamp")
-                            if not ind or not c or not ts:
-                                continue
-                            keyt = (ind, c)
-                            if keyt not in series_map or ts > series_map[keyt]:
-                                series_map[keyt] = ts
-                        data["series_as_of"] = {f"{k[0]}::{k[1]}": v for k, v in series_map.items()}
-                    except Exception:
-                        data["series_as_of"] = {}
-                return data
-            else:
-                return {"records": data, "fetch_logs": []}
+        df, meta = backend.read(key)
     except Exception:
-        return None
+        # the entry may be mid-rewrite: retry once the writer is done, and drop
+        # it only if it is still unreadable (truncated, removed behind the
+        # catalogue's back)
+        with key_lock(key):
+            try:
+                df, meta = backend.read(key)
+            except Exception:
+                _drop(key, backend)
+                return None
+    _index_call("record_hit", key)
+    # ensure fetch_logs key exists
+    if "fetch_logs" not in meta:
+        meta["fetch_logs"] = []
+    # ensure series_as_of exists (may be computed from fetch_logs)
+    if "series_as_of" not in meta:
+        try:
+            meta["series_as_of"] = _series_as_of(meta.get("fetch_logs", []))
+        except Exception:
+            meta["series_as_of"] = {}
+    memory_tier.put(key, df, meta, created)
+    return _served(df, meta, created, state)
 
 
-def cache_set(key: str, data: Any, ttl_hours: int = 24) -> None:
+def cache_touch(key: str) -> bool:
+    """Mark an existing (possibly expired) entry as freshly written.
+
+    Used when a provider confirms that the cached data is unchanged (HTTP 304
+    or identical payload hash): the TTL restarts without rewriting the entry.
+    """
+    located = _locate(key)
+    if located is None:
+        return False
+    backend, _ = located
+    now = datetime.now().timestamp()
+    try:
+        os.utime(backend.stamp_path(key), (now, now))
+    except OSError:
+        return False
+    memory_tier.invalidate(key)
+    _index_call("touch", key, now)
+    return True
+
+
+def cache_set_frame(key: str, df: pd.DataFrame, meta: Optional[Dict[str, Any]] = None, ttl_hours: int = 24) -> None:
+    """Store a records frame plus metadata under `key` with the active backend."""
     ensure_cache_dir()
-    path = os.path.join(CACHE_DIR, f"{key}.json")
     try:
-        # Accept either a DataFrame-like records list, or a dict with 'records'
-        payload = data
-        if isinstance(data, list):
-            payload = {"records": data}
+        payload = dict(meta or {})
         # Ensure fetch_logs exists for consumers
-        if isinstance(payload, dict) and "fetch_logs" not in payload:
-            payload["fetch_logs"] = []
+        payload.setdefault("fetch_logs", [])
         # If fetch_logs exist, compute per-series as_of mapping for convenience
-        if isinstance(payload, dict) and payload.get("fetch_logs"):
+        if payload.get("fetch_logs"):
             try:
-                series_map: Dict[tuple[str, str], str] = {}
-                for f in payload.get("fetch_logs", []):
-                    ind = f.get("indicator")
-                    c = f.get("country")
-                    ts = f.get("fetch_timestamp")
-                    if not ind or not c or not ts:
-                        continue
-                    keyt = (ind, c)
-                    if keyt not in series_map or ts > series_map[keyt]:
-                        series_map[keyt] = ts
-                payload["series_as_of"] = {
-                    f"{k[0]}::{k[1]}": v for k, v in series_map.items()
-                }
+                payload["series_as_of"] = _series_as_of(payload["fetch_logs"])
             except Exception:
                 payload["series_as_of"] = {}
-        # write atomically under lock to avoid concurrent writes
-        with _cache_lock:
-            with open(path, "w", encoding="utf-8") as fh:
-                json.dump(payload, fh, default=str, ensure_ascii=False)
+        backends = _backends()
+        memory_tier.invalidate(key)
+        os.makedirs(os.path.dirname(os.path.join(CACHE_DIR, key)), exist_ok=True)
+        # files are replaced atomically; the key lock keeps writers in other
+        # threads and processes from interleaving the data and sidecar files
+        with key_lock(key) as lock:
+            if not lock.locked:
+                logging.getLogger(__name__).warning("Cache lock for %s timed out; writing anyway", key)
+            backends[0].write(key, df, payload)
+            # drop copies of this key in other formats so they cannot go stale
+            for other in backends[1:]:
+                other.remove(key)
+        indicator = next((f.get("indicator") for f in payload["fetch_logs"] if f.get("indicator")), None)
+        _index_call("record_write", key, backends[0].name, backends[0].nbytes(key), indicator=indicator)
     except Exception:
         pass
+
+
+def cache_get(key: str, ttl_hours: int = 24) -> Optional[Dict[str, Any]]:
+    """Return a cached payload as {'records': [...], 'fetch_logs': [...], ...}."""
+    entry = cache_get_frame(key, ttl_hours)
+    if entry is None:
+        return None
+    df, meta = entry
+    data = dict(meta)
+    data["records"] = df.to_dict(orient="records")
+    return data
+
+
+def cache_set(key: str, data: Any, ttl_hours: int = 24) -> None:
+    # Accept either a DataFrame-like records list, or a dict with 'records'
+    if isinstance(data, dict):
+        meta = {k: v for k, v in data.items() if k != "records"}
+        records = data.get("records") or []
+    else:
+        meta = {}
+        records = data or []
+    try:
+        df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+    except Exception:
+        return
+    cache_set_frame(key, df, meta, ttl_hours)
+
+
+# --- per-series entries -------------------------------------------------------
+#
+# Fetch results are stored as one entry per (source, code, country, period) so
+# that runs over different country lists (subsets, supersets, batches) share
+# what was already fetched and only request the missing series.
+
+_RAW_COLUMNS = ["source", "indicator", "country", "date", "value"]
+
+
+def _safe_part(part: Any) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]", "_", str(part if part is not None else ""))
+
+
+def _norm_country(code: Any) -> str:
+    from src.processing.harmonize import iso_to_iso3
+
+    try:
+        return iso_to_iso3(str(code)) if code is not None else ""
+    except Exception:
+        return str(code).upper()
+
+
+def series_key(
+    source: str,
+    code: str,
+    country: str,
+    start: str,
+    end: str,
+    options: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Cache key of a single series, e.g. `series/wb/NY.GDP.MKTP.KD.ZG/DEU_2015-01-01_2024-12-31`.
+
+    Source options (SDMX `resource`/`key`) add their `options_tag` to the code
+    part: `series/imf/PCPI_IX~1a2b3c4d5e/DEU_...`.
+    """
+    tag = options_tag(options)
+    return "/".join(
+        [
+            "series",
+            _safe_part(source).lower(),
+            _safe_part(code) + (f"~{tag}" if tag else ""),
+            f"{_safe_part(country).upper()}_{_safe_part(start)}_{_safe_part(end)}",
+        ]
+    )
+
+
+def cache_lookup_series(
+    source: str,
+    code: str,
+    countries: List[str],
+    start: str,
+    end: str,
+    ttl_hours: int = 24,
+    serve_stale: bool = False,
+    max_stale_hours: Optional[float] = None,
+    options: Optional[Dict[str, Any]] = None,
+) -> Tuple[pd.DataFrame, List[Dict[str, Any]], List[str], List[str]]:
+    """Assemble cached series for `countries`.
+
+    Returns (df, fetch_logs, missing, stale): `missing` lists the countries that
+    have no usable cache entry and still need to be fetched; with `serve_stale`,
+    `stale` lists the countries served from expired entries (their fetch logs
+    carry `stale: True` and `cache_age_hours`) that should be refreshed.
+    """
+    frames = []
+    logs: List[Dict[str, Any]] = []
+    seen_logs = set()
+    missing: List[str] = []
+    stale: List[str] = []
+    keys = {country: series_key(source, code, country, start, end, options) for country in countries}
+    entries = cache_get_frames(list(keys.values()), ttl_hours, serve_stale, max_stale_hours)
+    for country in countries:
+        entry = entries[keys[country]]
+        if entry is None:
+            missing.append(country)
+            continue
+        frame, meta = entry
+        if meta.get("stale"):
+            stale.append(country)
+        if not frame.empty:
+            frames.append(frame)
+        for f in meta.get("fetch_logs") or []:
+            # indicator-level logs are stored with every country of the request
+            marker = json.dumps(f, sort_keys=True, default=str)
+            if marker in seen_logs:
+                continue
+            seen_logs.add(marker)
+            if meta.get("stale"):
+                f = dict(f, stale=True, cache_age_hours=meta.get("age_hours"))
+            logs.append(f)
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=_RAW_COLUMNS)
+    return df, logs, missing, stale
+
+
+def cache_get_series(
+    source: str,
+    code: str,
+    countries: List[str],
+    start: str,
+    end: str,
+    ttl_hours: int = 24,
+    options: Optional[Dict[str, Any]] = None,
+) -> Tuple[pd.DataFrame, List[Dict[str, Any]], List[str]]:
+    """Assemble cached series for `countries`.
+
+    Returns (df, fetch_logs, missing) where `missing` lists the countries that
+    have no valid cache entry and still need to be fetched.
+    """
+    df, logs, missing, _ = cache_lookup_series(
+        source, code, countries, start, end, ttl_hours, options=options
+    )
+    return df, logs, missing
+
+
+def _expired_too(
+    source: str,
+    code: str,
+    countries: List[str],
+    start: str,
+    end: str,
+    options: Optional[Dict[str, Any]],
+) -> Dict[str, Optional[Tuple[pd.DataFrame, Dict[str, Any]]]]:
+    """Entries per country, fresh or expired."""
+    keys = {country: series_key(source, code, country, start, end, options) for country in countries}
+    entries = cache_get_frames(list(keys.values()), ttl_hours=0, serve_stale=True)
+    return {country: entries[key] for country, key in keys.items()}
+
+
+def cache_series_validators(
+    source: str,
+    code: str,
+    countries: List[str],
+    start: str,
+    end: str,
+    options: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Last successful fetch log per country, from entries fresh or expired.
+
+    Fetchers use these (`etag`, `last_modified`, `sha256_raw`, `request_url`,
+    ...) to revalidate a series instead of downloading it again.
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    entries = _expired_too(source, code, countries, start, end, options)
+    for country in countries:
+        entry = entries[country]
+        if entry is None:
+            continue
+        norm = _norm_country(country)
+        for f in entry[1].get("fetch_logs") or []:
+            if not f.get("error") and f.get("country") and _norm_country(f.get("country")) == norm:
+                out[country] = f
+                break
+    return out
+
+
+def cache_series_frames(
+    source: str,
+    code: str,
+    countries: List[str],
+    start: str,
+    end: str,
+    options: Optional[Dict[str, Any]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """Cached rows per country, from entries fresh or expired.
+
+    Used by incremental fetching to find the last cached observation of each
+    series and to merge a freshly fetched tail into it.
+    """
+    out: Dict[str, pd.DataFrame] = {}
+    entries = _expired_too(source, code, countries, start, end, options)
+    for country in countries:
+        entry = entries[country]
+        if entry is not None:
+            out[country] = entry[0]
+    return out
+
+
+def cache_touch_series(
+    source: str,
+    code: str,
+    countries: List[str],
+    start: str,
+    end: str,
+    options: Optional[Dict[str, Any]] = None,
+) -> List[str]:
+    """Restart the TTL of the given series; returns the countries touched."""
+    return [c for c in countries if cache_touch(series_key(source, code, c, start, end, options))]
+
+
+def cache_set_series(
+    source: str,
+    code: str,
+    df: pd.DataFrame,
+    fetch_logs: List[Dict[str, Any]],
+    countries: List[str],
+    start: str,
+    end: str,
+    ttl_hours: int = 24,
+    options: Optional[Dict[str, Any]] = None,
+) -> List[str]:
+    """Split a fetch result into per-country entries and store them.
+
+    Only requested `countries` are stored. A country is skipped when its fetch
+    (or the whole request) logged an error, and nothing is stored when the
+    fetcher returned no logs at all, since an empty result cannot then be told
+    apart from a skipped fetch. Countries without rows are stored as empty
+    series so that they are not re-requested until the entry expires.
+    Returns the list of countries written.
+    """
+    logs = list(fetch_logs or [])
+    if not logs:
+        return []
+    if any(f.get("error") and not f.get("country") for f in logs):
+        return []
+    failed = {_norm_country(f.get("country")) for f in logs if f.get("error")}
+    shared_logs = [f for f in logs if not f.get("country")]
+    logs_by_country: Dict[str, List[Dict[str, Any]]] = {}
+    for f in logs:
+        if f.get("country"):
+            logs_by_country.setdefault(_norm_country(f.get("country")), []).append(f)
+
+    if df is not None and not df.empty and "country" in df.columns:
+        uniq = df["country"].dropna().unique()
+        norm_map = {c: _norm_country(c) for c in uniq}
+        row_country = df["country"].map(norm_map)
+    else:
+        row_country = None
+
+    written: List[str] = []
+    for country in countries:
+        norm = _norm_country(country)
+        if norm in failed:
+            continue
+        if row_country is not None:
+            frame = df[row_country == norm]
+        else:
+            frame = pd.DataFrame(columns=_RAW_COLUMNS)
+        cache_set_frame(
+            series_key(source, code, country, start, end, options),
+            frame,
+            {"fetch_logs": logs_by_country.get(norm, []) + shared_logs},
+            ttl_hours,
+        )
+        written.append(country)
+    return written
+
+
+# --- background refresh ----------------------------------------------------------
+
+
+class BackgroundRefresher:
+    """Runs cache refreshes off the critical path (stale-while-revalidate).
+
+    Jobs are deduplicated by a caller-chosen key while they are pending. The
+    worker threads are not daemons, so a process finishes its refreshes before
+    exiting and the next run finds fresh entries.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[Any, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job_key: Any, fn, *args, **kwargs) -> bool:
+        """Schedule `fn(*args, **kwargs)` unless `job_key` is already pending."""
+        with self._lock:
+            fut = self._pending.get(job_key)
+            if fut is not None and not fut.done():
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cache-refresh")
+            fut = self._executor.submit(fn, *args, **kwargs)
+            self._pending[job_key] = fut
+        fut.add_done_callback(lambda f, k=job_key: self._done(k, f))
+        return True
+
+    def _done(self, job_key: Any, fut: Future) -> None:
+        with self._lock:
+            if self._pending.get(job_key) is fut:
+                del self._pending[job_key]
+        if not fut.cancelled() and fut.exception() is not None:
+            logging.getLogger(__name__).warning("Background cache refresh %s failed: %s", job_key, fut.exception())
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for pending refreshes; True when none is left."""
+        with self._lock:
+            futures = list(self._pending.values())
+        done, not_done = wait(futures, timeout=timeout)
+        return not not_done
+
+
+background_refresher = BackgroundRefresher()
+
+
+# --- maintenance ----------------------------------------------------------------
+
+
+def evict_cache(
+    max_bytes: Optional[int] = None,
+    ttl_hours: Optional[float] = None,
+    everything: bool = False,
+) -> Dict[str, int]:
+    """Sweep the cache using the catalogue.
+
+    Drops entries older than `ttl_hours`, then the least recently used entries
+    until the total size fits `max_bytes` (or every entry with `everything`).
+    Returns counts of removed entries and freed bytes.
+    """
+    index = _index()
+    expired = index.expired(ttl_hours) if ttl_hours is not None else []
+    for row in expired:
+        _drop(row["key"], make_backend(row["backend"], CACHE_DIR))
+    if everything:
+        over = index.entries()
+    elif max_bytes is not None:
+        over = index.lru_over(int(max_bytes))
+    else:
+        over = []
+    for row in over:
+        _drop(row["key"], make_backend(row["backend"], CACHE_DIR))
+    return {
+        "expired": len(expired),
+        "evicted": len(over),
+        "bytes_freed": sum(r["bytes"] for r in expired + over),
+    }
+
+
+def rebuild_cache_index() -> int:
+    """Register entries found on disk that the catalogue does not know yet."""
+    index = _index()
+    known = {r["key"] for r in index.entries()}
+    added = 0
+    for backend in _backends():
+        for key in backend.keys():
+            if key in known:
+                continue
+            created = os.path.getmtime(backend.stamp_path(key))
+            index.record_write(key, backend.name, backend.nbytes(key), created_at=created)
+            known.add(key)
+            added += 1
+    return added
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _index().stats()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.io.cache", description="Inspect and prune the fetch cache")
+    parser.add_argument("--cache-dir", default=None, help="cache directory (default: .cache)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="entries, bytes and hits per source")
+    p_ls = sub.add_parser("ls", help="list entries, most recently used first")
+    p_ls.add_argument("--source", default=None)
+    p_ls.add_argument("--limit", type=int, default=50)
+    p_ev = sub.add_parser("evict", help="drop expired and least recently used entries")
+    p_ev.add_argument("--max-mb", type=float, default=None, help="size cap in megabytes")
+    p_ev.add_argument("--ttl-hours", type=float, default=None, help="drop entries older than this")
+    p_ev.add_argument("--all", action="store_true", help="drop every entry")
+    sub.add_parser("reindex", help="register entries on disk missing from the catalogue")
+    args = parser.parse_args(argv)
+
+    global CACHE_DIR
+    if args.cache_dir:
+        CACHE_DIR = args.cache_dir
+    if args.command == "reindex":
+        print(f"registered {rebuild_cache_index()} entries")
+    elif args.command == "stats":
+        print(json.dumps(cache_stats(), indent=2))
+    elif args.command == "ls":
+        for row in _index().entries(source=args.source, limit=args.limit):
+            accessed = datetime.fromtimestamp(row["accessed_at"]).isoformat(timespec="seconds")
+            print(f"{row['key']}\t{row['backend']}\t{row['bytes']}\t{row['hits']}\t{accessed}")
+    elif args.command == "evict":
+        max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+        print(json.dumps(evict_cache(max_bytes=max_bytes, ttl_hours=args.ttl_hours, everything=args.all)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
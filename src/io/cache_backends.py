@@ -0,0 +1,300 @@
+"""Storage formats for cache entries.
+
+A cache entry is a frame of fetched records plus a small JSON-able metadata
+dict (`fetch_logs`, `series_as_of`, ...). Backends only decide how that pair is
+laid out on disk under a key; TTL handling and key layout live in
+`src.io.cache`.
+
+- `JsonCacheBackend`: the original `<key>.json` payload with a `records` list.
+- `ColumnarCacheBackend`: `<key>.<token>.npy` holding the columns as
+  contiguous, 64-byte aligned buffers in one byte array, and a
+  `<key>.meta.json` sidecar with the metadata, the column layout and the name
+  of the data file. Replacing the sidecar is what commits a rewrite.
+
+Columnar reads are zero-copy for numeric, boolean and datetime columns: the
+frame's columns are views of the data file. The file is mapped with
+``mmap_mode="c"`` (a private mapping), so writes into the frame's buffers
+touch only this process' pages and never the file. Whether such a write also
+reaches other frames sharing the buffers is up to pandas; `src.io.cache`
+copies frames it hands out when pandas' copy-on-write is off. String columns
+are stored as UTF-8 bytes plus end offsets and a missing-value mask, so ""
+and None stay distinct. They are decoded into Python `str` objects on read,
+which necessarily copies them.
+"""
+import json
+import os
+import tempfile
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+COLUMNAR_FORMAT = "npy-v3"
+# alignment of the column buffers in the data file (the .npy header is padded
+# to the same boundary)
+_ALIGN = 64
+
+
+def atomic_write(path: str, write, binary: bool = False) -> None:
+    """Write `path` via a temp file in the same directory and `os.replace`.
+
+    Readers see either the old or the new file, never a partial one; a crash
+    mid-write leaves only a `*.tmp` file behind.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if binary else "w", **({} if binary else {"encoding": "utf-8"})) as fh:
+            write(fh)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class CacheBackend:
+    name = ""
+    # suffix of the file written last; its mtime marks when the entry was written
+    stamp_suffix = ""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def _base(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def stamp_path(self, key: str) -> str:
+        return self._base(key) + self.stamp_suffix
+
+    def paths(self, key: str) -> List[str]:
+        raise NotImplementedError()
+
+    def exists(self, key: str) -> bool:
+        return all(os.path.exists(p) for p in self.paths(key))
+
+    def read(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        raise NotImplementedError()
+
+    def write(self, key: str, df: pd.DataFrame, meta: Dict[str, Any]) -> None:
+        raise NotImplementedError()
+
+    def remove(self, key: str) -> None:
+        for p in self.paths(key):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+
+    def keys(self) -> List[str]:
+        """Keys of all complete entries of this format under the cache directory."""
+        out = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for fn in files:
+                if not fn.endswith(self.stamp_suffix) or not self._owns(fn):
+                    continue
+                rel = os.path.relpath(os.path.join(root, fn), self.cache_dir)
+                key = rel[: -len(self.stamp_suffix)].replace(os.sep, "/")
+                if self.exists(key):
+                    out.append(key)
+        return sorted(out)
+
+    def _owns(self, filename: str) -> bool:
+        return True
+
+    def nbytes(self, key: str) -> int:
+        total = 0
+        for p in self.paths(key):
+            try:
+                total += os.path.getsize(p)
+            except OSError:
+                pass
+        return total
+
+
+class JsonCacheBackend(CacheBackend):
+    name = "json"
+    stamp_suffix = ".json"
+
+    def _owns(self, filename: str) -> bool:
+        # columnar sidecars are JSON files too
+        return not filename.endswith(ColumnarCacheBackend.stamp_suffix)
+
+    def paths(self, key: str) -> List[str]:
+        return [self.stamp_path(key)]
+
+    def read(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        with open(self.stamp_path(key), "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        # expected cache payload can be either a list of records (legacy) or
+        # a dict with {'records': [...], 'fetch_logs': [...]}.
+        if isinstance(data, dict) and "records" in data:
+            meta = {k: v for k, v in data.items() if k != "records"}
+            return pd.DataFrame(data.get("records") or []), meta
+        return pd.DataFrame(data or []), {}
+
+    def write(self, key: str, df: pd.DataFrame, meta: Dict[str, Any]) -> None:
+        payload = dict(meta)
+        payload["records"] = df.to_dict(orient="records")
+        atomic_write(self.stamp_path(key), lambda fh: json.dump(payload, fh, default=str, ensure_ascii=False))
+
+
+def _column_kind(s: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(s):
+        return "bool"
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return "datetime"
+    if pd.api.types.is_integer_dtype(s):
+        return "int"
+    if pd.api.types.is_numeric_dtype(s):
+        return "float"
+    # object columns holding only numbers and missing values (e.g. WB values with None)
+    non_null = s.dropna()
+    if len(non_null) and all(
+        isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool)
+        for v in non_null
+    ):
+        return "float"
+    return "str"
+
+
+def _encode_column(s: pd.Series, kind: str) -> List[np.ndarray]:
+    """Buffers of one column: its values, or for strings end offsets, missing
+    mask and UTF-8 bytes."""
+    if kind == "bool":
+        return [s.to_numpy(dtype=bool)]
+    if kind == "datetime":
+        return [pd.to_datetime(s).to_numpy(dtype="datetime64[ns]")]
+    if kind == "int":
+        return [s.to_numpy(dtype="int64")]
+    if kind == "float":
+        return [pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64")]
+    values = s.tolist()
+    missing = np.array([v is None or (isinstance(v, float) and np.isnan(v)) for v in values], dtype=bool)
+    encoded = [b"" if m else str(v).encode("utf-8") for v, m in zip(values, missing)]
+    ends = np.cumsum([len(b) for b in encoded], dtype="int64")
+    return [ends, missing, np.frombuffer(b"".join(encoded), dtype=np.uint8)]
+
+
+def _decode_column(parts: List[np.ndarray], kind: str):
+    if kind != "str":
+        return parts[0]
+    ends, missing, data = parts
+    raw = data.tobytes()
+    starts = np.concatenate(([0], ends[:-1])) if len(ends) else ends
+    out = np.empty(len(ends), dtype=object)
+    out[:] = [None if m else raw[a:b].decode("utf-8") for a, b, m in zip(starts.tolist(), ends.tolist(), missing.tolist())]
+    return out
+
+
+class ColumnarCacheBackend(CacheBackend):
+    name = "columnar"
+    stamp_suffix = ".meta.json"
+
+    def _data_files(self, key: str) -> List[str]:
+        base = self._base(key)
+        folder, prefix = os.path.split(base)
+        try:
+            names = os.listdir(folder or ".")
+        except OSError:
+            return []
+        # `<key>.<12 hex>.npy`
+        return [
+            os.path.join(folder, fn)
+            for fn in names
+            if fn.startswith(prefix + ".")
+            and fn.endswith(".npy")
+            and len(fn) == len(prefix) + 17
+            and all(ch in "0123456789abcdef" for ch in fn[len(prefix) + 1 : -4])
+        ]
+
+    def paths(self, key: str) -> List[str]:
+        return [self.stamp_path(key)] + self._data_files(key)
+
+    def exists(self, key: str) -> bool:
+        # the data file named by the sidecar is checked when it is read
+        return os.path.exists(self.stamp_path(key))
+
+    def read(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        with open(self.stamp_path(key), "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        columns = meta.pop("columns", [])
+        n_rows = int(meta.pop("n_rows", 0) or 0)
+        fmt = meta.pop("format", None)
+        data_file = meta.pop("data_file", None)
+        if fmt != COLUMNAR_FORMAT:
+            # older or unknown layouts are not read; the cache treats the
+            # error as a miss and refetches the entry
+            raise ValueError(f"cache entry {key} has unsupported format {fmt!r}")
+        if not columns:
+            return pd.DataFrame(), meta
+        data_path = os.path.join(os.path.dirname(self._base(key)), data_file)
+        # an empty data section cannot be memory-mapped
+        arr = np.load(data_path, mmap_mode="c" if n_rows else None, allow_pickle=False)
+        data = {}
+        for c in columns:
+            parts = []
+            for p in c["parts"]:
+                dtype = np.dtype(p["dtype"])
+                end = p["offset"] + p["count"] * dtype.itemsize
+                if end > len(arr):
+                    raise ValueError(f"cache entry {key} is inconsistent")
+                parts.append(np.asarray(arr[p["offset"] : end].view(dtype)))
+            if len(parts[0]) != n_rows:
+                raise ValueError(f"cache entry {key} is inconsistent")
+            data[c["name"]] = _decode_column(parts, c["kind"])
+        # keep the memory-mapped buffers instead of copying them into blocks
+        return pd.DataFrame(data, copy=False), meta
+
+    def write(self, key: str, df: pd.DataFrame, meta: Dict[str, Any]) -> None:
+        df = df.reset_index(drop=True)
+        names = [str(c) for c in df.columns]
+        kinds = [_column_kind(df[c]) for c in df.columns]
+        columns: List[Dict[str, Any]] = []
+        buffers: List[Tuple[int, np.ndarray]] = []
+        size = 0
+        for n, k in zip(names, kinds):
+            parts = []
+            for buf in _encode_column(df[n], k):
+                buf = np.ascontiguousarray(buf)
+                parts.append({"dtype": buf.dtype.str, "offset": size, "count": int(len(buf))})
+                buffers.append((size, buf))
+                size += -(-buf.nbytes // _ALIGN) * _ALIGN
+            columns.append({"name": n, "kind": k, "parts": parts})
+        arr = np.zeros(size, dtype=np.uint8)
+        for offset, buf in buffers:
+            arr[offset : offset + buf.nbytes] = buf.view(np.uint8)
+        base = self._base(key)
+        data_file = f"{os.path.basename(base)}.{uuid.uuid4().hex[:12]}.npy"
+        data_path = os.path.join(os.path.dirname(base), data_file)
+        atomic_write(data_path, lambda fh: np.save(fh, arr, allow_pickle=False), binary=True)
+        sidecar = dict(meta)
+        sidecar["format"] = COLUMNAR_FORMAT
+        sidecar["n_rows"] = int(len(df))
+        sidecar["columns"] = columns
+        sidecar["data_file"] = data_file
+        # the sidecar is written last: replacing it switches readers to the new
+        # data file, so a crash before this point leaves the old entry intact
+        atomic_write(self.stamp_path(key), lambda fh: json.dump(sidecar, fh, default=str, ensure_ascii=False))
+        for old in self._data_files(key):
+            if os.path.basename(old) != data_file:
+                try:
+                    os.remove(old)
+                except OSError:
+                    # still mapped by a reader (Windows); removed on the next write
+                    pass
+
+
+BACKENDS = {
+    JsonCacheBackend.name: JsonCacheBackend,
+    ColumnarCacheBackend.name: ColumnarCacheBackend,
+}
+
+
+def make_backend(name: str, cache_dir: str) -> CacheBackend:
+    try:
+        return BACKENDS[name](cache_dir)
+    except KeyError:
+        raise ValueError(f"unknown cache backend: {name}")
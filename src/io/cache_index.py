@@ -0,0 +1,241 @@
+"""SQLite catalogue of cache entries (`.cache/index.db`).
+
+One row per cache key with where and how it is stored (backend, bytes), what it
+holds (source, code, indicator, country, period) and how it is used (created /
+accessed times, hit count). `src.io.cache` consults it instead of stat-ing files
+for TTL checks and uses it to sweep expired entries and to evict the least
+recently used ones when the cache exceeds its size cap.
+
+Each thread keeps one connection per database and the schema is created once
+per process. Reads only count hits in memory; the counts are written in one
+batch every `HIT_FLUSH_EVERY` keys, before the catalogue is listed, swept or
+summarised, and at exit.
+"""
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+INDEX_FILE = "index.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    backend TEXT NOT NULL,
+    source TEXT,
+    code TEXT,
+    indicator TEXT,
+    country TEXT,
+    period_start TEXT,
+    period_end TEXT,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+"""
+
+# keys per `IN (...)` query, below SQLite's bound parameter limit
+_LOOKUP_CHUNK = 500
+# pending hit counts written per batch
+HIT_FLUSH_EVERY = 256
+
+# database path -> connection, per thread (sqlite3 connections are not shared)
+_local = threading.local()
+# databases whose schema this process has created or checked
+_ready: set = set()
+_ready_lock = threading.Lock()
+# database path -> key -> [hits, last access] not written yet
+_pending_hits: Dict[str, Dict[str, List[float]]] = {}
+_pending_lock = threading.Lock()
+
+
+def parse_key(key: str) -> Dict[str, Optional[str]]:
+    """Split a `series/<source>/<code>/<COUNTRY>_<start>_<end>` key into fields.
+
+    Other keys (e.g. the IMF fetcher's hashed SDMX keys) yield empty fields.
+    """
+    out: Dict[str, Optional[str]] = {"source": None, "code": None, "country": None, "period_start": None, "period_end": None}
+    parts = key.split("/")
+    if len(parts) == 4 and parts[0] == "series":
+        out["source"] = parts[1].upper()
+        # drop the tag of series with source options (`PCPI_IX~1a2b3c4d5e`)
+        out["code"] = parts[2].split("~", 1)[0]
+        tail = parts[3].rsplit("_", 2)
+        if len(tail) == 3:
+            out["country"], out["period_start"], out["period_end"] = tail
+    return out
+
+
+class CacheIndex:
+    def __init__(self, cache_dir: str):
+        self.path = os.path.abspath(os.path.join(cache_dir, INDEX_FILE))
+
+    def _connect(self) -> sqlite3.Connection:
+        if getattr(_local, "pid", None) != os.getpid():
+            # connections must not cross a fork
+            _local.connections = {}
+            _local.pid = os.getpid()
+        connections: Dict[str, sqlite3.Connection] = _local.connections
+        con = connections.get(self.path)
+        exists = os.path.exists(self.path)
+        if con is not None and not exists:
+            # the cache directory was removed under us: start a new catalogue
+            con.close()
+            con = None
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=30)
+            con.row_factory = sqlite3.Row
+            con.execute("PRAGMA synchronous=NORMAL")
+            with _ready_lock:
+                if not exists or self.path not in _ready:
+                    # WAL lets readers in other processes proceed during a write
+                    con.execute("PRAGMA journal_mode=WAL")
+                    con.executescript(_SCHEMA)
+                    _ready.add(self.path)
+            connections[self.path] = con
+        return con
+
+    def _run(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        con = self._connect()
+        with con:
+            return con.execute(sql, params).fetchall()
+
+    def _with_pending(self, row: sqlite3.Row) -> Dict[str, Any]:
+        out = dict(row)
+        with _pending_lock:
+            pending = _pending_hits.get(self.path, {}).get(out["key"])
+        if pending is not None:
+            out["hits"] += int(pending[0])
+            out["accessed_at"] = max(out["accessed_at"], pending[1])
+        return out
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        rows = self._run("SELECT * FROM entries WHERE key = ?", (key,))
+        return self._with_pending(rows[0]) if rows else None
+
+    def lookup_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Rows of the given keys that are catalogued, by key."""
+        keys = list(dict.fromkeys(keys))
+        out: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = keys[i : i + _LOOKUP_CHUNK]
+            marks = ", ".join("?" * len(chunk))
+            for r in self._run(f"SELECT * FROM entries WHERE key IN ({marks})", tuple(chunk)):
+                out[r["key"]] = self._with_pending(r)
+        return out
+
+    def record_write(
+        self,
+        key: str,
+        backend: str,
+        nbytes: int,
+        indicator: Optional[str] = None,
+        created_at: Optional[float] = None,
+    ) -> None:
+        now = time.time()
+        created = now if created_at is None else created_at
+        fields = parse_key(key)
+        # a rewrite refreshes the entry but keeps its hit count
+        self._run(
+            "INSERT INTO entries (key, backend, source, code, indicator, country, period_start, period_end,"
+            " bytes, created_at, accessed_at, hits) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)"
+            " ON CONFLICT(key) DO UPDATE SET backend = excluded.backend, indicator = excluded.indicator,"
+            " bytes = excluded.bytes, created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+            (
+                key, backend, fields["source"], fields["code"], indicator, fields["country"],
+                fields["period_start"], fields["period_end"], int(nbytes), created, created,
+            ),
+        )
+
+    def touch(self, key: str, created_at: Optional[float] = None) -> None:
+        """Restart an entry's age (e.g. after a successful revalidation)."""
+        now = time.time() if created_at is None else created_at
+        self._run("UPDATE entries SET created_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+
+    def record_hit(self, key: str) -> None:
+        """Count a read of `key`; written with the next batch (`flush_hits`)."""
+        with _pending_lock:
+            pending = _pending_hits.setdefault(self.path, {})
+            hit = pending.setdefault(key, [0, 0.0])
+            hit[0] += 1
+            hit[1] = time.time()
+            due = len(pending) >= HIT_FLUSH_EVERY
+        if due:
+            self.flush_hits()
+
+    def flush_hits(self) -> None:
+        """Write the pending hit counts in one transaction."""
+        with _pending_lock:
+            pending = _pending_hits.pop(self.path, None)
+        if not pending:
+            return
+        con = self._connect()
+        with con:
+            con.executemany(
+                "UPDATE entries SET hits = hits + ?, accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                [(int(n), at, key) for key, (n, at) in pending.items()],
+            )
+
+    def remove(self, key: str) -> None:
+        self._run("DELETE FROM entries WHERE key = ?", (key,))
+
+    def entries(self, source: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Catalogue rows, most recently accessed first."""
+        self.flush_hits()
+        sql = "SELECT * FROM entries"
+        params: tuple = ()
+        if source:
+            sql += " WHERE source = ?"
+            params = (source.upper(),)
+        sql += " ORDER BY accessed_at DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(r) for r in self._run(sql, params)]
+
+    def expired(self, ttl_hours: float, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        cutoff = (time.time() if now is None else now) - float(ttl_hours) * 3600
+        return [dict(r) for r in self._run("SELECT * FROM entries WHERE created_at < ?", (cutoff,))]
+
+    def lru_over(self, max_bytes: int) -> List[Dict[str, Any]]:
+        """Least recently used entries to drop so that the total fits `max_bytes`."""
+        self.flush_hits()
+        rows = self._run("SELECT * FROM entries ORDER BY accessed_at DESC")
+        total = 0
+        victims = []
+        for r in rows:
+            total += r["bytes"]
+            if total > max_bytes:
+                victims.append(dict(r))
+        return victims
+
+    def stats(self) -> Dict[str, Any]:
+        self.flush_hits()
+        rows = self._run(
+            "SELECT source, COUNT(*) AS entries, COALESCE(SUM(bytes), 0) AS bytes, COALESCE(SUM(hits), 0) AS hits"
+            " FROM entries GROUP BY source ORDER BY source"
+        )
+        by_source = {(r["source"] or "-"): {"entries": r["entries"], "bytes": r["bytes"], "hits": r["hits"]} for r in rows}
+        return {
+            "entries": sum(v["entries"] for v in by_source.values()),
+            "bytes": sum(v["bytes"] for v in by_source.values()),
+            "hits": sum(v["hits"] for v in by_source.values()),
+            "by_source": by_source,
+        }
+
+
+def flush_pending_hits() -> None:
+    """Write the pending hit counts of every catalogue (run at exit)."""
+    with _pending_lock:
+        paths = list(_pending_hits)
+    for path in paths:
+        try:
+            CacheIndex(os.path.dirname(path)).flush_hits()
+        except sqlite3.Error:
+            pass
+
+
+atexit.register(flush_pending_hits)
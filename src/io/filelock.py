@@ -0,0 +1,78 @@
+"""Advisory cross-process file locks.
+
+`fcntl.flock` on POSIX, `msvcrt.locking` on Windows. Locks are held per open
+file, so they also exclude other threads of the same process that open the
+same lock file.
+"""
+import os
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    def __init__(self, path: str, timeout: Optional[float] = None, poll: float = 0.05):
+        self.path = path
+        # None waits forever
+        self.timeout = timeout
+        self.poll = poll
+        self._fh = None
+        # True when the last acquire had to wait for another holder
+        self.waited = False
+
+    @property
+    def locked(self) -> bool:
+        return self._fh is not None
+
+    def _try_lock(self, fh) -> bool:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self) -> bool:
+        """Block until the lock is held; False if `timeout` ran out first."""
+        if self._fh is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fh = open(self.path, "a+b")
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        self.waited = False
+        while not self._try_lock(fh):
+            self.waited = True
+            if deadline is not None and time.monotonic() >= deadline:
+                fh.close()
+                return False
+            time.sleep(self.poll)
+        self._fh = fh
+        return True
+
+    def release(self) -> None:
+        fh, self._fh = self._fh, None
+        if fh is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            fh.close()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
@@ -11,9 +11,9 @@ from .processing.scoring import (
     compute_composite,
     rank_scores,
 )
-from .io.cache import cache_get, cache_set
+from .fetchers.orchestrator import run_fetch_phase
 from .io.excel import export_to_excel
-from .io.artifacts import write_manifest, _enrich_fetch_entry
+from .io.artifacts import write_manifest
 from .portfolio.allocations import score_to_weights, write_allocations
 import pandas as pd
 
@@ -56,233 +56,12 @@ def main(cli_args=None):
                 except Exception:
                     pass
     logging.getLogger(__name__).info("Starting fetch...")
-    # Build fetcher registry and dispatch per source
-    from .fetchers.worldbank import WorldBankFetcher
-    from .fetchers.imf import IMFFetcher
-    from .fetchers.oecd import OECDFetcher
-    from .fetchers.ecb import ECBFetcher
-
-    fetcher_map = {
-        "WB": WorldBankFetcher,
-        "IMF": IMFFetcher,
-        "OECD": OECDFetcher,
-        "ECB": ECBFetcher,
-    }
-
-    all_rows = []
-    fetch_summary = {}
-    fetch_entries = []
-    # prepare concurrent fetch tasks
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-
-    fetch_tasks = []
-    executor = ThreadPoolExecutor(
-        max_workers=cfg.runtime.max_workers if getattr(cfg, "runtime", None) else 4
-    )
-    # Iterate per indicator and per declared source for that indicator using Indicator plugins
-    from .indicators.wb_indicator import WBIndicator
-    from .indicators.imf_indicator import IMFIndicator
-
-    for ind in cfg.indicators:
-        ind_id = ind.id
-        sources = ind.sources or []
-        for src_entry in sources:
-            if isinstance(src_entry, dict):
-                src = src_entry.get("source")
-                code = src_entry.get("code")
-            else:
-                src = getattr(src_entry, "source", None)
-                code = getattr(src_entry, "code", None)
-
-            # Plugin support for WB and IMF; otherwise fall back to a TempPlugin
-            if src == "WB":
-                plugin = WBIndicator(
-                    cfg.dict() if hasattr(cfg, "dict") else dict(cfg), ind_id, code
-                )
-            elif src == "IMF":
-                plugin = IMFIndicator(
-                    cfg.dict() if hasattr(cfg, "dict") else dict(cfg), ind_id, code
-                )
-            else:
-                logging.warning(
-                    f"No plugin for source {src} (indicator {ind_id}), falling back to fetcher map"
-                )
-                FetcherCls = fetcher_map.get(src)
-                if not FetcherCls:
-                    logging.warning(
-                        f"No fetcher for source {src} (indicator {ind_id}), skipping"
-                    )
-                    continue
-                fetcher = FetcherCls(
-                    cfg.runtime.dict() if hasattr(cfg.runtime, "dict") else cfg.runtime
-                )
-
-                # Wrap fetcher in a minimal plugin-like object
-                class _TempPlugin:
-                    def __init__(self, fetcher, ind_id, code):
-                        self.fetcher = fetcher
-                        self.id = ind_id
-                        self.code = code
-
-                    def fetch(self, countries, start, end, freq):
-                        return self.fetcher.fetch(
-                            countries,
-                            [{"id": self.id, "code": self.code}],
-                            start,
-                            end,
-                            freq,
-                        )
-
-                    def transform(self, df):
-                        return df
-
-                    def standardize(self, df):
-                        df2 = df.copy()
-                        mu = df2["value"].mean()
-                        sigma = df2["value"].std(ddof=0)
-                        df2["value_std"] = (df2["value"] - mu) / (
-                            sigma if sigma != 0 else 1.0
-                        )
-                        return df2
-
-                plugin = _TempPlugin(fetcher, ind_id, code)
-
-            cache_key = f"{src.lower()}_{ind_id}_{'_'.join(cfg.countries)}"
-            data_src = None
-            # Try to load from cache
-            if getattr(cfg, "caching", None) and cfg.caching.enabled:
-                cached = cache_get(cache_key, cfg.caching.ttl_hours)
-                if cached:
-                    # cached may be {'records': [...], 'fetch_logs': [...]}
-                    records = (
-                        cached.get("records") if isinstance(cached, dict) else cached
-                    )
-                    data_src = pd.DataFrame(records)
-                    # attach cached fetch logs into manifest fetch_entries
-                    if isinstance(cached, dict) and cached.get("fetch_logs"):
-                        # ensure cached logs are enriched to canonical schema
-                        enriched = []
-                        for f in cached.get("fetch_logs"):
-                            try:
-                                enriched.append(_enrich_fetch_entry(f))
-                            except Exception:
-                                enriched.append(f)
-                        fetch_entries.extend(enriched)
-
-            # If not cached, schedule fetch concurrently
-            if data_src is None:
-
-                def _fetch_task(
-                    plugin=plugin, cache_key=cache_key, ind_id=ind_id, src=src
-                ):
-                    try:
-                        res = plugin.fetch(
-                            cfg.countries,
-                            cfg.period["start"][:10],
-                            cfg.period["end"][:10],
-                            cfg.period["frequency"],
-                        )
-                        # normalize plugin return values; plugin.fetch may return:
-                        # - (df, logs)
-                        # - df
-                        # - None
-                        if res is None:
-                            df_src = pd.DataFrame(columns=["source","indicator","country","date","value"])
-                            logs = []
-                        elif isinstance(res, tuple) and len(res) >= 2:
-                            df_src, logs = res[0], res[1] or []
-                        else:
-                            df_src, logs = res, []
-                        # defensive coercion to DataFrame
-                        if not isinstance(df_src, pd.DataFrame):
-                            try:
-                                df_src = pd.DataFrame(df_src)
-                            except Exception:
-                                df_src = pd.DataFrame(columns=["source","indicator","country","date","value"])
-                        # Enrich any fetch logs immediately so cached logs are canonical
-                        enriched_logs = []
-                        for f in (logs or []):
-                            try:
-                                enriched_logs.append(_enrich_fetch_entry(f))
-                            except Exception:
-                                enriched_logs.append(f)
-                        logs = enriched_logs
-                        # write cache (cache_set is thread-safe)
-                        try:
-                            if logs:
-                                cache_set(
-                                    cache_key,
-                                    {
-                                        "records": df_src.to_dict(orient="records"),
-                                        "fetch_logs": logs,
-                                    },
-                                    cfg.caching.ttl_hours,
-                                )
-                            else:
-                                cache_set(
-                                    cache_key,
-                                    df_src.to_dict(orient="records"),
-                                    cfg.caching.ttl_hours,
-                                )
-                        except Exception:
-                            pass
-                        return (src, ind_id, df_src, logs)
-                    except Exception as e:
-                        logging.getLogger(__name__).warning(
-                            f"Fetch task failed for {cache_key}: {e}"
-                        )
-                        return (
-                            src,
-                            ind_id,
-                            pd.DataFrame(
-                                columns=[
-                                    "source",
-                                    "indicator",
-                                    "country",
-                                    "date",
-                                    "value",
-                                ]
-                            ),
-                            [],
-                        )
-
-                future = executor.submit(_fetch_task)
-                fetch_tasks.append(future)
-            else:
-                if data_src is not None and not data_src.empty:
-                    # tag with canonical indicator id
-                    data_src["indicator"] = ind_id
-                    # record summary per source
-                    fetch_summary.setdefault(src, 0)
-                    fetch_summary[src] += len(data_src)
-                    all_rows.append(data_src)
-
-    # collect concurrent fetch results
-    for fut in as_completed(fetch_tasks):
-        try:
-            src, ind_id, df_src, logs = fut.result()
-            if logs:
-                # logs should already be enriched, but ensure canonical shape
-                enriched = []
-                for f in logs:
-                    try:
-                        enriched.append(_enrich_fetch_entry(f))
-                    except Exception:
-                        enriched.append(f)
-                fetch_entries.extend(enriched)
-            if df_src is not None and not df_src.empty:
-                df_src["indicator"] = ind_id
-                fetch_summary.setdefault(src, 0)
-                fetch_summary[src] += len(df_src)
-                all_rows.append(df_src)
-        except Exception:
-            continue
-
-    if not all_rows:
+    fetched = run_fetch_phase(cfg)
+    fetch_summary = fetched.fetch_summary
+    fetch_entries = fetched.fetch_entries
+    if not fetched.frames:
         logging.warning("No data fetched from any source for any indicator.")
-        data = pd.DataFrame(columns=["source", "indicator", "country", "date", "value"])
-    else:
-        data = pd.concat(all_rows, ignore_index=True)
+    data = fetched.data()
     # Write artifacts manifest
     try:
         manifest = {
@@ -293,6 +72,7 @@ def main(cli_args=None):
             "series_as_of": {},
             "n_rows": len(data),
             "config_snapshot": cfg.dict() if hasattr(cfg, "dict") else dict(cfg),
+            **fetched.manifest,
         }
         try:
             series_map = {}
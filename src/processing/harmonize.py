@@ -1,7 +1,11 @@
-from typing import Tuple, Dict, Any
+import functools
+from typing import Tuple, Dict, Any, Optional
 import pandas as pd
 import numpy as np
 
+# frequencies fetchers tag rows with (column `freq`)
+_FREQS = ("A", "Q", "M")
+
 
 def _infer_freq(series: pd.Series) -> str:
     # Try pandas infer_freq, fallback to median delta heuristic
@@ -29,6 +33,38 @@ def _infer_freq(series: pd.Series) -> str:
     return "M"
 
 
+@functools.lru_cache(maxsize=4096)
+def _infer_freq_of(dtype: str, dates: bytes) -> str:
+    return _infer_freq(pd.Series(index=pd.DatetimeIndex(np.frombuffer(dates, dtype=dtype)), dtype=float))
+
+
+def _infer_freq_cached(series: pd.Series) -> str:
+    """`_infer_freq` memoized on the content of the date index.
+
+    The frequency depends on the dates only, and many series share them
+    (every country of a WB indicator, say), so untagged series are inferred
+    once per distinct date vector.
+    """
+    index = series.index
+    if not isinstance(index, pd.DatetimeIndex) or index.tz is not None:
+        return _infer_freq(series)
+    return _infer_freq_of(index.dtype.str, index.asi8.tobytes())
+
+
+def _tagged_freq(df: pd.DataFrame) -> Optional[str]:
+    """Frequency the fetcher tagged the rows with, if they agree on one.
+
+    Rows of several sources repeat dates; such groups keep the inferred
+    frequency, which is what their handling below was written for.
+    """
+    if "freq" not in df.columns or not df["date"].is_unique:
+        return None
+    tags = df["freq"].dropna().unique()
+    if len(tags) == 1 and tags[0] in _FREQS:
+        return str(tags[0])
+    return None
+
+
 def _quarter_index_range(start, end):
     # use QE (quarter end) to be compatible with pandas new tokens
     return pd.date_range(start=start, end=end, freq="QE")
@@ -42,14 +78,16 @@ def harmonize_indicator(
 ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """Harmonize a single indicator/country time series to target frequency.
 
-    Expects df columns: ['date', 'value'] with date as datetime64.
+    Expects df columns: ['date', 'value'] with date as datetime64, and
+    optionally 'freq' as tagged by the fetchers, which is trusted over
+    inferring the source frequency.
     Returns (harmonized_df, report)
     """
     if df.empty:
         return df.copy(), {"n_in": 0, "n_out": 0, "source_freq": None, "target_freq": target_freq}
 
     s = df.sort_values("date").set_index("date")["value"].astype(float)
-    src_freq = _infer_freq(s)
+    src_freq = _tagged_freq(df) or _infer_freq_cached(s)
 
     report = {
         "source_freq": src_freq,
@@ -118,16 +156,17 @@ def harmonize_indicator(
     return s.reset_index().rename(columns={"value": "value"}).reset_index(drop=True), report
 
 
-def harmonize_df(df: pd.DataFrame, target_freq: str = 'Q', aggregation: str = 'mean', sa_flag: bool = False):
-    """Apply harmonization to a full DataFrame with columns ['indicator','country','date','value'].
+def _harmonize_groups(df: pd.DataFrame, target_freq: str = 'Q', aggregation: str = 'mean', sa_flag: bool = False):
+    """`harmonize_df` for frames the vectorized engine does not handle.
 
-    Returns (harmonized_df, report_df)
+    Runs `harmonize_indicator` on every (indicator, country) group.
     """
     results = []
     reports = []
+    cols = ['date', 'value', 'freq'] if 'freq' in df.columns else ['date', 'value']
     gb = df.groupby(['indicator', 'country'])
     for (ind, c), group in gb:
-        hdf, rep = harmonize_indicator(group[['date', 'value']], target_freq=target_freq, aggregation=aggregation, sa_flag=sa_flag)
+        hdf, rep = harmonize_indicator(group[cols], target_freq=target_freq, aggregation=aggregation, sa_flag=sa_flag)
         hdf['indicator'] = ind
         hdf['country'] = c
         results.append(hdf[['indicator', 'country', 'date', 'value']])
@@ -141,15 +180,187 @@ def harmonize_df(df: pd.DataFrame, target_freq: str = 'Q', aggregation: str = 'm
 
     report_df = pd.DataFrame(reports)
     return out_df, report_df
+
+
+# month step between consecutive observations -> frequency `pd.infer_freq` reports
+_STEP_FREQ = {1: "M", 3: "Q", 12: "A"}
+_AGGREGATIONS = ("mean", "median", "last")
+
+
+def _reduce(ufunc, arr, starts, first=None):
+    """Per-group reduction over contiguous groups beginning at `starts`.
+
+    `first` replaces the element at each group start (for pairwise arrays
+    whose first element compares against the previous group).
+    """
+    if first is not None:
+        arr = arr.copy()
+        arr[starts] = first
+    return ufunc.reduceat(arr, starts)
+
+
+def _quarter_ends(qkey: np.ndarray, dtype) -> np.ndarray:
+    """Quarter-end dates of integer quarter keys (year * 4 + quarter index)."""
+    next_start = (qkey // 4 - 1970) * 12 + (qkey % 4) * 3 + 3
+    days = next_start.astype("datetime64[M]").astype("datetime64[D]") - np.timedelta64(1, "D")
+    return days.astype(dtype)
+
+
+def harmonize_df(df: pd.DataFrame, target_freq: str = 'Q', aggregation: str = 'mean', sa_flag: bool = False):
+    """Apply harmonization to a full DataFrame with columns ['indicator','country','date','value'].
+
+    Vectorized over all (indicator, country) groups: source frequencies are
+    taken from the fetchers' `freq` tags or detected from calendar fields, then A->Q padding and M->Q
+    aggregation run as one grouped operation per frequency bucket on integer
+    quarter keys. Groups outside the calendar-regular fast path (NaT or
+    duplicate dates, times of day, irregular spacing) go through
+    `harmonize_indicator` as before. Output and report match
+    `_harmonize_groups` row for row.
+
+    Returns (harmonized_df, report_df)
+    """
+    date_dtype = df['date'].dtype if 'date' in df.columns else None
+    if not isinstance(date_dtype, np.dtype) or date_dtype.kind != 'M':
+        return _harmonize_groups(df, target_freq=target_freq, aggregation=aggregation, sa_flag=sa_flag)
+    gid = df.groupby(['indicator', 'country']).ngroup().to_numpy()
+    keep = np.flatnonzero(~np.isnan(gid))
+    if not len(keep):
+        return df.copy(), pd.DataFrame([])
+
+    # rows ordered by group, then date; group ids are 0..n_groups-1 in key order
+    rows = pd.DataFrame({
+        'g': gid[keep].astype('int64'),
+        'date': df['date'].to_numpy()[keep],
+        'value': df['value'].iloc[keep].astype(float).to_numpy(),
+    }, index=keep).sort_values(['g', 'date'], kind='stable')
+    g = rows['g'].to_numpy()
+    dates = rows['date']
+    t = dates.to_numpy().view('i8')
+    v = rows['value'].to_numpy()
+    tags = df['freq'].to_numpy()[rows.index.to_numpy()] if 'freq' in df.columns else None
+    year = dates.dt.year.to_numpy(dtype='int64', na_value=0)
+    month = dates.dt.month.to_numpy(dtype='int64', na_value=1)
+    qkey = year * 4 + (month - 1) // 3
+
+    starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+    ends = np.r_[starts[1:], len(g)] - 1
+    n = ends - starts + 1
+    n_groups = len(starts)
+
+    # groups the calendar arithmetic cannot reproduce exactly: NaT, times of day, duplicate dates
+    odd = (dates.dt.normalize() != dates).to_numpy()
+    dup = np.r_[False, t[1:] == t[:-1]]
+    dup[starts] = False
+    slow = _reduce(np.logical_or, odd | dup, starts)
+
+    # source frequency per group: the fetchers' tag, else as `_infer_freq` detects it
+    freq = np.full(n_groups, "M", dtype=object)
+    tagged = np.zeros(n_groups, dtype=bool)
+    if tags is not None:
+        # code per row: tagged frequency 0..2, -1 untagged, 3 unknown tag
+        code = pd.Series(tags).map({f: i for i, f in enumerate(_FREQS)}).fillna(len(_FREQS)).to_numpy(dtype='int64')
+        code = np.where(pd.isna(tags), -1, code)
+        hi = _reduce(np.maximum, code, starts)
+        lo = _reduce(np.minimum, np.where(code < 0, len(_FREQS), code), starts)
+        tagged = (hi == lo) & (hi < len(_FREQS)) & ~slow
+        freq[tagged] = np.asarray(_FREQS, dtype=object)[hi[tagged]]
+    two = (n == 2) & ~tagged
+    # pd.infer_freq needs three dates; two-point groups get the median-delta heuristic on raw int64 values
+    delta_days = (t[ends[two]] // 10 ** 9 - t[starts[two]] // 10 ** 9) / (24 * 3600)
+    freq[two] = np.where(delta_days > 300, "A", np.where(delta_days > 40, "Q", "M"))
+    # equally spaced month starts or month ends are what infer_freq reports as M/Q/A
+    month_no = year * 12 + month - 1
+    step = np.r_[0, np.diff(month_no)]
+    step_min = _reduce(np.minimum, step, starts, first=np.iinfo('int64').max)
+    step_max = _reduce(np.maximum, step, starts, first=np.iinfo('int64').min)
+    month_start = _reduce(np.logical_and, dates.dt.day.to_numpy(dtype='int64', na_value=0) == 1, starts)
+    month_end = _reduce(np.logical_and, dates.dt.is_month_end.to_numpy(dtype=bool, na_value=False), starts)
+    regular = (n >= 3) & ~tagged & (step_min == step_max) & (month_start | month_end) & np.isin(step_min, list(_STEP_FREQ))
+    freq[regular] = [_STEP_FREQ[k] for k in step_min[regular]]
+    for i in np.flatnonzero((n >= 3) & ~tagged & ~regular & ~slow):
+        lo, hi = starts[i], ends[i] + 1
+        freq[i] = _infer_freq_cached(pd.Series(v[lo:hi], index=pd.DatetimeIndex(dates.iloc[lo:hi])))
+
+    annual = monthly = np.zeros(n_groups, dtype=bool)
+    if target_freq == 'Q':
+        # duplicate years make the per-group reindex raise; let it do so
+        dup_year = np.r_[False, year[1:] == year[:-1]]
+        slow |= (freq == "A") & _reduce(np.logical_or, dup_year, starts, first=False)
+        annual = (freq == "A") & ~slow
+        monthly = (freq == "M") & ~slow
+    expand = annual | monthly
+
+    n_out = n.copy()
+    pieces = []
+    cols = ['date', 'value', 'freq'] if tags is not None else ['date', 'value']
+    same = ~(expand | slow)[g]
+    if same.any():
+        pieces.append(pd.DataFrame({'g': g[same], 'date': dates.to_numpy()[same], 'value': v[same]}))
+
+    if expand.any():
+        # one row per quarter from the first to the last observation of each group
+        groups = np.flatnonzero(expand)
+        qmin, qmax = qkey[starts[groups]], qkey[ends[groups]]
+        n_q = qmax - qmin + 1
+        n_out[groups] = n_q
+        grid_g = np.repeat(groups, n_q)
+        grid_q = np.repeat(qmin, n_q) + np.arange(n_q.sum()) - np.repeat(np.cumsum(n_q) - n_q, n_q)
+        base, span = qkey.min(), int(qkey.max() - qkey.min()) + 8
+        grid_key = grid_g * span + (grid_q - base)
+        grid_v = np.full(len(grid_q), np.nan)
+
+        a_rows = annual[g]
+        if a_rows.any():
+            # annual values sit at year end: each quarter takes the last year ending on or before it
+            a_g, a_v = g[a_rows], v[a_rows]
+            pos = np.searchsorted(a_g * span + (year[a_rows] * 4 + 3 - base), grid_key, side='right') - 1
+            hit = annual[grid_g] & (pos >= 0)
+            hit[hit] = a_g[pos[hit]] == grid_g[hit]
+            grid_v[hit] = a_v[pos[hit]]
+
+        m_rows = monthly[g]
+        if m_rows.any():
+            how = aggregation if aggregation in _AGGREGATIONS else 'mean'
+            agg = pd.Series(v[m_rows]).groupby([g[m_rows], qkey[m_rows]], sort=True).agg(how)
+            m_key = agg.index.get_level_values(0).to_numpy() * span + (agg.index.get_level_values(1).to_numpy() - base)
+            pos = np.minimum(np.searchsorted(m_key, grid_key), len(m_key) - 1)
+            hit = monthly[grid_g] & (m_key[pos] == grid_key)
+            grid_v[hit] = agg.to_numpy()[pos[hit]]
+
+        pieces.append(pd.DataFrame({'g': grid_g, 'date': _quarter_ends(grid_q, date_dtype), 'value': grid_v}))
+
+    for i in np.flatnonzero(slow):
+        hdf, rep = harmonize_indicator(df[cols][gid == i], target_freq=target_freq, aggregation=aggregation, sa_flag=sa_flag)
+        freq[i], n_out[i] = rep['source_freq'], rep['n_out']
+        pieces.append(pd.DataFrame({'g': i, 'date': hdf['date'].to_numpy(), 'value': hdf['value'].to_numpy()}))
+
+    out = pd.concat(pieces, ignore_index=True).sort_values('g', kind='stable') if len(pieces) > 1 else pieces[0]
+    order = out['g'].to_numpy()
+    keys = df[['indicator', 'country']].iloc[rows.index.to_numpy()[starts]]
+    indicators, countries = keys['indicator'].tolist(), keys['country'].tolist()
+    out_df = pd.DataFrame({
+        'indicator': pd.Index(indicators).take(order),
+        'country': pd.Index(countries).take(order),
+        'date': out['date'].to_numpy(),
+        'value': out['value'].to_numpy(),
+    })
+    report_df = pd.DataFrame({
+        'source_freq': freq.tolist(),
+        'target_freq': [target_freq] * n_groups,
+        'aggregation': [aggregation] * n_groups,
+        'sa_flag': [sa_flag] * n_groups,
+        'n_in': n.tolist(),
+        'n_out': n_out.tolist(),
+        'indicator': indicators,
+        'country': countries,
+    })
+    return out_df, report_df
 import pandas as pd
 import pycountry
 
 
-def iso_to_iso3(code: str) -> str:
-    # Accept already ISO3 or ISO2; attempt conversion
-    if not code:
-        return code
-    code = code.strip().upper()
+def _resolve_iso3(code: str) -> str:
+    """pycountry resolution of a stripped, upper-cased code (ISO2, name, ...)."""
     if len(code) == 3:
         return code
     try:
@@ -167,15 +378,116 @@ def iso_to_iso3(code: str) -> str:
     return code
 
 
+# country attributes the lookup table is keyed on (upper-cased); three-letter
+# codes are taken as ISO3 without a lookup
+_ISO_KEYS = ("alpha_2", "name", "official_name", "common_name")
+
+
+@functools.lru_cache(maxsize=1)
+def iso3_table() -> Dict[str, str]:
+    """ISO2 codes and country names (upper-cased) -> ISO3.
+
+    Built once from pycountry with the same resolution `iso_to_iso3` applies,
+    so a hit in the table equals what pycountry would return.
+    """
+    keys = {
+        str(getattr(c, attr)).strip().upper()
+        for c in pycountry.countries
+        for attr in _ISO_KEYS
+        if getattr(c, attr, None)
+    }
+    return {k: _resolve_iso3(k) for k in sorted(keys) if len(k) != 3}
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_unknown(code: str) -> str:
+    return _resolve_iso3(code)
+
+
+def iso_to_iso3(code: str) -> str:
+    # Accept already ISO3 or ISO2; attempt conversion
+    if not code:
+        return code
+    code = code.strip().upper()
+    if len(code) == 3:
+        return code
+    hit = iso3_table().get(code)
+    return hit if hit is not None else _resolve_unknown(code)
+
+
+def write_iso3_table(path: str) -> int:
+    """Export `iso3_table` as a CSV (code, alpha_3); returns the number of rows.
+
+    The file is not read back: the table is always built from pycountry."""
+    table = iso3_table()
+    pd.DataFrame({"code": list(table), "alpha_3": list(table.values())}).to_csv(path, index=False)
+    return len(table)
+
+
 def harmonize_countries(df: pd.DataFrame) -> pd.DataFrame:
+    """Map country codes to ISO3, resolving each distinct code once."""
     df = df.copy()
-    df["country"] = df["country"].apply(lambda x: iso_to_iso3(x))
+    if df.empty:
+        return df
+    codes, uniques = pd.factorize(df["country"])
+    mapped = pd.Index([iso_to_iso3(c) for c in uniques])
+    df["country"] = mapped.take(codes, allow_fill=True, fill_value=np.nan)
     return df
 
 
+# provider period notations: '2020', '2020Q1' / '2020-Q1', '2020-03' / '2020M03'
+_PERIOD_RE = r"^(?P<year>\d{4})(?:-?Q(?P<quarter>[1-4])|-?M?(?P<month>0[1-9]|1[0-2]))?$"
+
+
+def _period_text(value: Any) -> Optional[str]:
+    if isinstance(value, (str, int, np.integer, pd.Period)) and not isinstance(value, bool):
+        return str(value).strip().upper()
+    return None
+
+
+def _parse_other(values: pd.Series) -> pd.Series:
+    """`pd.to_datetime` for values that are not period strings (full dates, timestamps)."""
+    try:
+        parsed = pd.to_datetime(values, errors="coerce", format="mixed")
+    except (TypeError, ValueError):
+        # tz-aware mixed with naive values: compare them in UTC
+        parsed = pd.to_datetime(values, errors="coerce", format="mixed", utc=True)
+    if parsed.dt.tz is not None:
+        parsed = parsed.dt.tz_convert(None)
+    return parsed
+
+
 def parse_dates(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse the `date` column to datetime64.
+
+    Year, quarter and month periods as providers return them are decoded
+    arithmetically to the start of the period (as `pd.to_datetime` reads
+    '2020', '2020Q1' or '2020-03'); other values such as full dates go
+    through `pd.to_datetime`. Every distinct value is parsed once, and a
+    column mixing formats keeps all of them.
+    """
     df = df.copy()
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    dates = df["date"]
+    if isinstance(dates.dtype, pd.DatetimeTZDtype) or (isinstance(dates.dtype, np.dtype) and dates.dtype.kind == "M"):
+        return df
+    codes, uniques = pd.factorize(dates)
+    uniq = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+    parts = uniq.map(_period_text).str.extract(_PERIOD_RE)
+    is_period = parts["year"].notna().to_numpy()
+    other = _parse_other(uniq[~is_period]) if (~is_period).any() else None
+    unit = other.dt.unit if other is not None else "us"
+
+    # one slot per distinct value, plus NaT for missing dates (code -1)
+    values = np.full(len(uniq) + 1, np.datetime64("NaT"), dtype=f"datetime64[{unit}]")
+    if is_period.any():
+        year = parts["year"][is_period].astype("int64").to_numpy()
+        quarter = parts["quarter"][is_period].astype(float).to_numpy()
+        month = parts["month"][is_period].astype(float).to_numpy()
+        month = np.where(~np.isnan(month), month, np.where(~np.isnan(quarter), (quarter - 1) * 3 + 1, 1)).astype("int64")
+        values[:-1][is_period] = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    if other is not None:
+        values[:-1][~is_period] = other.to_numpy()
+    df["date"] = values[codes]
     return df
 
 
@@ -1,11 +1,43 @@
 from typing import Optional, Dict
 import pandas as pd
 import numpy as np
-from src.transforms import standardize
 from src.config import DEFAULT_STD_CONFIG, StandardizeConfig
 from scipy import stats
 
 
+def _std_config(config) -> StandardizeConfig:
+    # accept either dict or pydantic config
+    if config is None:
+        return DEFAULT_STD_CONFIG
+    try:
+        return DEFAULT_STD_CONFIG.copy(update=config)
+    except Exception:
+        # if config is already a StandardizeConfig or similar, use as-is
+        return config  # type: ignore[return-value]
+
+
+def _group_median(sorted_vals: np.ndarray, starts: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Median per contiguous group of ascending values, as np.nanmedian computes it."""
+    h = n // 2
+    low = sorted_vals[starts + np.where(n % 2 == 1, h, h - 1)]
+    high = sorted_vals[starts + h]
+    return (low + high) / 2.0
+
+
+def _group_quantile(sorted_vals: np.ndarray, starts: np.ndarray, n: np.ndarray, q: float) -> np.ndarray:
+    """Quantile per contiguous group of ascending values (numpy's 'linear' method)."""
+    virtual = n * q + (1 + q * -1) - 1
+    prev = np.floor(virtual)
+    last = virtual >= n - 1
+    prev = np.where(last, n - 1, np.where(virtual < 0, 0, prev))
+    gamma = virtual - np.where(last, -1, prev)
+    nxt = np.where(last | (virtual < 0), prev, prev + 1)
+    a = sorted_vals[starts + prev.astype(np.intp)]
+    b = sorted_vals[starts + nxt.astype(np.intp)]
+    diff = b - a
+    return np.where(gamma >= 0.5, b - diff * (1 - gamma), a + diff * gamma)
+
+
 def apply_standardization(
     df: pd.DataFrame,
     config: Optional[Dict] = None,
@@ -19,16 +51,15 @@ def apply_standardization(
 
     Expects df with columns: ['indicator', 'country', 'date', 'value']
     Returns df with an added 'std_value' column.
+
+    Works on the whole long frame at once: rolling baselines via
+    groupby().rolling(), winsor bounds, medians and ranks per group on the
+    group-sorted values, and the Spearman sign check from the covariance of
+    group ranks. Rows come back ordered by group, then date, and std_value
+    matches the former per-group loop (kept in scripts/bench_standardize.py)
+    up to the summation order of means and standard deviations.
     """
-    # accept either dict or pydantic config
-    if config is None:
-        cfg: StandardizeConfig = DEFAULT_STD_CONFIG
-    else:
-        try:
-            cfg = DEFAULT_STD_CONFIG.copy(update=config)
-        except Exception:
-            # if config is already a StandardizeConfig or similar, use as-is
-            cfg = config  # type: ignore[assignment]
+    cfg = _std_config(config)
     gk = group_keys or ["indicator", "country"]
 
     out = df.copy()
@@ -38,90 +69,88 @@ def apply_standardization(
     if "date" in out.columns:
         out = out.sort_values("date")
 
-    grouped = out.groupby(gk)
-
-    results = []
-    for name, group in grouped:
-        s = group.set_index("date")["value"].astype(float)
-        # compute rolling baseline and deviation
-        baseline, deviation = standardize.rolling_baseline(
-            s, window=cfg.rolling_window, min_periods=cfg.rolling_min_periods
-        )
-        # deviation may have NaNs for early windows; dropna for stats
-        dev = deviation.fillna(0).values
-
-        # optionally use rolling MAD as scale for robust zscore
-        rolling_mad = None
-        if getattr(cfg, 'rolling_mad', False):
-            try:
-                rm = standardize.rolling_mad(s, window=cfg.rolling_window, min_periods=cfg.rolling_min_periods)
-                # align to dev index and fillna (use bfill/ffill to avoid deprecated fillna(method=...))
-                rolling_mad = rm.bfill().ffill().values
-            except Exception:
-                rolling_mad = None
-
-        # winsorize if requested
-        if method in ("winsorized_zscore", "robust_zscore", "zscore"):
-            w = standardize.winsorize(dev, lower_pct=cfg.winsor_lower, upper_pct=cfg.winsor_upper)
-        else:
-            w = dev
-
-        # standardize methods
-        if method == "robust_zscore":
-            z = standardize.robust_zscore(w, scale=rolling_mad if rolling_mad is not None else None)
-        elif method == "zscore":
-            # classic zscore: mean/std
-            a = np.asarray(w, dtype=float)
-            mu = np.nanmean(a)
-            sd = np.nanstd(a)
-            sd = sd if sd > 0 else np.nan
-            z = (a - mu) / (sd if sd and not np.isnan(sd) else 1.0)
-        elif method == "winsorized_zscore":
-            # winsorize then classic zscore
-            a = np.asarray(w, dtype=float)
-            mu = np.nanmean(a)
-            sd = np.nanstd(a)
-            sd = sd if sd > 0 else np.nan
-            z = (a - mu) / (sd if sd and not np.isnan(sd) else 1.0)
-        elif method == "rank_norm":
-            z = standardize.rank_norm(w)
-        else:
-            raise ValueError(f"unknown standardization method: {method}")
-
-        # apply invert if requested (useful for indicators where lower is better)
-        if invert:
-            z = -1.0 * z
-
-        # automatic sign check: ensure that sign of relationship between raw value and
-        # standardized score matches declared good_direction. If mismatch and auto_sign_check
-        # is enabled, flip the sign.
-        if auto_sign_check and good_direction in ("up", "down"):
-            try:
-                # compute Spearman correlation between raw dev and z
-                valid = (~np.isnan(dev)) & (~np.isnan(z))
-                if valid.sum() >= 2:
-                    corr, _ = stats.spearmanr(dev[valid], z[valid])
-                    if not np.isnan(corr):
-                        if good_direction == "up" and corr < 0:
-                            z = -1.0 * z
-                        if good_direction == "down" and corr > 0:
-                            z = -1.0 * z
-            except Exception:
-                # on any failure, keep z as-is
-                pass
-
-        # map back to group order
-        grp_out = group.copy()
-        grp_out = grp_out.assign(std_value=list(z))
-        results.append(grp_out)
-
-    if results:
-        df_out = pd.concat(results, ignore_index=True)
+    gid = out.groupby(gk).ngroup().to_numpy()
+    keep = np.flatnonzero(~np.isnan(gid))
+    if not len(keep):
+        return out.sort_index()
+    if method not in ("robust_zscore", "zscore", "winsorized_zscore", "rank_norm"):
+        raise ValueError(f"unknown standardization method: {method}")
+    # rows grouped in key order, dates ascending within a group
+    order = keep[np.argsort(gid[keep], kind="stable")]
+    out = out.iloc[order].reset_index(drop=True)
+    g = gid[order].astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+    n = np.diff(np.r_[starts, len(g)])
+    row_n = np.repeat(n, n)
+
+    s = pd.Series(out["value"].astype(float).to_numpy())
+    by = s.groupby(g, sort=False)
+    # compute rolling baseline and deviation
+    baseline = by.rolling(window=cfg.rolling_window, min_periods=cfg.rolling_min_periods).median().to_numpy()
+    dev = (s.to_numpy() - baseline)
+    dev = np.where(np.isnan(dev), 0.0, dev)
+
+    # optionally use rolling MAD as scale for robust zscore
+    rolling_mad = None
+    if getattr(cfg, "rolling_mad", False):
+        mad = (s - baseline).abs().groupby(g, sort=False)
+        mad = mad.rolling(window=cfg.rolling_window, min_periods=cfg.rolling_min_periods).median().to_numpy() * 1.4826
+        mad = pd.Series(mad).groupby(g, sort=False).bfill()
+        rolling_mad = mad.groupby(g, sort=False).ffill().to_numpy()
+
+    # winsorize if requested
+    if method in ("winsorized_zscore", "robust_zscore", "zscore"):
+        sorted_dev = dev[np.lexsort((dev, g))]
+        low = _group_quantile(sorted_dev, starts, n, cfg.winsor_lower)
+        high = _group_quantile(sorted_dev, starts, n, cfg.winsor_upper)
+        w = np.clip(dev, np.repeat(low, n), np.repeat(high, n))
     else:
-        df_out = out
+        w = dev
 
-    # restore original ordering by index if date existed
-    return df_out.sort_index()
+    if method == "robust_zscore":
+        center = _group_median(w[np.lexsort((w, g))], starts, n)
+        a = w - np.repeat(center, n)
+        if rolling_mad is not None:
+            scale = rolling_mad
+        else:
+            spread = np.abs(a)
+            mad = _group_median(spread[np.lexsort((spread, g))], starts, n)
+            std = pd.Series(w).groupby(g, sort=False).std(ddof=0).to_numpy()
+            scale = np.repeat(np.where(mad > 0, mad * 1.4826, std), n)
+        scale = np.where((scale == 0) | np.isnan(scale), np.nan, scale)
+        z = a / scale
+        z = np.where(np.isnan(z), 0.0, z)
+    elif method in ("zscore", "winsorized_zscore"):
+        # classic zscore: mean/std (after winsorizing)
+        by_w = pd.Series(w).groupby(g, sort=False)
+        mu = by_w.transform("mean").to_numpy()
+        sd = by_w.std(ddof=0).to_numpy()
+        sd = np.where(sd > 0, sd, 1.0)
+        z = (w - mu) / np.repeat(sd, n)
+    else:
+        ranks = pd.Series(w).groupby(g, sort=False).rank(method="average").to_numpy()
+        # avoid exact 0/1
+        eps = np.finfo(float).eps
+        z = stats.norm.ppf(np.clip((ranks - 0.5) / row_n, eps, 1 - eps))
+
+    # apply invert if requested (useful for indicators where lower is better)
+    if invert:
+        z = -1.0 * z
+
+    # automatic sign check: flip groups whose Spearman correlation between raw
+    # deviation and score disagrees with good_direction. Ranks are multiples of
+    # 0.5 centred on (n + 1) / 2, so the covariance, and its sign, is exact.
+    if auto_sign_check and good_direction in ("up", "down"):
+        centre = (row_n + 1) / 2.0
+        rank_dev = pd.Series(dev).groupby(g, sort=False).rank(method="average").to_numpy() - centre
+        rank_z = pd.Series(z).groupby(g, sort=False).rank(method="average").to_numpy() - centre
+        cov = np.add.reduceat(rank_dev * rank_z, starts)
+        flip = (cov < 0) if good_direction == "up" else (cov > 0)
+        flip &= (n >= 2) & ~np.isnan(cov)
+        z = np.where(np.repeat(flip, n), -1.0 * z, z)
+
+    out["std_value"] = z
+    return out
 
 
 def simple_score(df_std: pd.DataFrame, by: str = "country") -> pd.DataFrame:
@@ -1,7 +1,113 @@
+import json
+import threading
 import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, NamedTuple
+from urllib.parse import parse_qs, urlsplit
 
 # Suppress noisy pydantic / typing deprecation warnings during tests
 warnings.filterwarnings("ignore", category=DeprecationWarning, module="pydantic.*")
 warnings.filterwarnings("ignore", category=FutureWarning, module="pydantic.*")
 # Also suppress pandas futurewarnings that are benign for our tests
 warnings.filterwarnings("ignore", category=FutureWarning, module="pandas.*")
+
+
+import pytest  # noqa: E402
+
+from src.fetchers.breaker import reset_circuit_breakers  # noqa: E402
+from src.fetchers.deadline import reset_run_deadline  # noqa: E402
+from src.io import cache as io_cache  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _fresh_run_state():
+    # a pipeline run leaves its breakers (maybe open) and deadline (maybe
+    # expired) behind for the process; tests fetching directly start clean
+    yield
+    reset_circuit_breakers()
+    reset_run_deadline()
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """An empty `.cache` under a fresh working directory, with the cache's
+    memory tier cleared and its settings back at their defaults afterwards."""
+    monkeypatch.chdir(tmp_path)
+    io_cache.memory_tier.invalidate()
+    yield tmp_path / ".cache"
+    io_cache.memory_tier.invalidate()
+    io_cache.configure_cache(
+        backend=io_cache.DEFAULT_BACKEND,
+        memory_max_mb=io_cache.DEFAULT_MEMORY_MAX_MB,
+        lock_timeout_sec=io_cache.DEFAULT_LOCK_TIMEOUT_SEC,
+    )
+
+
+class StubRequest(NamedTuple):
+    """A request seen by a `local_server`: the raw request target (path and
+    query), the query's parameters (last value each) and the headers."""
+
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        stub = self.server.stub
+        query = {k: v[-1] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        req = StubRequest(self.path, query, dict(self.headers))
+        with stub.lock:
+            stub.requests.append(req)
+        status, body, *headers = stub.handler(req)
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        headers = {"Content-Type": "application/json", **(headers[0] if headers else {})}
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer:
+    """Threaded HTTP server on 127.0.0.1 answering GETs with `handler`, which
+    maps a `StubRequest` to ``(status, body)`` or ``(status, body, headers)``.
+    A body that is not bytes is sent as JSON."""
+
+    def __init__(self, handler: Callable[[StubRequest], tuple]):
+        self.handler = handler
+        self.requests: List[StubRequest] = []
+        self.lock = threading.Lock()
+        self._srv = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self._srv.stub = self
+        self.url = f"http://127.0.0.1:{self._srv.server_address[1]}"
+        self._closed = False
+        threading.Thread(target=self._srv.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._srv.shutdown()
+            self._srv.server_close()
+
+
+@pytest.fixture
+def local_server():
+    """Start local HTTP servers: ``local_server(handler)`` returns a running
+    `LocalServer`; all of them are closed after the test."""
+    servers: List[LocalServer] = []
+
+    def start(handler: Callable[[StubRequest], Any]) -> LocalServer:
+        servers.append(LocalServer(handler))
+        return servers[-1]
+
+    yield start
+    for srv in servers:
+        srv.close()
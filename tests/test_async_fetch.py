@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.fetchers.async_engine import FetchLimits, run_fetch_jobs
+from src.fetchers.worldbank import WorldBankFetcher
+
+PAGE_SIZE = 2
+YEARS = ["2019", "2020", "2021"]
+
+
+class _WBStub:
+    """WB-style paged API that tracks how many requests it serves at once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def __call__(self, req):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.02)
+            countries = req.path.split("/country/")[1].split("/")[0].split(";")
+            page = int(req.query.get("page", "1"))
+            recs = [
+                {"countryiso3code": c, "country": {"id": c[:2]}, "date": y, "value": float(i)}
+                for c in countries
+                for i, y in enumerate(YEARS)
+            ]
+            chunk = recs[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+            return 200, [{"page": page, "per_page": PAGE_SIZE, "total": len(recs)}, chunk]
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def wb_stub(local_server):
+    stub = _WBStub()
+    stub.url = local_server(stub).url
+    return stub
+
+
+INDICATORS = [{"id": "a", "code": "A.1"}, {"id": "b", "code": "B.1"}]
+COUNTRIES = ["DEU", "FRA", "ITA"]
+
+
+def test_afetch_matches_sync_fetch(wb_stub, monkeypatch):
+    monkeypatch.setattr("src.fetchers.worldbank._time.sleep", lambda s: None)
+    f = WorldBankFetcher({"wb_base_url": wb_stub.url, "wb_batch_size": 2})
+    df_sync, logs_sync = f.fetch(COUNTRIES, INDICATORS, "2019", "2021", "A")
+    df_async, logs_async = asyncio.run(f.afetch(COUNTRIES, INDICATORS, "2019", "2021", "A"))
+
+    assert len(df_sync) == len(COUNTRIES) * len(INDICATORS) * len(YEARS)
+    assert df_async.sort_values(["indicator", "country", "date"]).reset_index(drop=True).equals(
+        df_sync.sort_values(["indicator", "country", "date"]).reset_index(drop=True)
+    )
+    assert [(e["indicator"], e["country"]) for e in logs_async] == [
+        (e["indicator"], e["country"]) for e in logs_sync
+    ]
+    assert [e["sha256_normalized"] for e in logs_async] == [e["sha256_normalized"] for e in logs_sync]
+
+
+def test_async_engine_respects_global_limit(wb_stub):
+    f = WorldBankFetcher({"wb_base_url": wb_stub.url, "wb_batch_size": 1})
+    limits = FetchLimits(max_concurrency=3)
+
+    async def _run():
+        return await f.afetch(COUNTRIES, INDICATORS, "2019", "2021", "A", limits=limits)
+
+    df, _ = asyncio.run(_run())
+    limits.close()
+    assert len(df) == len(COUNTRIES) * len(INDICATORS) * len(YEARS)
+    assert 1 < wb_stub.max_in_flight <= 3
+
+
+def test_per_source_limit_and_job_runner(wb_stub):
+    runtime = {"wb_base_url": wb_stub.url, "wb_batch_size": 1, "async_max_concurrency": 8, "async_source_limits": {"WB": 1}}
+    f = WorldBankFetcher(runtime)
+
+    def job(ind):
+        async def _job(limits):
+            return await f.afetch(COUNTRIES, [ind], "2019", "2021", "A", limits=limits)
+
+        return _job
+
+    results = run_fetch_jobs([job(ind) for ind in INDICATORS], runtime)
+    assert [set(df["indicator"]) for df, _ in results] == [{"a"}, {"b"}]
+    assert wb_stub.max_in_flight == 1
+
+
+def test_fetch_override_is_kept_by_afetch():
+    class FixtureWB(WorldBankFetcher):
+        def fetch(self, countries, indicators, start, end, freq):
+            import pandas as pd
+
+            return pd.DataFrame([{"country": c, "value": 1.0} for c in countries]), []
+
+    df, logs = asyncio.run(FixtureWB({}).afetch(["DEU"], INDICATORS, "2019", "2021", "A"))
+    assert list(df["country"]) == ["DEU"]
+    assert logs == []
@@ -0,0 +1,121 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.io import cache as io_cache
+from src.io.cache_backends import ColumnarCacheBackend, JsonCacheBackend
+
+
+def _records():
+    return pd.DataFrame(
+        {
+            "source": ["WB", "WB", "WB"],
+            "country": ["DEU", "FRA", None],
+            "date": ["2020", "2021", "2022"],
+            "value": [1.5, None, 3.0],
+            "n": [1, 2, 3],
+            "ok": [True, False, True],
+            "ts": pd.to_datetime(["2020-01-01", "2021-01-01", "2022-01-01"]),
+        }
+    )
+
+
+def test_columnar_round_trip_keeps_types_and_missing(tmp_path):
+    backend = ColumnarCacheBackend(str(tmp_path))
+    backend.write("k", _records(), {"fetch_logs": [{"country": "DEU"}]})
+    assert os.path.exists(tmp_path / "k.meta.json")
+    assert [p.name for p in tmp_path.glob("k.*.npy")] == [json.load(open(tmp_path / "k.meta.json"))["data_file"]]
+
+    df, meta = backend.read("k")
+    assert meta == {"fetch_logs": [{"country": "DEU"}]}
+    assert list(df.columns) == list(_records().columns)
+    assert df["country"][:2].tolist() == ["DEU", "FRA"] and pd.isna(df["country"][2])
+    assert np.isnan(df["value"][1]) and df["value"][2] == 3.0
+    assert df["n"].dtype == np.int64 and df["ok"].dtype == bool
+    assert pd.api.types.is_datetime64_any_dtype(df["ts"])
+
+
+def test_columnar_read_maps_numbers_and_keeps_empty_strings(tmp_path):
+    backend = ColumnarCacheBackend(str(tmp_path))
+    backend.write("k", pd.DataFrame({"note": ["", None, "Zürich"], "value": [1.0, 2.0, 3.0]}), {})
+    df, _ = backend.read("k")
+    assert df["note"][0] == "" and pd.isna(df["note"][1]) and df["note"][2] == "Zürich"
+    # the column is a view of the memory-mapped data file, not a copy
+    values = df["value"].to_numpy()
+    while values.base is not None and not isinstance(values, np.memmap):
+        values = values.base
+    assert isinstance(values, np.memmap)
+    # the mapping is copy-on-write: changing the frame leaves the entry alone
+    df.loc[0, "value"] = 9.0
+    assert backend.read("k")[0]["value"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_columnar_entry_of_unknown_format_is_a_miss(cache_dir):
+    key = "series/wb/X/DEU_2020_2021"
+    io_cache.cache_set(key, {"records": [{"country": "DEU", "value": 1.0}], "fetch_logs": []})
+    sidecar_path = cache_dir / (key + ".meta.json")
+    sidecar = json.loads(sidecar_path.read_text())
+    sidecar["format"] = "npy-v2"
+    sidecar_path.write_text(json.dumps(sidecar))
+
+    with pytest.raises(ValueError):
+        ColumnarCacheBackend(str(cache_dir)).read(key)
+    assert io_cache.cache_get(key) is None
+    assert not sidecar_path.exists()
+
+
+def test_columnar_rewrite_replaces_data_file(tmp_path):
+    backend = ColumnarCacheBackend(str(tmp_path))
+    backend.write("k", _records(), {})
+    backend.write("k", _records().head(1), {})
+    assert len(list(tmp_path.glob("k.*.npy"))) == 1
+    assert len(backend.read("k")[0]) == 1
+    backend.remove("k")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_columnar_empty_frame(tmp_path):
+    backend = ColumnarCacheBackend(str(tmp_path))
+    backend.write("empty", pd.DataFrame(columns=["country", "value"]), {})
+    df, _ = backend.read("empty")
+    assert df.empty and list(df.columns) == ["country", "value"]
+
+
+def test_legacy_json_entry_is_read_and_migrated(cache_dir):
+    key = "series/wb/X/DEU_2020_2021"
+    os.makedirs(cache_dir / "series/wb/X")
+    legacy = {"records": [{"country": "DEU", "date": "2020", "value": 1.0}], "fetch_logs": [{"country": "DEU"}]}
+    (cache_dir / (key + ".json")).write_text(json.dumps(legacy))
+
+    data = io_cache.cache_get(key)
+    assert data["records"] == legacy["records"]
+    assert data["fetch_logs"] == legacy["fetch_logs"]
+
+    io_cache.cache_set(key, data)
+    assert not (cache_dir / (key + ".json")).exists()
+    assert ColumnarCacheBackend(str(cache_dir)).exists(key)
+    assert io_cache.cache_get(key)["records"] == legacy["records"]
+
+
+@pytest.mark.parametrize("backend", ["json", "columnar"])
+def test_series_api_with_each_backend(cache_dir, backend):
+    io_cache.configure_cache(backend=backend)
+    df = pd.DataFrame([{"source": "WB", "indicator": "gdp", "country": "DEU", "date": "2020", "value": 2.0}])
+    logs = [{"indicator": "gdp", "country": "DEU", "fetch_timestamp": "2025-01-01T00:00:00+00:00"}]
+    assert io_cache.cache_set_series("WB", "X", df, logs, ["DEU"], "2020", "2020") == ["DEU"]
+
+    key = io_cache.series_key("WB", "X", "DEU", "2020", "2020")
+    other = JsonCacheBackend if backend == "columnar" else ColumnarCacheBackend
+    assert not other(str(cache_dir)).exists(key)
+
+    out, out_logs, missing = io_cache.cache_get_series("WB", "X", ["DEU"], "2020", "2020")
+    assert missing == [] and out_logs == logs
+    assert out[["country", "value"]].values.tolist() == [["DEU", 2.0]]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        io_cache.configure_cache(backend="parquet")
@@ -0,0 +1,114 @@
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from src.io import cache as io_cache
+from src.io.cache_backends import JsonCacheBackend
+from src.io.cache_index import CacheIndex, parse_key
+
+
+@pytest.fixture(autouse=True)
+def _file_tier_only(cache_dir):
+    # exercise the file tier and its catalogue only
+    io_cache.configure_cache(memory_max_mb=0)
+
+
+def _store(country, value=1.0, source="WB"):
+    df = pd.DataFrame([{"source": source, "indicator": "gdp", "country": country, "date": "2020", "value": value}])
+    logs = [{"indicator": "gdp", "country": country, "fetch_timestamp": "2025-01-01T00:00:00+00:00"}]
+    io_cache.cache_set_series(source, "X", df, logs, [country], "2020", "2020")
+    return io_cache.series_key(source, "X", country, "2020", "2020")
+
+
+def test_parse_key():
+    assert parse_key("series/wb/NY.GDP/DEU_2015-01-01_2024-12-31") == {
+        "source": "WB",
+        "code": "NY.GDP",
+        "country": "DEU",
+        "period_start": "2015-01-01",
+        "period_end": "2024-12-31",
+    }
+    assert parse_key("abc123")["source"] is None
+
+
+def test_writes_and_hits_are_catalogued(cache_dir):
+    key = _store("DEU")
+    index = CacheIndex(str(cache_dir))
+    row = index.lookup(key)
+    assert row["backend"] == "columnar" and row["country"] == "DEU" and row["indicator"] == "gdp"
+    assert row["bytes"] > 0 and row["hits"] == 0
+
+    io_cache.cache_get_series("WB", "X", ["DEU"], "2020", "2020")
+    io_cache.cache_get_series("WB", "X", ["DEU"], "2020", "2020")
+    assert index.lookup(key)["hits"] == 2
+    assert io_cache.cache_stats()["by_source"]["WB"]["entries"] == 1
+
+
+def test_series_keys_are_looked_up_in_bulk(cache_dir, monkeypatch):
+    keys = [_store(c) for c in ("DEU", "FRA")]
+    index = CacheIndex(str(cache_dir))
+    assert set(index.lookup_many(keys + ["series/wb/X/ITA_2020_2020"])) == set(keys)
+
+    calls = []
+    real = CacheIndex.lookup
+    monkeypatch.setattr(CacheIndex, "lookup", lambda self, key: calls.append(key) or real(self, key))
+    df, _, missing = io_cache.cache_get_series("WB", "X", ["DEU", "FRA"], "2020", "2020")
+    assert sorted(df["country"]) == ["DEU", "FRA"] and missing == [] and calls == []
+    # hits are buffered and written back before the catalogue is read as a whole
+    assert index._run("SELECT SUM(hits) AS n FROM entries")[0]["n"] == 0
+    assert sum(row["hits"] for row in index.entries()) == 2
+
+
+def test_ttl_uses_catalogue_and_sweep_drops_entry(cache_dir):
+    key = _store("DEU")
+    index = CacheIndex(str(cache_dir))
+    index._run("UPDATE entries SET created_at = ? WHERE key = ?", (time.time() - 48 * 3600, key))
+    assert io_cache.cache_get_frame(key, ttl_hours=24) is None
+    # expired entries stay available for revalidation until swept
+    assert index.lookup(key) is not None
+    assert io_cache.evict_cache(ttl_hours=24)["expired"] == 1
+    assert index.lookup(key) is None
+    assert not os.path.exists(cache_dir / (key + ".meta.json"))
+
+
+def test_lru_eviction_respects_size_cap(cache_dir):
+    keys = [_store(c) for c in ("DEU", "FRA", "ITA")]
+    index = CacheIndex(str(cache_dir))
+    for i, key in enumerate(keys):
+        index._run("UPDATE entries SET accessed_at = ? WHERE key = ?", (1000.0 + i, key))
+    per_entry = index.lookup(keys[0])["bytes"]
+
+    result = io_cache.evict_cache(max_bytes=2 * per_entry)
+    assert result["evicted"] == 1
+    # the least recently used entry (DEU) went first
+    assert index.lookup(keys[0]) is None
+    _, _, missing = io_cache.cache_get_series("WB", "X", ["DEU", "FRA", "ITA"], "2020", "2020")
+    assert missing == ["DEU"]
+
+
+def test_legacy_entries_are_registered(cache_dir):
+    key = "series/wb/X/DEU_2020_2020"
+    os.makedirs(cache_dir / "series/wb/X")
+    JsonCacheBackend(str(cache_dir)).write(key, pd.DataFrame([{"country": "DEU", "value": 1.0}]), {})
+    assert io_cache.rebuild_cache_index() == 1
+    assert CacheIndex(str(cache_dir)).lookup(key)["backend"] == "json"
+    assert io_cache.rebuild_cache_index() == 0
+
+
+def test_cli(cache_dir, capsys):
+    _store("DEU")
+    _store("FRA", source="IMF")
+    assert io_cache.main(["stats"]) == 0
+    stats = json.loads(capsys.readouterr().out)
+    assert stats["entries"] == 2 and set(stats["by_source"]) == {"WB", "IMF"}
+
+    io_cache.main(["ls", "--source", "imf"])
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert len(lines) == 1 and lines[0].startswith("series/imf/X/FRA")
+
+    io_cache.main(["evict", "--all"])
+    assert json.loads(capsys.readouterr().out)["evicted"] == 2
+    assert io_cache.cache_stats()["entries"] == 0
@@ -0,0 +1,108 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+import pytest
+import yaml
+
+from src.io import cache as io_cache
+from src.io.filelock import FileLock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _frame(value):
+    return pd.DataFrame([{"source": "WB", "indicator": "gdp", "country": "DEU", "date": "2020", "value": value}])
+
+
+@pytest.mark.parametrize("backend", ["json", "columnar"])
+def test_interrupted_write_keeps_previous_entry(cache_dir, monkeypatch, backend):
+    io_cache.configure_cache(backend=backend, memory_max_mb=0)
+    try:
+        io_cache.cache_set_frame("k", _frame(1.0), {})
+
+        def _crash(*args, **kwargs):
+            raise KeyboardInterrupt()
+
+        with monkeypatch.context() as m, pytest.raises(KeyboardInterrupt):
+            m.setattr("src.io.cache_backends.json.dump", _crash)
+            io_cache.make_backend(backend, io_cache.CACHE_DIR).write("k", _frame(2.0), {})
+
+        df, _ = io_cache.cache_get_frame("k")
+        assert df["value"].tolist() == [1.0]
+        assert not [f for _, _, files in os.walk(cache_dir) for f in files if f.endswith(".tmp")]
+    finally:
+        io_cache.configure_cache(backend=io_cache.DEFAULT_BACKEND, memory_max_mb=io_cache.DEFAULT_MEMORY_MAX_MB)
+
+
+def test_file_lock_excludes_other_processes(tmp_path):
+    path = str(tmp_path / "x.lock")
+    holder = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys, time; from src.io.filelock import FileLock; "
+            "lock = FileLock(sys.argv[1]); lock.acquire(); print('held', flush=True); time.sleep(1.0); lock.release()",
+            path,
+        ],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert holder.stdout.readline().strip() == "held"
+        assert FileLock(path, timeout=0.1).acquire() is False
+        lock = FileLock(path, timeout=10)
+        assert lock.acquire() is True and lock.waited
+        lock.release()
+    finally:
+        holder.wait()
+
+
+def _run_main(cfg_path, calls_path):
+    from src.fetchers.worldbank import WorldBankFetcher
+    from src.main import main
+
+    def slow_fetch(self, countries, indicators, start, end, freq):
+        with open(calls_path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(list(countries)) + "\n")
+        time.sleep(1.0)
+        ind = indicators[0]["id"]
+        df = pd.DataFrame(
+            [{"source": "WB", "indicator": ind, "country": c, "date": "2020", "value": 1.0} for c in countries]
+        )
+        logs = [{"indicator": ind, "country": c, "fetch_timestamp": "2025-01-01T00:00:00+00:00"} for c in countries]
+        return df, logs
+
+    WorldBankFetcher.fetch = slow_fetch
+    main(["--config", cfg_path])
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses fork")
+def test_concurrent_runs_fetch_each_series_once(cache_dir, tmp_path):
+    calls = tmp_path / "calls.txt"
+    procs = []
+    ctx = multiprocessing.get_context("fork")
+    for i in range(2):
+        cfg = {
+            "countries": ["DEU", "FRA"],
+            "period": {"start": "2020-01-01", "end": "2021-12-31", "frequency": "A"},
+            "indicators": [{"id": "gdp", "sources": [{"source": "WB", "code": "X"}]}],
+            "scoring": {"weights": {"gdp": 1.0}, "min_coverage_ratio": 0.0},
+            "excel": {"path": f"./output/out_{i}.xlsx"},
+            "caching": {"enabled": True, "ttl_hours": 24},
+            "runtime": {"max_workers": 1},
+        }
+        path = tmp_path / f"cfg_{i}.yaml"
+        path.write_text(yaml.safe_dump(cfg))
+        procs.append(ctx.Process(target=_run_main, args=(str(path), str(calls))))
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+    assert [p.exitcode for p in procs] == [0, 0]
+    assert calls.read_text().splitlines() == [json.dumps(["DEU", "FRA"])]
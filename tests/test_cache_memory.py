@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from src.io import cache as io_cache
+from src.io.cache import MemoryTier, memory_tier
+
+
+def _frame(value):
+    return pd.DataFrame([{"source": "WB", "indicator": "gdp", "country": "DEU", "date": "2020", "value": value}])
+
+
+def test_repeated_reads_are_served_from_memory(cache_dir, monkeypatch):
+    io_cache.cache_set_frame("k", _frame(1.0), {"fetch_logs": [{"country": "DEU"}]})
+    df, meta = io_cache.cache_get_frame("k")
+    assert df["value"].tolist() == [1.0]
+
+    def _no_disk(*args, **kwargs):
+        raise AssertionError("file tier was read")
+
+    monkeypatch.setattr(io_cache, "_locate", _no_disk)
+    before = memory_tier.stats()["hits"]
+    df2, meta2 = io_cache.cache_get_frame("k")
+    assert memory_tier.stats()["hits"] == before + 1
+    assert df2["value"].tolist() == [1.0]
+
+    # returned objects are the caller's: mutating them leaves the tier intact
+    df2["value"] = 99.0
+    meta2["fetch_logs"][0]["country"] = "XXX"
+    df3, meta3 = io_cache.cache_get_frame("k")
+    assert df3["value"].tolist() == [1.0] and meta3["fetch_logs"][0]["country"] == "DEU"
+
+
+def test_frames_are_copied_on_hit_without_copy_on_write(cache_dir, monkeypatch):
+    # pandas < 3 without mode.copy_on_write: in-place edits write through views
+    monkeypatch.setattr(io_cache, "_copy_on_write", lambda: False)
+    io_cache.cache_set_frame("k", _frame(1.0), {})
+    io_cache.cache_get_frame("k")
+    df, _ = io_cache.cache_get_frame("k")
+    cached = memory_tier.get("k")[0]
+    assert not np.shares_memory(df["value"].to_numpy(), cached["value"].to_numpy())
+
+
+def test_write_invalidates_memory_entry(cache_dir):
+    io_cache.cache_set_frame("k", _frame(1.0), {})
+    io_cache.cache_get_frame("k")
+    io_cache.cache_set_frame("k", _frame(2.0), {})
+    df, _ = io_cache.cache_get_frame("k")
+    assert df["value"].tolist() == [2.0]
+
+    io_cache.evict_cache(everything=True)
+    assert io_cache.cache_get_frame("k") is None
+
+
+def test_memory_tier_byte_budget_is_lru():
+    df = _frame(1.0)
+    size = MemoryTier._size(df, {})
+    tier = MemoryTier(max_bytes=2 * size)
+    tier.put("a", df, {}, 0.0)
+    tier.put("b", df, {}, 0.0)
+    tier.get("a")
+    tier.put("c", df, {}, 0.0)
+    assert tier.get("b") is None
+    assert tier.get("a") is not None and tier.get("c") is not None
+    assert tier.stats()["bytes"] == 2 * size
+
+    tier.resize(0)
+    assert tier.stats()["entries"] == 0
+    tier.put("a", df, {}, 0.0)
+    assert tier.get("a") is None
+
+
+def test_memory_tier_size_is_estimated_from_shape_and_dtypes():
+    df = pd.DataFrame({"country": ["DEU", "FRA"], "value": [1.0, 2.0]})
+    # two rows of index + float64 + one boxed cell, plus one log slot
+    assert MemoryTier._size(df, {}) == 2 * (8 + 8 + 64) + 1024
+    assert MemoryTier._size(df, {"fetch_logs": [{}, {}]}) == MemoryTier._size(df, {}) + 2 * 1024
@@ -0,0 +1,97 @@
+import time
+
+import pandas as pd
+import yaml
+
+from src.io import cache as io_cache
+from src.io.cache_index import CacheIndex
+
+
+def _age(cache_dir, hours):
+    index = CacheIndex(str(cache_dir))
+    index._run("UPDATE entries SET created_at = ?", (time.time() - hours * 3600,))
+    io_cache.memory_tier.invalidate()
+
+
+def _store(countries):
+    df = pd.DataFrame(
+        [{"source": "WB", "indicator": "gdp", "country": c, "date": "2020", "value": 1.0} for c in countries]
+    )
+    logs = [{"indicator": "gdp", "country": c, "fetch_timestamp": "2025-01-01T00:00:00+00:00"} for c in countries]
+    io_cache.cache_set_series("WB", "X", df, logs, countries, "2020", "2020")
+
+
+def test_expired_entries_are_served_stale_within_limit(cache_dir):
+    _store(["DEU", "FRA"])
+    _age(cache_dir, 30)
+
+    df, logs, missing, stale = io_cache.cache_lookup_series(
+        "WB", "X", ["DEU", "FRA"], "2020", "2020", ttl_hours=24, serve_stale=True, max_stale_hours=48
+    )
+    assert missing == [] and stale == ["DEU", "FRA"] and len(df) == 2
+    assert all(f["stale"] and f["cache_age_hours"] >= 30 for f in logs)
+
+    # beyond the hard limit the entry is refetched (and removed)
+    _, _, missing, stale = io_cache.cache_lookup_series(
+        "WB", "X", ["DEU"], "2020", "2020", ttl_hours=24, serve_stale=True, max_stale_hours=12
+    )
+    assert missing == ["DEU"] and stale == []
+    # without stale serving, expired entries are misses
+    _, _, missing = io_cache.cache_get_series("WB", "X", ["FRA"], "2020", "2020", ttl_hours=24)
+    assert missing == ["FRA"]
+
+
+def test_refresher_deduplicates_pending_jobs():
+    refresher = io_cache.BackgroundRefresher(max_workers=1)
+    calls = []
+
+    def job():
+        time.sleep(0.2)
+        calls.append(1)
+
+    assert refresher.submit("k", job) is True
+    assert refresher.submit("k", job) is False
+    assert refresher.wait(5)
+    assert calls == [1]
+    assert refresher.submit("k", job) is True
+    assert refresher.wait(5)
+
+
+def test_main_serves_stale_and_refreshes_in_background(cache_dir, tmp_path, monkeypatch):
+    from src.fetchers.worldbank import WorldBankFetcher
+    from src.main import main
+
+    calls = []
+
+    def fake_fetch(self, countries, indicators, start, end, freq):
+        calls.append(list(countries))
+        ind = indicators[0]["id"]
+        df = pd.DataFrame(
+            [{"source": "WB", "indicator": ind, "country": c, "date": "2020", "value": 1.0} for c in countries]
+        )
+        return df, [{"indicator": ind, "country": c, "fetch_timestamp": "2025-01-01T00:00:00+00:00"} for c in countries]
+
+    monkeypatch.setattr(WorldBankFetcher, "fetch", fake_fetch)
+    cfg = {
+        "countries": ["DEU", "FRA"],
+        "period": {"start": "2020-01-01", "end": "2021-12-31", "frequency": "A"},
+        "indicators": [{"id": "gdp", "sources": [{"source": "WB", "code": "X"}]}],
+        "scoring": {"weights": {"gdp": 1.0}, "min_coverage_ratio": 0.0},
+        "excel": {"path": "./output/out.xlsx"},
+        "caching": {"enabled": True, "ttl_hours": 24, "stale_while_revalidate": True},
+        "runtime": {"max_workers": 1},
+    }
+    path = tmp_path / "cfg.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+
+    main(["--config", str(path)])
+    assert calls == [["DEU", "FRA"]]
+    io_cache.background_refresher.wait(10)
+
+    _age(cache_dir, 30)
+    main(["--config", str(path)])
+    assert io_cache.background_refresher.wait(10)
+    # the run itself used the stale entries; the refetch happened in the background
+    assert calls == [["DEU", "FRA"], ["DEU", "FRA"]]
+    _, _, missing = io_cache.cache_get_series("WB", "X", ["DEU", "FRA"], "2020-01-01", "2021-12-31", ttl_hours=24)
+    assert missing == []
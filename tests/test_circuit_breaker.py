@@ -0,0 +1,145 @@
+import glob
+import json
+import time
+
+import pytest
+import yaml
+
+from src.fetchers.breaker import CircuitBreaker, CircuitOpenError, reset_circuit_breakers
+from src.fetchers.worldbank import WorldBankFetcher
+from src.io import cache as io_cache
+
+# nothing listens on the discard port: connections are refused at once
+DOWN = "http://127.0.0.1:9"
+
+
+class _Resp:
+    def __init__(self, status):
+        self.status_code = status
+
+
+def _request(breaker, status=None, exc=None):
+    with breaker.call() as c:
+        if exc is not None:
+            raise exc
+        c.observe(_Resp(status))
+
+
+def test_breaker_opens_half_opens_and_closes():
+    now = [0.0]
+    b = CircuitBreaker("WB", failure_threshold=3, reset_timeout_sec=30, clock=lambda: now[0])
+    _request(b, 503)
+    _request(b, 200)  # a success resets the count
+    for _ in range(2):
+        _request(b, 500)
+    with pytest.raises(ConnectionError):
+        _request(b, exc=ConnectionError("refused"))
+    assert b.state == "open"
+    with pytest.raises(CircuitOpenError):
+        _request(b, 200)
+
+    now[0] = 31.0
+    _request(b, 429)  # the trial fails
+    assert b.state == "open"
+    now[0] = 62.0
+    assert b.allow() and not b.allow()  # one trial at a time
+    b.record_success()
+    assert b.state == "closed"
+    assert [(t["from"], t["to"]) for t in b.stats()["transitions"]] == [
+        ("closed", "open"),
+        ("open", "half_open"),
+        ("half_open", "open"),
+        ("open", "half_open"),
+        ("half_open", "closed"),
+    ]
+    assert b.stats()["rejected"] == 2
+
+
+def test_client_errors_do_not_trip_the_breaker():
+    b = CircuitBreaker("WB", failure_threshold=1)
+    _request(b, 404)
+    assert b.state == "closed"
+
+
+def test_open_breaker_fails_fast_without_retries():
+    runtime = {"wb_base_url": DOWN, "wb_batch_size": 1, "retry_max": 3, "breaker_failure_threshold": 1}
+    breakers = reset_circuit_breakers(runtime)
+    try:
+        t0 = time.perf_counter()
+        df, logs = WorldBankFetcher(runtime).fetch(["DEU", "FRA", "ITA", "ESP"], [{"id": "gdp", "code": "X"}], "2020", "2020", "A")
+        # without the breaker each country would back off 2 + 4 seconds
+        assert time.perf_counter() - t0 < 1.5
+    finally:
+        reset_circuit_breakers()
+    assert df.empty and len(logs) == 4 and all(f["error"] for f in logs)
+    assert sum("circuit breaker is open" in f["error"] for f in logs) == 3
+    stats = breakers.stats()["WB"]
+    assert stats["state"] == "open" and stats["rejected"] == 3
+
+
+def _wb_up(req):
+    countries = req.path.split("/country/")[1].split("/")[0].split(";")
+    recs = [{"countryiso3code": c, "date": "2020", "value": 1.5} for c in countries]
+    return 200, [{"page": 1, "pages": 1, "per_page": 1000, "total": len(recs)}, recs]
+
+
+def test_run_falls_back_to_stale_cache_while_provider_is_down(local_server, tmp_path, monkeypatch):
+    from src.main import main
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("src.indicators.wb_indicator.WorldBankFetcher", WorldBankFetcher)
+    io_cache.memory_tier.invalidate()
+    srv = local_server(_wb_up)
+    cfg = {
+        "countries": ["DEU", "FRA"],
+        "period": {"start": "2020-01-01", "end": "2020-12-31", "frequency": "A"},
+        "indicators": [{"id": "gdp", "sources": [{"source": "WB", "code": "X"}]}],
+        "scoring": {"weights": {"gdp": 1.0}, "min_coverage_ratio": 0.0},
+        "excel": {"path": "./output/out.xlsx"},
+        "caching": {"enabled": True, "ttl_hours": 24},
+        "runtime": {"max_workers": 1, "wb_base_url": srv.url},
+    }
+    path = tmp_path / "cfg.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+    main(["--config", str(path)])
+    srv.close()
+
+    # every entry is expired now, and the provider is gone
+    cfg["caching"]["ttl_hours"] = 0
+    cfg["runtime"].update({"wb_base_url": DOWN, "breaker_failure_threshold": 1})
+    path.write_text(yaml.safe_dump(cfg))
+    main(["--config", str(path)])
+    manifest = json.loads(open(sorted(glob.glob("data/_artifacts/manifest_*.json"))[-1]).read())
+    wb = manifest["circuit_breakers"]["WB"]
+    assert wb["state"] == "open" and wb["transitions"][0]["to"] == "open"
+    fallback = [f for f in manifest["fetches"] if f.get("stale_fallback")]
+    assert sorted(f["country"] for f in fallback) == ["DEU", "FRA"]
+    assert all(f["stale"] for f in fallback)
+
+
+def test_only_transport_errors_and_overload_trip_the_breaker():
+    import asyncio
+
+    import requests
+
+    from src.fetchers.deadline import DeadlineExceeded
+
+    b = CircuitBreaker("WB", failure_threshold=1)
+    for exc in (ValueError("bad payload"), DeadlineExceeded("late"), asyncio.CancelledError()):
+        with pytest.raises(type(exc)):
+            _request(b, exc=exc)
+    assert b.state == "closed" and b.failures == 0
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        _request(b, exc=requests.exceptions.ReadTimeout("slow"))
+    assert b.state == "open"
+
+
+def test_half_open_trial_ending_in_other_error_frees_the_slot():
+    now = [0.0]
+    b = CircuitBreaker("WB", failure_threshold=1, reset_timeout_sec=10, clock=lambda: now[0])
+    with pytest.raises(ConnectionError):
+        _request(b, exc=ConnectionError("refused"))
+    now[0] = 11.0
+    with pytest.raises(ValueError):
+        _request(b, exc=ValueError("bad payload"))
+    assert b.state == "half_open" and b.allow()
@@ -0,0 +1,90 @@
+import glob
+import json
+import threading
+import time
+
+import pandas as pd
+import pytest
+import yaml
+
+from src.fetchers.coalesce import RequestCoalescer
+
+
+def test_concurrent_identical_requests_share_one_call():
+    coalescer = RequestCoalescer()
+    calls = []
+
+    def fetch(x):
+        calls.append(x)
+        time.sleep(0.2)
+        return x * 2
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(coalescer.run("k", fetch, 21))) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [21] and results == [42, 42, 42]
+    assert coalescer.stats() == {"requests": 1, "coalesced": 2}
+
+
+def test_failed_requests_are_retried():
+    coalescer = RequestCoalescer()
+
+    def boom():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        coalescer.run("k", boom)
+    assert coalescer.run("k", lambda: "ok") == "ok"
+
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_indicators_sharing_a_series_fetch_it_once(tmp_path, monkeypatch, engine):
+    from src.fetchers.base import AbstractFetcher
+    from src.fetchers.worldbank import WorldBankFetcher
+    from src.main import main
+
+    monkeypatch.chdir(tmp_path)
+    calls = []
+
+    def fake_fetch(self, countries, indicators, start, end, freq):
+        calls.append(indicators[0]["id"])
+        time.sleep(0.2)
+        ind = indicators[0]["id"]
+        df = pd.DataFrame(
+            [{"source": "WB", "indicator": ind, "country": c, "date": "2020", "value": 1.0} for c in countries]
+        )
+        return df, [{"indicator": ind, "country": c, "fetch_timestamp": "2025-01-01T00:00:00+00:00"} for c in countries]
+
+    monkeypatch.setattr(WorldBankFetcher, "fetch", fake_fetch)
+    # the base afetch runs `fetch` in the engine's executor
+    monkeypatch.setattr(WorldBankFetcher, "afetch", AbstractFetcher.afetch)
+    monkeypatch.setattr("src.indicators.wb_indicator.WorldBankFetcher", WorldBankFetcher)
+    cfg = {
+        "countries": ["DEU", "FRA"],
+        "period": {"start": "2020-01-01", "end": "2020-12-31", "frequency": "A"},
+        "indicators": [
+            {"id": "gdp", "sources": [{"source": "WB", "code": "X"}]},
+            {"id": "gdp_alt", "sources": [{"source": "WB", "code": "X"}]},
+        ],
+        "scoring": {"weights": {"gdp": 0.5, "gdp_alt": 0.5}, "min_coverage_ratio": 0.0},
+        "excel": {"path": "./output/out.xlsx"},
+        "caching": {"enabled": False},
+        "runtime": {"max_workers": 2, "fetch_engine": engine},
+    }
+    path = tmp_path / "cfg.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+    main(["--config", str(path)])
+
+    assert len(calls) == 1
+    manifest = json.loads(open(glob.glob("data/_artifacts/manifest_*.json")[0], encoding="utf-8").read())
+    assert manifest["coalesced_requests"] == {"requests": 1, "coalesced": 1}
+    by_ind = {}
+    for f in manifest["fetches"]:
+        by_ind.setdefault(f["indicator"], []).append(f)
+    assert sorted(by_ind) == ["gdp", "gdp_alt"]
+    follower = "gdp_alt" if calls == ["gdp"] else "gdp"
+    assert all(f["coalesced_from"] == calls[0] for f in by_ind[follower])
+    assert manifest["fetch_summary"] == {"WB": 4}
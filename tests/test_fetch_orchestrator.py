@@ -0,0 +1,151 @@
+import pandas as pd
+import pytest
+
+from src.fetchers.breaker import CircuitBreakers
+from src.fetchers.deadline import DEADLINE_ERROR, RunDeadline
+from src.fetchers.orchestrator import (
+    FetchJob,
+    FetchOrchestrator,
+    FetchSettings,
+    deadline_failures,
+    fanned_out,
+)
+from src.io import cache as io_cache
+
+
+class _Plugin:
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+
+    def fetch(self, countries, start, end, freq, validators=None):
+        self.calls.append(list(countries))
+        rows = [
+            {"source": "WB", "indicator": "gdp", "country": c, "date": "2020", "value": 1.0}
+            for c in countries
+            if c not in self.fail
+        ]
+        logs = [
+            {"indicator": "gdp", "country": c, "fetch_timestamp": "2025-01-01T00:00:00+00:00"}
+            | ({"error": "HTTP 500"} if c in self.fail else {})
+            for c in countries
+        ]
+        return pd.DataFrame(rows), logs
+
+    async def afetch(self, countries, start, end, freq, limits=None, validators=None):
+        return self.fetch(countries, start, end, freq, validators)
+
+
+def _orchestrator(tmp_path, monkeypatch, caching=True, deadline=None):
+    monkeypatch.chdir(tmp_path)
+    io_cache.memory_tier.invalidate()
+    settings = FetchSettings("2020-01-01", "2020-12-31", "A", caching=caching)
+    return FetchOrchestrator(settings, CircuitBreakers(), RunDeadline(deadline))
+
+
+def test_fetched_series_are_cached_per_country(tmp_path, monkeypatch):
+    orch = _orchestrator(tmp_path, monkeypatch)
+    plugin = _Plugin(fail=["ITA"])
+    job = FetchJob(plugin, ["DEU", "FRA", "ITA"], "gdp", "WB", "X")
+    src, ind_id, df, logs = orch.fetch(job)
+    assert (src, ind_id) == ("WB", "gdp") and sorted(df["country"]) == ["DEU", "FRA"]
+    # the failed country is not cached and is fetched again
+    cached_df, _, todo, stale = orch.lookup(job)
+    assert sorted(cached_df["country"]) == ["DEU", "FRA"] and todo == ["ITA"] and not stale
+
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_run_shares_identical_requests(tmp_path, monkeypatch, engine):
+    orch = _orchestrator(tmp_path, monkeypatch, caching=False)
+    plugin = _Plugin()
+    jobs = [FetchJob(plugin, ["DEU"], ind, "WB", "X") for ind in ("gdp", "gdp_alias")]
+    completed, unfinished = orch.run(jobs, engine)
+    assert plugin.calls == [["DEU"]] and not unfinished
+    results, missing = orch.collect(completed, unfinished)
+    assert [r[1] for r in results] == ["gdp", "gdp_alias"] and missing == []
+    assert set(results[1][2]["indicator"]) == {"gdp_alias"}
+    assert results[1][3][0]["coalesced_from"] == "gdp"
+
+
+def test_unfinished_jobs_are_reported_missing(tmp_path, monkeypatch):
+    orch = _orchestrator(tmp_path, monkeypatch, caching=False)
+    job = FetchJob(_Plugin(), ["DEU", "FRA"], "gdp", "WB", "X")
+    _, missing = orch.collect([], [job])
+    assert missing == [
+        {"indicator": "gdp", "source": "WB", "code": "X", "countries": ["DEU", "FRA"], "stale_fallback": []}
+    ]
+
+
+def test_result_helpers():
+    logs = [{"country": "DEU", "error": f"{DEADLINE_ERROR} (1s)"}, {"country": "FRA"}]
+    assert deadline_failures(["DEU", "FRA"], logs) == ["DEU"]
+    assert deadline_failures(["DEU", "FRA"], [{"error": DEADLINE_ERROR}]) == ["DEU", "FRA"]
+    df = pd.DataFrame([{"indicator": "a", "country": "DEU", "value": 1.0}])
+    out = fanned_out(("WB", "a", df, [{"indicator": "a"}]), "b")
+    assert list(out[2]["indicator"]) == ["b"] and list(df["indicator"]) == ["a"]
+    assert out[3] == [{"indicator": "b", "coalesced_from": "a"}]
+
+
+class _SdmxPlugin(_Plugin):
+    """Answers with the dataflow it was configured for."""
+
+    def __init__(self, options):
+        super().__init__()
+        self.options = options
+
+    def fetch(self, countries, start, end, freq, validators=None):
+        self.calls.append(list(countries))
+        flow = self.options["resource"]
+        rows = [{"source": "OECD", "indicator": flow, "country": c, "date": "2020", "value": flow} for c in countries]
+        return pd.DataFrame(rows), [{"indicator": flow, "country": c} for c in countries]
+
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_same_code_from_other_dataflows_stays_apart(tmp_path, monkeypatch, engine):
+    from src.io.cache import series_key
+
+    orch = _orchestrator(tmp_path, monkeypatch)
+    plugins = [_SdmxPlugin({"resource": flow}) for flow in ("MEI", "QNA")]
+    jobs = [FetchJob(p, ["DEU"], p.options["resource"], "OECD", "CPI", p.options) for p in plugins]
+    completed, _ = orch.run(jobs, engine)
+    assert [p.calls for p in plugins] == [[["DEU"]], [["DEU"]]]
+    assert [list(res[2]["value"]) for _, res in completed] == [["MEI"], ["QNA"]]
+    for job in jobs:
+        cached_df, _, todo, _ = orch.lookup(job)
+        assert list(cached_df["value"]) == [job.options["resource"]] and todo == []
+    # series without options keep their key
+    assert series_key("WB", "X", "DEU", "a", "b") == "series/wb/X/DEU_a_b"
+    assert series_key("OECD", "CPI", "DEU", "a", "b", {"resource": "MEI"}).startswith("series/oecd/CPI~")
+
+
+class _Broken(_Plugin):
+    def fetch(self, countries, start, end, freq, validators=None):
+        raise ValueError("bad payload")
+
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_failed_jobs_leave_an_error_entry_per_country(tmp_path, monkeypatch, caplog, engine):
+    orch = _orchestrator(tmp_path, monkeypatch, caching=False)
+    jobs = [FetchJob(_Broken(), ["DEU", "FRA"], "gdp", "WB", "X"), FetchJob(_Plugin(), ["ITA"], "cpi", "WB", "Y")]
+    if engine == "async":
+        # an error escaping the job's own handling (e.g. a cancelled task)
+        factory = orch.afetch_job
+
+        def afetch_job(job):
+            if job.indicator == "cpi":
+                return factory(job)
+
+            async def _raise(limits):
+                raise RuntimeError("task died")
+
+            return _raise
+
+        monkeypatch.setattr(orch, "afetch_job", afetch_job)
+    with caplog.at_level("WARNING"):
+        completed, unfinished = orch.run(jobs, engine)
+    results, _ = orch.collect(completed, unfinished)
+    logs = {r[1]: r[3] for r in results}
+    error = "RuntimeError: task died" if engine == "async" else "ValueError: bad payload"
+    assert [(f["country"], f["error"]) for f in logs["gdp"]] == [("DEU", error), ("FRA", error)]
+    assert [f["country"] for f in logs["cpi"]] == ["ITA"] and "error" not in logs["cpi"][0]
+    assert "Fetch task failed for WB:X (gdp)" in caplog.text
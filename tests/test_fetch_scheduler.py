@@ -0,0 +1,70 @@
+import glob
+import json
+
+import pandas as pd
+import pytest
+import yaml
+
+from src.fetchers.scheduler import available_indicators, prioritize
+
+
+def test_weight_then_coverage_then_tail():
+    indicators = ["a", "b", "c", "d", "e"]
+    weights = {"a": 0.5, "b": 0.3, "c": 0.1, "d": 0.1}
+    both = ["DEU", "FRA"]
+    jobs = [
+        ("p", both, "e", "WB", "E"),
+        ("p", both, "d", "WB", "D"),
+        ("p", ["FRA"], "c", "WB", "C"),  # DEU is cached
+        ("p", both, "b", "WB", "B"),
+        ("p", both, "a", "WB", "A"),
+        ("p", both, "a", "IMF", "A2"),
+    ]
+    have = available_indicators([("c", ["DEU"])])
+    ordered, schedule = prioritize(jobs, weights, indicators, 0.6, have)
+    assert [(j[2], j[3]) for j in ordered] == [("a", "WB"), ("b", "WB"), ("c", "WB"), ("d", "WB"), ("e", "WB"), ("a", "IMF")]
+    assert [s["tier"] for s in schedule] == ["weight", "weight", "coverage", "tail", "tail", "tail"]
+    # after a and b, only FRA is short of 3 of 5 indicators
+    assert schedule[2]["coverage_gain"] == 1 and schedule[3]["coverage_gain"] == 0
+
+
+@pytest.mark.parametrize("fetch_order", ["priority", "config"])
+def test_fetches_are_submitted_by_priority(tmp_path, monkeypatch, fetch_order):
+    from src.fetchers.base import AbstractFetcher
+    from src.fetchers.worldbank import WorldBankFetcher
+    from src.main import main
+
+    monkeypatch.chdir(tmp_path)
+    calls = []
+
+    def fake_fetch(self, countries, indicators, start, end, freq):
+        ind = indicators[0]["id"]
+        calls.append(ind)
+        df = pd.DataFrame([{"source": "WB", "indicator": ind, "country": c, "date": "2020", "value": 1.0} for c in countries])
+        return df, [{"indicator": ind, "country": c, "fetch_timestamp": "2025-01-01T00:00:00+00:00"} for c in countries]
+
+    monkeypatch.setattr(WorldBankFetcher, "fetch", fake_fetch)
+    monkeypatch.setattr(WorldBankFetcher, "afetch", AbstractFetcher.afetch)
+    monkeypatch.setattr("src.indicators.wb_indicator.WorldBankFetcher", WorldBankFetcher)
+    cfg = {
+        "countries": ["DEU", "FRA"],
+        "period": {"start": "2020-01-01", "end": "2020-12-31", "frequency": "A"},
+        "indicators": [{"id": i, "sources": [{"source": "WB", "code": i.upper()}]} for i in ("low", "mid", "top")],
+        "scoring": {"weights": {"low": 0.1, "mid": 0.4, "top": 0.5}, "min_coverage_ratio": 0.0},
+        "excel": {"path": "./output/out.xlsx"},
+        "caching": {"enabled": False},
+        "runtime": {"max_workers": 1, "fetch_order": fetch_order},
+    }
+    path = tmp_path / "cfg.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+    main(["--config", str(path)])
+    manifest = json.loads(open(sorted(glob.glob("data/_artifacts/manifest_*.json"))[-1]).read())
+    if fetch_order == "priority":
+        assert calls == ["top", "mid", "low"]
+        assert [(s["indicator"], s["tier"]) for s in manifest["fetch_schedule"]] == [
+            ("top", "weight"),
+            ("mid", "weight"),
+            ("low", "tail"),
+        ]
+    else:
+        assert calls == ["low", "mid", "top"] and manifest["fetch_schedule"] == []
@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
-from src.processing.harmonize import harmonize_indicator, harmonize_df
+import pytest
+
+from src.processing.harmonize import _harmonize_groups, harmonize_indicator, harmonize_df, parse_dates
 
 
 def test_annual_to_quarter_padding():
@@ -37,3 +40,99 @@ def test_harmonize_df_integration():
     out_df, rep_df = harmonize_df(df, target_freq='Q', aggregation='mean')
     assert 'indicator' in out_df.columns and 'country' in out_df.columns
     assert not rep_df.empty
+
+
+def _mixed_frame():
+    rng = np.random.default_rng(7)
+    series = [
+        pd.date_range('2015', periods=6, freq='YS'),  # WB-style annual
+        pd.date_range('2015', periods=4, freq='YE'),
+        pd.date_range('2018-02', periods=14, freq='MS'),
+        pd.date_range('2018', periods=9, freq='ME'),
+        pd.date_range('2019', periods=5, freq='QS'),
+        pd.DatetimeIndex(['2016-01-01', '2019-01-01']),
+        pd.DatetimeIndex(['2016-06-15', '2017-06-15', '2019-06-15', '2020-06-15']),  # gap year
+        pd.date_range('2020-01-05', periods=8, freq='7D'),
+        pd.DatetimeIndex(['2020-01-31', '2020-01-31', '2020-02-29']),  # duplicate date
+        pd.DatetimeIndex(['2020-03-31 12:00', '2020-04-30 12:00', '2020-05-31 12:00']),
+    ]
+    frames = []
+    for i, dates in enumerate(series):
+        values = rng.normal(size=len(dates))
+        values[::4] = np.nan
+        frames.append(pd.DataFrame({'indicator': f'i{i % 3}', 'country': f'C{i}', 'date': dates, 'value': values}))
+    return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=3).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('target_freq', ['Q', 'A'])
+@pytest.mark.parametrize('aggregation', ['mean', 'median', 'last'])
+def test_vectorized_harmonize_df_matches_per_group(target_freq, aggregation):
+    df = _mixed_frame()
+    out_df, rep_df = harmonize_df(df, target_freq=target_freq, aggregation=aggregation)
+    ref_df, ref_rep = _harmonize_groups(df, target_freq=target_freq, aggregation=aggregation)
+    pd.testing.assert_frame_equal(out_df, ref_df, check_exact=True)
+    pd.testing.assert_frame_equal(rep_df, ref_rep, check_exact=True)
+    assert set(rep_df['source_freq']) == {'A', 'Q', 'M'}
+
+
+def test_fetcher_freq_tags_are_trusted():
+    from src.fetchers._utils import tag_freq
+
+    raw = pd.DataFrame({'indicator': 'gdp', 'country': ['DEU', 'DEU', 'FRA', 'FRA'], 'date': ['2019', '2020', '2020Q1', '2020Q2'], 'value': [1.0, 2.0, 3.0, 4.0]})
+    tagged = tag_freq(raw.copy())
+    assert tagged['freq'].tolist() == ['A', 'A', 'Q', 'Q']
+    tagged['date'] = pd.to_datetime(pd.Series(['2019-01-01', '2020-01-01', '2020-01-01', '2020-04-01']))
+    _, rep_df = harmonize_df(tagged, target_freq='Q')
+    # two annual points are too short for pd.infer_freq; the tag settles it
+    assert rep_df.set_index('country')['source_freq'].to_dict() == {'DEU': 'A', 'FRA': 'Q'}
+    assert rep_df.set_index('country')['n_out'].to_dict() == {'DEU': 5, 'FRA': 2}
+    _, untagged = harmonize_df(tagged.drop(columns='freq'), target_freq='Q')
+    assert untagged.set_index('country')['source_freq']['DEU'] != 'A'
+
+
+def test_untagged_inference_is_cached_by_dates():
+    from src.processing.harmonize import _infer_freq_of
+
+    dates = pd.date_range('2001-03-15', periods=5, freq='100D')
+    df = pd.DataFrame({'indicator': 'i', 'country': ['A'] * 5 + ['B'] * 5, 'date': list(dates) * 2, 'value': range(10)})
+    _infer_freq_of.cache_clear()
+    harmonize_df(df, target_freq='Q')
+    assert _infer_freq_of.cache_info().misses == 1 and _infer_freq_of.cache_info().hits == 1
+
+
+def test_harmonize_countries_resolves_each_code_once(monkeypatch):
+    import pycountry
+
+    from src.processing import harmonize as hz
+
+    calls = []
+    real_lookup = pycountry.countries.lookup
+
+    def counting_lookup(code):
+        calls.append(code)
+        return real_lookup(code)
+
+    hz.iso3_table()  # built once per process
+    hz._resolve_unknown.cache_clear()
+    monkeypatch.setattr(pycountry.countries, "lookup", counting_lookup)
+    df = pd.DataFrame({'country': ['de', 'DEU', 'Germany', ' fr ', None, 'XK', 'Atlantis', 'EMU'] * 500, 'value': 1.0})
+    out = hz.harmonize_countries(df)
+    assert out['country'][:8].tolist()[:4] == ['DEU', 'DEU', 'DEU', 'FRA'] and pd.isna(out['country'][4])
+    assert out['country'][5:8].tolist() == ['XK', 'ATLANTIS', 'EMU']
+    # table hits need no pycountry call; unknown codes are looked up once
+    assert sorted(calls) == ['ATLANTIS', 'XK']
+
+
+def test_parse_dates_reads_every_provider_period_format():
+    # WB years and months, SDMX quarters and months, full dates: one column
+    raw = ['2019', '2020Q2', '2020-Q3', '2020M03', '2020-11', '2021-06-30', None, 'n/a', pd.Period('2019Q4')]
+    out = parse_dates(pd.DataFrame({'date': pd.Series(raw * 3, dtype=object), 'value': 1.0}))
+    assert out['date'].dtype.kind == 'M'
+    assert out['date'][:9].tolist()[:6] == [
+        pd.Timestamp('2019-01-01'), pd.Timestamp('2020-04-01'), pd.Timestamp('2020-07-01'),
+        pd.Timestamp('2020-03-01'), pd.Timestamp('2020-11-01'), pd.Timestamp('2021-06-30'),
+    ]
+    assert out['date'][6:8].isna().all() and out['date'][8] == pd.Timestamp('2019-10-01')
+    # agrees with pd.to_datetime on the formats it understands
+    for value in ('2019', '2020Q2', '2020-11', '2021-06-30'):
+        assert out['date'][raw.index(value)] == pd.to_datetime(value)
@@ -0,0 +1,102 @@
+import glob
+
+import pytest
+import requests
+
+from src.fetchers.replay import ReplayMiss, request_key
+from src.fetchers.session import reset_session_pool
+from src.fetchers.worldbank import WorldBankFetcher
+
+
+def _paged(req):
+    """WB-style API answering one record per page, so two countries take two pages."""
+    if req.headers.get("If-None-Match") == '"v1"':
+        return 304, b"", {"ETag": '"v1"'}
+    page = int(req.query.get("page", "1"))
+    countries = req.path.split("/country/")[1].split("/")[0].split(";")
+    recs = [{"countryiso3code": countries[page - 1], "date": "2020", "value": float(page)}]
+    meta = {"page": page, "pages": len(countries), "per_page": 1, "total": len(countries)}
+    return 200, [meta, recs], {"ETag": '"v1"'}
+
+
+@pytest.fixture
+def server(local_server):
+    return local_server(_paged)
+
+
+@pytest.fixture(autouse=True)
+def live_pool_after():
+    yield
+    reset_session_pool()
+
+
+def _runtime(base, store, mode):
+    return {"wb_base_url": base, "http_mode": mode, "http_cassette_dir": str(store), "retry_max": 1}
+
+
+def _fetch(runtime):
+    return WorldBankFetcher(runtime).fetch(["DEU", "FRA"], [{"id": "gdp", "code": "X"}], "2020", "2020", "A")
+
+
+def test_record_then_replay_offline(server, tmp_path):
+    base = server.url
+    store = tmp_path / "http"
+    pool = reset_session_pool(_runtime(base, store, "record"))
+    df, logs = _fetch(_runtime(base, store, "record"))
+    assert len(server.requests) == 2 and pool.stats()["replay"]["recorded"] == 2
+    assert len(glob.glob(str(store / "requests" / "*.json"))) == 2
+    assert len(glob.glob(str(store / "bodies" / "*.gz"))) == 2
+
+    server.close()
+    pool = reset_session_pool(_runtime(base, store, "replay"))
+    df2, logs2 = _fetch(_runtime(base, store, "replay"))
+    assert df2.equals(df)
+    keep = ("request_url", "rows", "etag", "sha256_raw", "sha256_normalized")
+    assert [{k: f[k] for k in keep} for f in logs2] == [{k: f[k] for k in keep} for f in logs]
+    assert pool.stats()["replay"] == {"mode": "replay", "dir": str(store), "recorded": 0, "replayed": 2, "missed": 0}
+
+
+def test_replay_miss_fails_without_network(tmp_path):
+    base = "http://127.0.0.1:9"
+    runtime = _runtime(base, tmp_path / "http", "replay")
+    pool = reset_session_pool(runtime)
+    with pytest.raises(ReplayMiss):
+        pool.get(base + "/anything", timeout=1)
+    df, logs = _fetch(runtime)
+    assert df.empty and all(f["error"] for f in logs)
+    assert pool.stats()["replay"]["missed"] >= 2
+
+
+def test_mounted_session_replays_streamed_bodies(server, tmp_path):
+    base = server.url
+    url = base + "/country/DEU/indicator/X?page=1&format=json"
+    store = tmp_path / "http"
+    # e.g. a pandasdmx client's session
+    session = reset_session_pool(_runtime(base, store, "record")).mount(requests.Session())
+    recorded = session.get(url, headers={"Accept": "application/json"}).content
+
+    session = reset_session_pool(_runtime(base, store, "replay")).mount(requests.Session())
+    # query order does not matter; the Accept header does
+    r = session.get(base + "/country/DEU/indicator/X?format=json&page=1", headers={"Accept": "application/json"}, stream=True)
+    assert r.raw.read() == recorded and r.headers["ETag"] == '"v1"' and r.status_code == 200
+    assert request_key("GET", url, "application/json") != request_key("GET", url, "application/xml")
+    with pytest.raises(ReplayMiss):
+        session.get(url, headers={"Accept": "application/xml"})
+    assert len(server.requests) == 1
+
+
+def test_warm_recording_keeps_the_body_for_cold_replays(server, tmp_path):
+    base = server.url
+    url = base + "/country/DEU/indicator/X?page=1&format=json"
+    store = tmp_path / "http"
+    session = reset_session_pool(_runtime(base, store, "record")).mount(requests.Session())
+    body = session.get(url).content
+    # a run with a warm cache revalidates: the 304 must not replace the 200
+    assert session.get(url, headers={"If-None-Match": '"v1"'}).status_code == 304
+    assert len(server.requests) == 2
+
+    session = reset_session_pool(_runtime(base, store, "replay")).mount(requests.Session())
+    r = session.get(url)
+    assert r.status_code == 200 and r.content == body
+    assert session.get(url, headers={"If-None-Match": '"v1"'}).status_code == 304
+    assert session.get(url, headers={"If-None-Match": '"v0"'}).content == body
@@ -0,0 +1,121 @@
+import time
+
+import pandas as pd
+import yaml
+
+from src.fetchers.incremental import apply_tail, merge_tail, plan_windows, window_start
+from src.io import cache as io_cache
+from src.io.cache_index import CacheIndex
+
+
+def _rows(country, values):
+    return pd.DataFrame(
+        [{"source": "WB", "indicator": "gdp", "country": country, "date": d, "value": v} for d, v in values.items()]
+    )
+
+
+def test_window_start_applies_overlap_and_period_start():
+    assert window_start(pd.Timestamp("2021-01-01"), 2, "A", "2010-01-01") == "2019-01-01"
+    assert window_start(pd.Timestamp("2021-07-01"), 1, "Q", "2010-01-01") == "2021-04-01"
+    assert window_start(pd.Timestamp("2011-01-01"), 5, "A", "2010-01-01") == "2010-01-01"
+
+    plan = plan_windows(
+        {"DEU": _rows("DEU", {"2020": 1.0, "2021": 2.0}), "FRA": _rows("FRA", {"2021": 1.0}), "ITA": _rows("ITA", {})},
+        1,
+        "A",
+        "2010-01-01",
+    )
+    assert plan == {"2020-01-01": ["DEU", "FRA"]}
+
+
+def test_overlap_counts_periods_of_the_series_own_frequency():
+    annual = _rows("DEU", {str(y): float(y) for y in range(2019, 2024)})
+    monthly = _rows("FRA", {"2023M11": 1.0, "2023M12": 2.0})
+    # dates that state no frequency fall back to the target frequency
+    dated = _rows("ITA", {"2023-10-01": 1.0})
+    plan = plan_windows({"DEU": annual, "FRA": monthly, "ITA": dated}, 2, "Q", "2015-01-01")
+    assert plan == {"2021-01-01": ["DEU"], "2023-10-01": ["FRA"], "2023-04-01": ["ITA"]}
+    # the fetchers' `freq` tag wins over the date notation
+    tagged = annual.assign(freq="Q")
+    assert plan_windows({"DEU": tagged}, 2, "A", "2015-01-01") == {"2022-07-01": ["DEU"]}
+
+
+def test_merge_tail_replaces_overlap_and_reports_revisions():
+    cached = _rows("DEU", {"2019": 1.0, "2020": 2.0, "2021": 3.0})
+    fresh = _rows("DEU", {"2020": 2.0, "2021": 3.5, "2022": 4.0})
+    merged, revisions = merge_tail(cached, fresh, "2020-01-01")
+    assert merged["date"].tolist() == ["2019", "2020", "2021", "2022"]
+    assert merged["value"].tolist() == [1.0, 2.0, 3.5, 4.0]
+    assert revisions == [{"date": "2021", "old": 3.0, "new": 3.5}]
+
+
+def test_apply_tail_keeps_cached_rows_of_failed_countries():
+    cached = {"DEU": _rows("DEU", {"2020": 1.0}), "FRA": _rows("FRA", {"2020": 1.0})}
+    fresh = _rows("DEU", {"2020": 1.0, "2021": 2.0})
+    logs = [{"indicator": "gdp", "country": "DEU"}, {"indicator": "gdp", "country": "FRA", "error": "timeout"}]
+    df, out = apply_tail(fresh, logs, cached, "2020-01-01")
+    assert sorted(zip(df["country"], df["date"])) == [("DEU", "2020"), ("DEU", "2021"), ("FRA", "2020")]
+    assert out[0]["incremental"] == {"window_start": "2020-01-01", "cached_rows": 0, "fetched_rows": 2, "revisions": []}
+    assert "incremental" not in out[1]
+
+
+def test_monthly_provider_periods_plan_a_tail_and_hash_the_merged_series():
+    from src.io.artifacts import sha256_of_records
+
+    # World Bank monthly dates
+    cached = {"DEU": _rows("DEU", {"2020M01": 1.0, "2020M02": 2.0, "2020M03": 3.0})}
+    assert plan_windows(cached, 1, "M", "2010-01-01") == {"2020-02-01": ["DEU"]}
+
+    fresh = _rows("DEU", {"2020M02": 2.0, "2020M03": 3.5, "2020M04": 4.0})
+    logs = [{"indicator": "gdp", "country": "DEU", "sha256_normalized": "tail"}]
+    df, out = apply_tail(fresh, logs, cached, "2020-02-01")
+    assert df["date"].tolist() == ["2020M01", "2020M02", "2020M03", "2020M04"]
+    assert out[0]["incremental"]["revisions"] == [{"date": "2020M03", "old": 3.0, "new": 3.5}]
+    full = [
+        {"indicator": "gdp", "country": "DEU", "date": d, "value": v}
+        for d, v in zip(df["date"], df["value"])
+    ]
+    assert out[0]["sha256_normalized"] == sha256_of_records(full)
+
+
+def test_main_fetches_only_the_tail_of_expired_series(tmp_path, monkeypatch):
+    from src.fetchers.worldbank import WorldBankFetcher
+    from src.main import main
+
+    monkeypatch.chdir(tmp_path)
+    io_cache.memory_tier.invalidate()
+    calls = []
+    values = {"2018": 1.0, "2019": 2.0, "2020": 3.0}
+
+    def fake_fetch(self, countries, indicators, start, end, freq):
+        calls.append((list(countries), start))
+        years = [y for y in values if y >= start[:4]]
+        df = pd.concat([_rows(c, {y: values[y] for y in years}) for c in countries], ignore_index=True)
+        return df, [{"indicator": "gdp", "country": c, "fetch_timestamp": "2025-01-01T00:00:00+00:00"} for c in countries]
+
+    monkeypatch.setattr(WorldBankFetcher, "fetch", fake_fetch)
+    monkeypatch.setattr("src.indicators.wb_indicator.WorldBankFetcher", WorldBankFetcher)
+    cfg = {
+        "countries": ["DEU", "FRA"],
+        "period": {"start": "2018-01-01", "end": "2021-12-31", "frequency": "A"},
+        "indicators": [{"id": "gdp", "sources": [{"source": "WB", "code": "X"}]}],
+        "scoring": {"weights": {"gdp": 1.0}, "min_coverage_ratio": 0.0},
+        "excel": {"path": "./output/out.xlsx"},
+        "caching": {"enabled": True, "ttl_hours": 24, "incremental": True, "incremental_overlap_periods": 1},
+        "runtime": {"max_workers": 1},
+    }
+    path = tmp_path / "cfg.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+    main(["--config", str(path)])
+    assert calls == [(["DEU", "FRA"], "2018-01-01")]
+
+    CacheIndex(str(tmp_path / ".cache"))._run("UPDATE entries SET created_at = ?", (time.time() - 48 * 3600,))
+    io_cache.memory_tier.invalidate()
+    values.update({"2020": 3.5, "2021": 4.0})
+    main(["--config", str(path)])
+    # last cached observation 2020, one period of overlap
+    assert calls[-1] == (["DEU", "FRA"], "2019-01-01")
+
+    df, logs, missing = io_cache.cache_get_series("WB", "X", ["DEU"], "2018-01-01", "2021-12-31", ttl_hours=24)
+    assert missing == [] and dict(zip(df["date"], df["value"])) == {"2018": 1.0, "2019": 2.0, "2020": 3.5, "2021": 4.0}
+    assert logs[0]["incremental"]["revisions"] == [{"date": "2020", "old": 3.0, "new": 3.5}]
@@ -0,0 +1,82 @@
+import pytest
+
+from src.fetchers.ratelimit import SourceLimiter, TokenBucket, reset_rate_limiters
+from src.fetchers.session import reset_session_pool
+from src.fetchers.worldbank import WorldBankFetcher
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class _Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_token_bucket_allows_burst_then_paces():
+    clock = _Clock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock, sleep=clock.sleep)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.now == pytest.approx(1.0)
+
+    bucket.pause(5)
+    assert bucket.acquire() == pytest.approx(5.0)
+
+
+def test_adaptive_concurrency_halves_on_throttling_and_recovers():
+    clock = _Clock()
+    lim = SourceLimiter("WB", requests_per_sec=100, max_concurrency=8, clock=clock, sleep=clock.sleep)
+    with lim.slot() as slot:
+        slot.observe(_Response(429, {"Retry-After": "3"}))
+    assert lim.limit == 4.0
+    with lim.slot() as slot:
+        slot.observe(_Response(503))
+    assert lim.limit == 2.0
+    # the 429's Retry-After paused the bucket
+    assert clock.now >= 3.0
+
+    for _ in range(30):
+        with lim.slot() as slot:
+            slot.observe(_Response(200))
+    assert lim.limit == 8.0
+    # transport errors count as throttling
+    with pytest.raises(ConnectionError), lim.slot():
+        raise ConnectionError("refused")
+    stats = lim.stats()
+    assert stats["requests"] == 33 and stats["throttled"] == 3 and stats["concurrency_limit"] == 4
+
+
+def test_fetcher_requests_go_through_the_source_limiter(local_server, monkeypatch):
+    # the first request is throttled, the retry succeeds
+    def limited(req):
+        if len(srv.requests) == 1:
+            return 429, b"slow down"
+        recs = [{"countryiso3code": "DEU", "date": "2020", "value": 1.0}]
+        return 200, [{"page": 1, "pages": 1, "per_page": 100, "total": 1}, recs]
+
+    srv = local_server(limited)
+    monkeypatch.setattr("src.fetchers.worldbank._time.sleep", lambda s: None)
+    runtime = {
+        "wb_base_url": srv.url,
+        "rate_limits": {"WB": {"requests_per_sec": 50, "max_concurrency": 4}},
+    }
+    try:
+        reset_session_pool(runtime)
+        limiters = reset_rate_limiters(runtime)
+        df, _ = WorldBankFetcher(runtime).fetch(["DEU"], [{"id": "gdp", "code": "X"}], "2020", "2020", "A")
+    finally:
+        reset_rate_limiters()
+    assert df["value"].tolist() == [1.0]
+    stats = limiters.stats()["WB"]
+    assert stats["requests"] == 2 and stats["throttled"] == 1 and stats["requests_per_sec"] == 50
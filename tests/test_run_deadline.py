@@ -0,0 +1,118 @@
+import glob
+import json
+import os
+import time
+
+import pandas as pd
+import pytest
+import yaml
+
+from src.fetchers.deadline import DEADLINE_ERROR, DeadlineExceeded, RunDeadline, reset_run_deadline
+from src.fetchers.worldbank import WorldBankFetcher
+
+
+def test_deadline_caps_and_expires():
+    now = [0.0]
+    d = RunDeadline(10, clock=lambda: now[0])
+    assert d.cap(20) == 10 and d.cap(3) == 3 and d.cap(None) == 10
+    now[0] = 10.5
+    assert d.expired and d.remaining() == 0.0
+    with pytest.raises(DeadlineExceeded):
+        d.check()
+    assert RunDeadline(None).cap(7) == 7 and not RunDeadline(None).expired
+
+
+def test_requests_after_the_deadline_fail_fast():
+    reset_run_deadline({"deadline_sec": 0.01})
+    time.sleep(0.02)
+    t0 = time.perf_counter()
+    df, logs = WorldBankFetcher({"wb_base_url": "http://127.0.0.1:9", "retry_max": 3}).fetch(
+        ["DEU"], [{"id": "gdp", "code": "X"}], "2020", "2020", "A"
+    )
+    assert time.perf_counter() - t0 < 0.5
+    assert df.empty and DEADLINE_ERROR in logs[0]["error"]
+
+
+def test_backoff_and_rate_limit_waits_stop_at_the_deadline():
+    from src.fetchers._utils import simple_backoff_retry
+    from src.fetchers.ratelimit import SourceLimiter
+
+    deadline = RunDeadline(0.2)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        raise ConnectionError("refused")
+
+    t0 = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        # uncapped, the backoff would sleep 5 + 10 seconds
+        simple_backoff_retry(flaky, attempts=3, base_delay=5, deadline=deadline)
+    assert time.perf_counter() - t0 < 1.0 and len(calls) == 1
+
+    # one token per 10 seconds: the second request would wait 10s
+    limiter = SourceLimiter("WB", requests_per_sec=0.1, burst=1, max_concurrency=1)
+    deadline = RunDeadline(0.2)
+    with limiter.slot(deadline):
+        pass
+    t0 = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        with limiter.slot(deadline):
+            pass
+    assert time.perf_counter() - t0 < 1.0 and limiter._in_flight == 0
+
+
+@pytest.mark.parametrize("engine", ["threads", "async"])
+def test_run_ranks_what_arrived_before_the_deadline(tmp_path, monkeypatch, engine):
+    from src.fetchers.base import AbstractFetcher
+    from src.io import cache as io_cache
+    from src.main import main
+
+    monkeypatch.chdir(tmp_path)
+    io_cache.memory_tier.invalidate()
+    hang = {"on": False}
+
+    def fake_fetch(self, countries, indicators, start, end, freq):
+        ind = indicators[0]["id"]
+        while hang["on"] and ind == "slow":
+            # a provider that never answers; requests stop at the deadline
+            self.run_deadline.check()
+            time.sleep(0.05)
+        df = pd.DataFrame([{"source": "WB", "indicator": ind, "country": c, "date": "2020", "value": 1.0 + i} for i, c in enumerate(countries)])
+        return df, [{"indicator": ind, "country": c, "fetch_timestamp": "2025-01-01T00:00:00+00:00"} for c in countries]
+
+    monkeypatch.setattr(WorldBankFetcher, "fetch", fake_fetch)
+    monkeypatch.setattr(WorldBankFetcher, "afetch", AbstractFetcher.afetch)
+    monkeypatch.setattr("src.indicators.wb_indicator.WorldBankFetcher", WorldBankFetcher)
+    cfg = {
+        "countries": ["DEU", "FRA", "ITA"],
+        "period": {"start": "2020-01-01", "end": "2020-12-31", "frequency": "A"},
+        "indicators": [
+            {"id": "fast", "sources": [{"source": "WB", "code": "F"}]},
+            {"id": "slow", "sources": [{"source": "WB", "code": "S"}]},
+        ],
+        "scoring": {"weights": {"fast": 0.5, "slow": 0.5}, "min_coverage_ratio": 0.0},
+        "excel": {"path": "./output/out.xlsx"},
+        "caching": {"enabled": True, "ttl_hours": 24},
+        "runtime": {"max_workers": 2, "fetch_engine": engine},
+    }
+    path = tmp_path / "cfg.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+    main(["--config", str(path)])
+    # drop ITA's cached "slow" series: nothing to fall back on for it
+    os.remove(glob.glob(".cache/series/wb/S/ITA_*")[0])
+    io_cache.memory_tier.invalidate()
+
+    hang["on"] = True
+    cfg["caching"]["ttl_hours"] = 0
+    cfg["runtime"]["deadline_sec"] = 1.0
+    path.write_text(yaml.safe_dump(cfg))
+    t0 = time.perf_counter()
+    main(["--config", str(path)])
+    assert time.perf_counter() - t0 < 5
+    manifest = json.loads(open(sorted(glob.glob("data/_artifacts/manifest_*.json"))[-1]).read())
+    assert manifest["deadline"]["expired"] and manifest["deadline"]["deadline_sec"] == 1.0
+    assert manifest["missing_due_to_deadline"] == [
+        {"indicator": "slow", "source": "WB", "code": "S", "countries": ["ITA"], "stale_fallback": ["DEU", "FRA"]}
+    ]
+    assert os.path.exists("output/out.xlsx")
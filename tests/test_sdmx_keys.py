@@ -0,0 +1,92 @@
+import sys
+import types
+from types import SimpleNamespace
+
+from src.fetchers.sdmx_keys import plan_requests
+
+
+def test_indicators_of_one_dataflow_share_a_multi_value_key():
+    reqs = plan_requests(
+        "IMF",
+        ["DEU", "FRA", "ITA"],
+        [
+            {"id": "cpi", "code": "PCPI_IX", "freq": "M"},
+            {"id": "gdp", "code": "NGDP_R", "freq": "M"},
+            {"id": "x", "code": "ABC.GDP.1"},
+            {"id": "q", "code": "NGDP_R", "freq": "q"},
+        ],
+    )
+    assert [(r.resource, r.key, [i["id"] for i in r.indicators]) for r in reqs] == [
+        ("IFS", "M.DE+FR+IT.PCPI_IX+NGDP_R", ["cpi", "gdp"]),
+        # full keys are requested verbatim
+        ("IFS", "ABC.GDP.1", ["x"]),
+        ("IFS", "Q.DE+FR+IT.NGDP_R", ["q"]),
+    ]
+
+
+def test_frequency_comes_from_the_source_entry_not_the_target():
+    # without its own `freq` the position is a wildcard (all frequencies)
+    (req,) = plan_requests("IMF", ["DEU"], [{"id": "cpi", "code": "PCPI_IX"}])
+    assert req.key == ".DE.PCPI_IX"
+
+
+def test_oecd_and_ecb_keys_need_a_resource():
+    # without a dataflow the code is the dataflow id (whole dataflow, as before)
+    assert [(r.resource, r.key) for r in plan_requests("OECD", ["DEU"], [{"id": "o", "code": "MEI"}])] == [
+        ("MEI", None)
+    ]
+    reqs = plan_requests(
+        "OECD",
+        ["DEU", "FRA"],
+        [{"id": "o", "code": "CPALTT01", "resource": "MEI", "key": "{countries}.{code}.IXOB.{freq}", "freq": "Q"}],
+    )
+    assert [(r.resource, r.key) for r in reqs] == [("MEI", "DEU+FRA.CPALTT01.IXOB.Q")]
+    reqs = plan_requests("ECB", ["DEU", "ESP"], [{"id": "e", "code": "N.000000.4.ANR", "resource": "ICP"}])
+    assert [(r.resource, r.key) for r in reqs] == [("ICP", "N.000000.4.ANR")]
+
+
+def test_imf_fetcher_splits_a_combined_response_by_indicator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+
+    def series(area, code, values):
+        return SimpleNamespace(
+            dimensions={"FREQ": "A", "REF_AREA": area, "INDICATOR": code},
+            observations=[SimpleNamespace(index=d, value=v) for d, v in values],
+        )
+
+    class FakeClient:
+        def data(self, resource_id=None, key=None, startPeriod=None, endPeriod=None):
+            calls.append((resource_id, key))
+            return SimpleNamespace(
+                data=SimpleNamespace(
+                    series=[
+                        series("DE", "PCPI_IX", [("2020", 1.0)]),
+                        series("FR", "PCPI_IX", [("2020", 2.0)]),
+                        series("DE", "NGDP_R", [("2020", 3.0)]),
+                    ]
+                )
+            )
+
+    monkeypatch.setitem(sys.modules, "pandasdmx", types.SimpleNamespace(Request=lambda source: FakeClient()))
+    from src.fetchers.imf import IMFFetcher
+
+    df, logs = IMFFetcher({}).fetch(
+        ["DEU", "FRA"],
+        [{"id": "cpi", "code": "PCPI_IX", "freq": "A"}, {"id": "gdp", "code": "NGDP_R", "freq": "A"}],
+        "2020-01-01",
+        "2020-12-31",
+        "M",
+    )
+    assert calls == [("IFS", "A.DE+FR.PCPI_IX+NGDP_R")]
+    assert sorted(zip(df["indicator"], df["country"], df["value"])) == [
+        ("cpi", "DE", 1.0),
+        ("cpi", "FR", 2.0),
+        ("gdp", "DE", 3.0),
+    ]
+    # one log per returned series, so each country's cache entry gets its own
+    assert [(f["indicator"], f["country"], f["rows"]) for f in logs] == [
+        ("cpi", "DE", 1),
+        ("cpi", "FR", 1),
+        ("gdp", "DE", 1),
+    ]
@@ -0,0 +1,112 @@
+import pandas as pd
+import yaml
+
+from src.io import cache as io_cache
+from src.io.cache import cache_get_series, cache_set_series, series_key
+
+
+def _frame(countries, indicator="gdp"):
+    return pd.DataFrame(
+        [
+            {"source": "WB", "indicator": indicator, "country": c, "date": str(y), "value": float(y)}
+            for c in countries
+            for y in (2020, 2021)
+        ]
+    )
+
+
+def _logs(countries, errors=()):
+    out = []
+    for c in countries:
+        entry = {"indicator": "gdp", "country": c, "fetch_timestamp": "2025-01-01T00:00:00+00:00", "rows": 2}
+        if c in errors:
+            entry["error"] = "boom"
+        out.append(entry)
+    return out
+
+
+def test_series_key_is_short_and_per_country():
+    key = series_key("WB", "NY.GDP.MKTP.KD.ZG", "DEU", "2015-01-01", "2024-12-31")
+    assert key == "series/wb/NY.GDP.MKTP.KD.ZG/DEU_2015-01-01_2024-12-31"
+
+
+def test_subset_and_superset_reuse(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    written = cache_set_series(
+        "WB", "X", _frame(["DEU", "FRA"]), _logs(["DEU", "FRA"]), ["DEU", "FRA"], "2020", "2021"
+    )
+    assert written == ["DEU", "FRA"]
+
+    df, logs, missing = cache_get_series("WB", "X", ["FRA"], "2020", "2021")
+    assert missing == []
+    assert set(df["country"]) == {"FRA"} and len(df) == 2
+    assert [entry["country"] for entry in logs] == ["FRA"]
+
+    df, logs, missing = cache_get_series("WB", "X", ["DEU", "FRA", "ITA"], "2020", "2021")
+    assert missing == ["ITA"]
+    assert len(df) == 4
+
+    # a different period is a different series
+    _, _, missing = cache_get_series("WB", "X", ["DEU"], "2019", "2021")
+    assert missing == ["DEU"]
+
+
+def test_failed_and_empty_series(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    written = cache_set_series(
+        "WB", "X", _frame(["DEU"]), _logs(["DEU", "FRA", "ITA"], errors=("ITA",)), ["DEU", "FRA", "ITA"], "2020", "2021"
+    )
+    # FRA returned no rows but succeeded: stored as an empty series; ITA failed
+    assert written == ["DEU", "FRA"]
+    df, _, missing = cache_get_series("WB", "X", ["DEU", "FRA", "ITA"], "2020", "2021")
+    assert missing == ["ITA"]
+    assert set(df["country"]) == {"DEU"}
+
+    # no logs at all (e.g. optional client missing): nothing is cached
+    assert cache_set_series("OECD", "Y", pd.DataFrame(), [], ["DEU"], "2020", "2021") == []
+
+
+def test_sdmx_iso2_rows_map_to_requested_country(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = _frame(["DE"])
+    logs = [{"indicator": "gdp", "country": None, "fetch_timestamp": "2025-01-01T00:00:00+00:00"}]
+    assert cache_set_series("IMF", "Z", df, logs, ["DEU", "FRA"], "2020", "2021") == ["DEU", "FRA"]
+    out, out_logs, missing = cache_get_series("IMF", "Z", ["DEU", "FRA"], "2020", "2021")
+    assert missing == [] and len(out) == 2
+    # the shared indicator-level log is reported once
+    assert len(out_logs) == 1
+
+
+def test_main_fetches_only_missing_countries(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src.fetchers.worldbank import WorldBankFetcher
+    from src.main import main
+
+    calls = []
+
+    def fake_fetch(self, countries, indicators, start, end, freq):
+        calls.append(list(countries))
+        ind = indicators[0]
+        df = _frame(countries, indicator=ind["id"])
+        return df, [dict(entry, indicator=ind["id"]) for entry in _logs(countries)]
+
+    monkeypatch.setattr(WorldBankFetcher, "fetch", fake_fetch)
+    cfg = {
+        "countries": ["DEU", "FRA"],
+        "period": {"start": "2020-01-01", "end": "2021-12-31", "frequency": "A"},
+        "indicators": [{"id": "gdp", "sources": [{"source": "WB", "code": "X"}]}],
+        "scoring": {"weights": {"gdp": 1.0}, "min_coverage_ratio": 0.0},
+        "excel": {"path": "./output/out.xlsx"},
+        "caching": {"enabled": True, "ttl_hours": 24},
+        "runtime": {"max_workers": 1},
+    }
+    path = tmp_path / "cfg.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+
+    main(["--config", str(path)])
+    assert calls == [["DEU", "FRA"]]
+    main(["--config", str(path), "--countries", "DEU,FRA,ITA"])
+    assert calls[-1] == ["ITA"]
+    main(["--config", str(path), "--countries", "FRA"])
+    assert len(calls) == 2
+    assert io_cache.cache_get(series_key("WB", "X", "ITA", "2020-01-01", "2021-12-31")) is not None
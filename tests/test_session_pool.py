@@ -0,0 +1,39 @@
+import pytest
+
+from src.fetchers.session import SessionPool, get_session_pool, reset_session_pool
+from src.fetchers.worldbank import WorldBankFetcher
+
+
+@pytest.fixture
+def stub_server(local_server):
+    return local_server(lambda req: (200, [{"page": 1, "per_page": 100, "total": 0}, []])).url
+
+
+def test_keep_alive_reuses_connection(stub_server):
+    pool = SessionPool(maxsize=2)
+    for _ in range(3):
+        r = pool.get(f"{stub_server}/x", timeout=5)
+        assert r.status_code == 200
+    stats = pool.stats()
+    host = stub_server.split("://")[1]
+    assert stats["hosts"][host]["requests"] == 3
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+    pool.close()
+
+
+def test_per_host_pool_size_override():
+    pool = SessionPool(maxsize=4, per_host={"api.worldbank.org": 16})
+    assert pool.pool_size_for("api.worldbank.org") == 16
+    assert pool.pool_size_for("example.org") == 4
+
+
+def test_fetchers_share_the_run_pool(stub_server):
+    pool = reset_session_pool({"http_pool_maxsize": 3})
+    a = WorldBankFetcher({})
+    b = WorldBankFetcher({"retry_max": 1})
+    assert a.session_pool is b.session_pool is get_session_pool()
+    a.http_get(f"{stub_server}/a", timeout=5)
+    b.http_get(f"{stub_server}/b", timeout=5)
+    assert pool.stats()["hits"] == 1
+    reset_session_pool()
@@ -1,6 +1,17 @@
+import runpy
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
+import pytest
+
 from src.transforms.pipeline import apply_standardization
 
+# the original per-group loop lives with the benchmark that compares against it
+standardize_groups = runpy.run_path(
+    str(Path(__file__).resolve().parents[1] / "scripts" / "bench_standardize.py")
+)["standardize_groups"]
+
 
 def make_df(values):
     return pd.DataFrame({
@@ -38,3 +49,36 @@ def test_auto_sign_check_flips_when_needed():
     # since we forced good_direction='up' but actual dev is negatively sloped, we expect corr>0 after auto-flip
     assert corr is not None
     assert corr > 0
+
+
+def _long_frame(n_series=60):
+    rng = np.random.default_rng(5)
+    frames = []
+    for i in range(n_series):
+        k = int(rng.integers(1, 30))
+        values = rng.normal(size=k).cumsum()
+        if i % 7 == 0:
+            values[:] = 2.0  # flat series: zero MAD and std
+        elif i % 5 == 0:
+            values[rng.integers(0, k)] = np.nan
+        frames.append(pd.DataFrame({
+            'indicator': f'i{i % 4}',
+            'country': f'C{i // 4}',
+            'date': pd.date_range('2005-03-31', periods=k, freq='QE'),
+            'value': np.round(values, 1),
+        }))
+    return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+# the reference loop's spearmanr warns on the flat series
+@pytest.mark.filterwarnings('ignore:An input array is constant')
+@pytest.mark.parametrize('method', ['robust_zscore', 'zscore', 'winsorized_zscore', 'rank_norm'])
+@pytest.mark.parametrize('config', [None, {'rolling_mad': True, 'rolling_window': 4, 'rolling_min_periods': 2}])
+@pytest.mark.parametrize('good_direction', [None, 'down'])
+def test_vectorized_standardization_matches_per_group(method, config, good_direction):
+    df = _long_frame()
+    kwargs = dict(config=config, method=method, invert=True, good_direction=good_direction)
+    out = apply_standardization(df, **kwargs)
+    ref = standardize_groups(df, **kwargs)
+    pd.testing.assert_frame_equal(out.drop(columns='std_value'), ref.drop(columns='std_value'))
+    np.testing.assert_allclose(out['std_value'], ref['std_value'], rtol=1e-9, atol=1e-12)
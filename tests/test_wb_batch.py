@@ -0,0 +1,113 @@
+import hashlib
+import json
+
+from src.fetchers.worldbank import WorldBankFetcher
+from src.io.artifacts import sha256_of_records
+
+
+class FakeResponse:
+    def __init__(self, url, payload, status_code=200):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {"ETag": "abc"}
+        self.content = json.dumps(payload).encode("utf-8")
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def _wb_record(iso3, iso2, date, value):
+    return {
+        "indicator": {"id": "X", "value": "x"},
+        "country": {"id": iso2, "value": iso3},
+        "countryiso3code": iso3,
+        "date": date,
+        "value": value,
+    }
+
+
+def _install_fake_get(monkeypatch, responder):
+    calls = []
+
+    def fake_get(self, url, params, **kwargs):
+        calls.append((url, dict(params)))
+        payload = responder(url, params)
+        r = FakeResponse(url, payload)
+        meta = {
+            "url": url,
+            "params": params,
+            "status_code": 200,
+            "response_time_ms": 1,
+            "headers": r.headers,
+            "sha256_raw": hashlib.sha256(r.content).hexdigest(),
+        }
+        return r, meta
+
+    monkeypatch.setattr(WorldBankFetcher, "_get", fake_get)
+    return calls
+
+
+def test_batched_request_splits_rows_and_logs(monkeypatch):
+    def responder(url, params):
+        recs = [
+            _wb_record("DEU", "DE", "2020", 1.0),
+            _wb_record("DEU", "DE", "2021", 2.0),
+            _wb_record("FRA", "FR", "2020", 3.0),
+            _wb_record("FRA", "FR", "2021", None),
+            _wb_record("ITA", "IT", "2020", 5.0),
+        ]
+        return [{"page": 1, "pages": 1, "per_page": 1000, "total": len(recs)}, recs]
+
+    calls = _install_fake_get(monkeypatch, responder)
+    f = WorldBankFetcher({"wb_batch_size": 10})
+    df, logs = f.fetch(["DEU", "FRA", "ITA"], [{"id": "gdp", "code": "X"}], "2020-01-01", "2021-12-31", "A")
+
+    assert len(calls) == 1
+    assert "/country/DEU;FRA;ITA/indicator/X" in calls[0][0]
+    assert len(df) == 4
+    assert set(df["country"]) == {"DEU", "FRA", "ITA"}
+
+    by_country = {entry["country"]: entry for entry in logs}
+    assert set(by_country) == {"DEU", "FRA", "ITA"}
+    assert by_country["FRA"]["rows"] == 2
+    deu = df[df["country"] == "DEU"]
+    expected = sha256_of_records(
+        [
+            {"indicator": "gdp", "country": "DEU", "date": d, "value": v}
+            for d, v in zip(deu["date"], deu["value"])
+        ]
+    )
+    assert by_country["DEU"]["sha256_normalized"] == expected
+    assert by_country["DEU"]["api_meta"]["batch_countries"] == ["DEU", "FRA", "ITA"]
+
+
+def test_batch_size_chunks_countries(monkeypatch):
+    def responder(url, params):
+        return [{"page": 1, "pages": 1, "per_page": 1000, "total": 0}, []]
+
+    calls = _install_fake_get(monkeypatch, responder)
+    f = WorldBankFetcher({"wb_batch_size": 2})
+    df, logs = f.fetch(["DEU", "FRA", "ITA"], [{"id": "gdp", "code": "X"}], "2020", "2021", "A")
+    assert len(calls) == 2
+    assert df.empty
+    assert [entry["country"] for entry in logs] == ["DEU", "FRA", "ITA"]
+
+
+def test_rejected_batch_falls_back_to_single_countries(monkeypatch):
+    def responder(url, params):
+        if ";" in url:
+            return [{"message": [{"id": "120", "key": "Invalid value"}]}]
+        if "/country/XXX/" in url:
+            return [{"message": [{"id": "120", "key": "Invalid value"}]}]
+        iso3 = url.split("/country/")[1].split("/")[0]
+        recs = [_wb_record(iso3, iso3[:2], "2020", 1.0)]
+        return [{"page": 1, "pages": 1, "per_page": 100, "total": 1}, recs]
+
+    calls = _install_fake_get(monkeypatch, responder)
+    f = WorldBankFetcher({"wb_batch_size": 10})
+    df, logs = f.fetch(["DEU", "XXX"], [{"id": "gdp", "code": "X"}], "2020", "2021", "A")
+    assert len(calls) == 3
+    assert list(df["country"]) == ["DEU"]
+    errors = [entry for entry in logs if entry.get("error")]
+    assert [entry["country"] for entry in errors] == ["XXX"]
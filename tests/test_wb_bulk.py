@@ -0,0 +1,118 @@
+import glob
+import json
+import zipfile
+
+import pytest
+import yaml
+
+from src.fetchers import wb_bulk
+from src.fetchers.wb_bulk import WBBulkFetcher
+
+YEARS = [str(y) for y in range(2015, 2021)]
+
+
+def _snapshot(path):
+    """Small WDI-shaped wide CSV: 3 countries x 2 indicators x 2015..2020."""
+    lines = [",".join(["Country Name", "Country Code", "Indicator Name", "Indicator Code", *YEARS]) + ","]
+    for i, (name, iso3) in enumerate([("Germany", "DEU"), ("France", "FRA"), ("Italy", "ITA")]):
+        for code in ("NY.GDP.MKTP.KD.ZG", "FP.CPI.TOTL.ZG"):
+            base = 1.0 if code.startswith("NY") else 2.0
+            values = [f"{base + i + k / 10:.1f}" for k in range(len(YEARS))]
+            values[0] = ""  # missing 2015
+            lines.append(",".join([f'"{name}"', iso3, f'"{code} name"', code, *values]) + ",")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_bulk_fetch_filters_snapshot(tmp_path, packed):
+    src = _snapshot(tmp_path / "WDICSV.csv")
+    if packed:
+        with zipfile.ZipFile(tmp_path / "WDI_CSV.zip", "w") as zf:
+            zf.writestr("WDISeries.csv", "Series Code\nX\n")
+            zf.write(src, "WDICSV.csv")
+        src = tmp_path / "WDI_CSV.zip"
+    runtime = {"wb_bulk_path": str(src), "wb_bulk_dir": str(tmp_path / "bulk"), "wb_bulk_chunk_rows": 2}
+    df, logs = WBBulkFetcher(runtime).fetch(
+        ["DEU", "ITA", "USA"], [{"id": "gdp", "code": "NY.GDP.MKTP.KD.ZG"}], "2014-01-01", "2017-12-31"
+    )
+    assert set(df.columns) == {"source", "indicator", "country", "date", "value", "freq"}
+    assert (df["source"] == "WB_BULK").all() and (df["indicator"] == "gdp").all() and (df["freq"] == "A").all()
+    got = sorted(zip(df["country"], df["date"], df["value"]))
+    assert got == [("DEU", "2016", 1.1), ("DEU", "2017", 1.2), ("ITA", "2016", 3.1), ("ITA", "2017", 3.2)]
+    by_country = {entry["country"]: entry for entry in logs}
+    assert set(by_country) == {"DEU", "ITA", "USA"}
+    assert by_country["DEU"]["rows"] == 2 and by_country["USA"]["rows"] == 0
+    assert by_country["DEU"]["request_url"].startswith("file://")
+    assert by_country["DEU"]["sha256_raw"] and by_country["DEU"]["api_meta"]["member"] == "WDICSV.csv"
+
+
+def test_index_is_reused_on_repeat_runs(tmp_path, monkeypatch):
+    runtime = {"wb_bulk_path": str(_snapshot(tmp_path / "wdi.csv")), "wb_bulk_dir": str(tmp_path / "bulk")}
+    ind = [{"id": "cpi", "code": "FP.CPI.TOTL.ZG"}]
+    df1, logs1 = WBBulkFetcher(runtime).fetch(["FRA"], ind, "2019", "2020")
+    assert logs1[0]["api_meta"]["index"] == "built"
+    assert len(glob.glob(str(tmp_path / "bulk" / "index" / "*" / "ind_*.meta.json"))) == 2
+
+    def no_scan(*a, **k):
+        raise AssertionError("snapshot scanned again")
+
+    monkeypatch.setattr(wb_bulk, "iter_observations", no_scan)
+    df2, logs2 = WBBulkFetcher(runtime).fetch(["FRA"], ind, "2019", "2020")
+    assert logs2[0]["api_meta"]["index"] == "reused"
+    assert df2.equals(df1) and list(df2["value"]) == [3.4, 3.5]
+
+
+def test_index_build_spills_chunks_per_indicator(tmp_path, monkeypatch):
+    runtime = {
+        "wb_bulk_path": str(_snapshot(tmp_path / "wdi.csv")),
+        "wb_bulk_dir": str(tmp_path / "bulk"),
+        "wb_bulk_chunk_rows": 1,
+    }
+    spilled = []
+    real_spill = wb_bulk._spill
+
+    def spill(spill_dir, code, arrays):
+        spilled.append((code, len(arrays[0])))
+        real_spill(spill_dir, code, arrays)
+
+    monkeypatch.setattr(wb_bulk, "_spill", spill)
+    backend, meta, built = WBBulkFetcher(runtime).index(runtime["wb_bulk_path"])
+    # one spill per (chunk, indicator): nothing is held back until the end
+    assert spilled == [("NY.GDP.MKTP.KD.ZG", 5), ("FP.CPI.TOTL.ZG", 5)] * 3
+    part, _ = backend.read(wb_bulk._partition_key("FP.CPI.TOTL.ZG"))
+    assert list(part["country"]) == ["DEU"] * 5 + ["FRA"] * 5 + ["ITA"] * 5
+    assert list(part["year"][:5]) == [2016, 2017, 2018, 2019, 2020]
+    assert built and not glob.glob(str(tmp_path / "bulk" / "index" / "*" / "_spill*"))
+
+
+def test_missing_snapshot_logs_errors(tmp_path):
+    runtime = {"wb_bulk_path": str(tmp_path / "absent.zip"), "wb_bulk_dir": str(tmp_path / "bulk")}
+    df, logs = WBBulkFetcher(runtime).fetch(["DEU"], [{"id": "gdp", "code": "X"}], "2019", "2020")
+    assert df.empty and logs[0]["error"] and logs[0]["rows"] == 0
+    assert list(df.columns) == ["source", "indicator", "country", "date", "value"]
+
+
+def test_pipeline_runs_on_bulk_source(tmp_path, monkeypatch):
+    from src.main import main
+
+    monkeypatch.chdir(tmp_path)
+    snapshot = _snapshot(tmp_path / "wdi.csv")
+    cfg = {
+        "countries": ["DEU", "FRA", "ITA"],
+        "period": {"start": "2016-01-01", "end": "2020-12-31", "frequency": "A"},
+        "indicators": [
+            {"id": "gdp", "sources": [{"source": "WB_BULK", "code": "NY.GDP.MKTP.KD.ZG"}]},
+            {"id": "cpi", "sources": [{"source": "WB_BULK", "code": "FP.CPI.TOTL.ZG"}]},
+        ],
+        "scoring": {"weights": {"gdp": 0.5, "cpi": 0.5}, "min_coverage_ratio": 0.0},
+        "excel": {"path": "./output/out.xlsx"},
+        "caching": {"enabled": False},
+        "runtime": {"max_workers": 2, "wb_bulk_path": str(snapshot), "wb_bulk_dir": str(tmp_path / "bulk")},
+    }
+    path = tmp_path / "cfg.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+    main(["--config", str(path)])
+    manifest = json.loads(open(sorted(glob.glob("data/_artifacts/manifest_*.json"))[-1]).read())
+    fetches = [f for f in manifest["fetches"] if f.get("indicator") in ("gdp", "cpi")]
+    assert len(fetches) == 6 and all(f["rows"] == 5 for f in fetches)
@@ -0,0 +1,108 @@
+import time
+
+import pytest
+import yaml
+
+from src.fetchers.worldbank import WorldBankFetcher
+from src.io import cache as io_cache
+from src.io.cache_index import CacheIndex
+
+
+class _Stub:
+    """WB-style API whose data is at `version`; sends an ETag if `send_etag`."""
+
+    def __init__(self):
+        self.send_etag = True
+        self.version = 1
+
+    def __call__(self, req):
+        countries = req.path.split("/country/")[1].split("/")[0].split(";")
+        etag = f'"v{self.version}"'
+        if self.send_etag and req.headers.get("If-None-Match") == etag:
+            return 304, b"", {"ETag": etag}
+        recs = [{"countryiso3code": c, "date": "2020", "value": float(self.version)} for c in countries]
+        body = [{"page": 1, "pages": 1, "per_page": 1000, "total": len(recs)}, recs]
+        return 200, body, {"ETag": etag} if self.send_etag else {}
+
+
+@pytest.fixture
+def stub(local_server):
+    stub = _Stub()
+    srv = local_server(stub)
+    stub.url, stub.requests = srv.url, srv.requests
+    return stub
+
+
+COUNTRIES = ["DEU", "FRA"]
+
+
+def _fetch(stub, validators=None):
+    ind = {"id": "gdp", "code": "X"}
+    if validators:
+        ind["validators"] = validators
+    return WorldBankFetcher({"wb_base_url": stub.url}).fetch(COUNTRIES, [ind], "2020", "2020", "A")
+
+
+def test_etag_revalidation_returns_not_modified(stub):
+    df, logs = _fetch(stub)
+    assert len(df) == 2 and logs[0]["etag"] == '"v1"'
+
+    df2, logs2 = _fetch(stub, {f["country"]: f for f in logs})
+    assert stub.requests[-1].headers.get("If-None-Match") == '"v1"'
+    assert df2.empty
+    assert [(f["country"], f["http_status"], f["not_modified"], f["revalidated_by"]) for f in logs2] == [
+        ("DEU", 304, True, "etag"),
+        ("FRA", 304, True, "etag"),
+    ]
+    assert [f["sha256_normalized"] for f in logs2] == [f["sha256_normalized"] for f in logs]
+
+    # changed upstream data is fetched normally
+    stub.version = 2
+    df3, logs3 = _fetch(stub, {f["country"]: f for f in logs})
+    assert df3["value"].tolist() == [2.0, 2.0] and not any(f.get("not_modified") for f in logs3)
+
+
+def test_payload_hash_revalidation_without_validators(stub):
+    stub.send_etag = False
+    _, logs = _fetch(stub)
+    df2, logs2 = _fetch(stub, {f["country"]: f for f in logs})
+    assert "If-None-Match" not in stub.requests[-1].headers
+    assert df2.empty and all(f["revalidated_by"] == "sha256_raw" for f in logs2)
+
+
+def test_validators_of_a_different_batch_are_ignored(stub):
+    _, logs = _fetch(stub)
+    # a single-country log does not describe the DEU;FRA response
+    single = WorldBankFetcher({"wb_base_url": stub.url}).fetch(["DEU"], [{"id": "gdp", "code": "X"}], "2020", "2020", "A")[1]
+    df, logs2 = _fetch(stub, {"DEU": single[0], "FRA": logs[1]})
+    assert len(df) == 2 and not any(f.get("not_modified") for f in logs2)
+
+
+def test_main_touches_cache_on_not_modified(stub, tmp_path, monkeypatch):
+    from src.main import main
+
+    monkeypatch.chdir(tmp_path)
+    # scripts/ci_fixture_run.py (run in-process by other tests) swaps the module's class
+    monkeypatch.setattr("src.indicators.wb_indicator.WorldBankFetcher", WorldBankFetcher)
+    io_cache.memory_tier.invalidate()
+    cfg = {
+        "countries": COUNTRIES,
+        "period": {"start": "2020-01-01", "end": "2020-12-31", "frequency": "A"},
+        "indicators": [{"id": "gdp", "sources": [{"source": "WB", "code": "X"}]}],
+        "scoring": {"weights": {"gdp": 1.0}, "min_coverage_ratio": 0.0},
+        "excel": {"path": "./output/out.xlsx"},
+        "caching": {"enabled": True, "ttl_hours": 24},
+        "runtime": {"max_workers": 1, "wb_base_url": stub.url},
+    }
+    path = tmp_path / "cfg.yaml"
+    path.write_text(yaml.safe_dump(cfg))
+    main(["--config", str(path)])
+    assert len(stub.requests) == 1
+
+    CacheIndex(str(tmp_path / ".cache"))._run("UPDATE entries SET created_at = ?", (time.time() - 48 * 3600,))
+    io_cache.memory_tier.invalidate()
+    main(["--config", str(path)])
+    assert len(stub.requests) == 2 and stub.requests[-1].headers.get("If-None-Match") == '"v1"'
+
+    df, _, missing = io_cache.cache_get_series("WB", "X", COUNTRIES, "2020-01-01", "2020-12-31", ttl_hours=24)
+    assert missing == [] and df["value"].tolist() == [1.0, 1.0]